@@ -9,7 +9,7 @@ sys.path.append(project_root)
 
 from sqlalchemy.exc import OperationalError
 from src.infrastructure.config.settings import settings
-from src.infrastructure.persistence.database import engine, Base
+from src.infrastructure.persistence.database import migration_engine as engine, Base
 
 # Import ALL models so Base.metadata knows them
 from src.infrastructure.persistence.models import learning_models
@@ -0,0 +1,233 @@
+"""
+Query-plan regression check for the hot lookup paths.
+
+Seeds a synthetic dataset (thousands of students, hundreds of thousands of
+attempts and messages) in a throwaway schema, runs each repository method,
+captures the SQL it issues and asserts with EXPLAIN that none of it falls back
+to a sequential scan on a large table.
+
+    python scripts/verify_query_plans.py [--scale 1.0] [--keep]
+
+Needs DATABASE_URL pointing at Postgres. Only the `query_plan_check` schema is
+touched (created, seeded and dropped unless --keep).
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from src.infrastructure.persistence.database import Base, sync_url
+import src.infrastructure.persistence.models  # noqa: F401  (registers every table)
+from src.infrastructure.persistence.repositories.submission_repository_impl import SqlAlchemySubmissionRepository
+from src.infrastructure.persistence.repositories.session_repository_impl import SqlAlchemySessionRepository
+from src.infrastructure.persistence.repositories.submission_read_repository_impl import SqlAlchemySubmissionReadRepository
+from src.infrastructure.persistence.repositories.activity_repository_impl import SqlAlchemyActivityRepository
+from src.infrastructure.persistence.repositories.exercise_repository_impl import SqlAlchemyExerciseRepository
+from src.infrastructure.persistence.repositories.student_risk_read_repository_impl import SqlAlchemyStudentRiskReadRepository
+from src.application.teacher.queries.get_activity_students import GetActivityStudentsProgress
+
+SCHEMA = "query_plan_check"
+
+# Tables that grow with every semester: a Seq Scan on any of them is a regression
+LARGE_TABLES = {
+    "users", "activities", "exercises", "enrollments", "submissions", "exercise_attempts",
+    "sessions", "tutor_messages", "risk_analyses", "activity_progress",
+}
+
+# Ids are deterministic so the checks can pick a student/module/activity that exists:
+#   student u{i}, module m{j}, activity a{j}_{k}, exercise e{j}_{k}_{x}
+#   student i is enrolled in modules m{(2i % M) + 1} and m{(3i % M) + 1} and works in the first one
+SEED = [
+    ("users", """
+        INSERT INTO users (id, email, hashed_password, full_name, roles, is_active, is_verified, created_at, updated_at)
+        SELECT 'u' || i, 'u' || i || '@example.com', 'x', 'Student ' || i, ARRAY['student'], true, true, now(), now()
+        FROM generate_series(1, :students) i
+    """),
+    ("modules", """
+        INSERT INTO activities (id, course_id, teacher_id, title, description, type, status, "order", created_at, updated_at)
+        SELECT 'm' || j, 'c' || (j % 20), 't1', 'Module ' || j, '', 'module', 'published', j, now(), now()
+        FROM generate_series(1, :modules) j
+    """),
+    ("activities", """
+        INSERT INTO activities (id, course_id, teacher_id, title, description, type, status, "order", created_at, updated_at)
+        SELECT 'a' || j || '_' || k, 'm' || j, 't1', 'Activity ' || k, '', 'practice',
+               CASE WHEN k % 4 = 0 THEN 'draft' ELSE 'published' END, k, now(), now()
+        FROM generate_series(1, :modules) j, generate_series(1, :activities_per_module) k
+    """),
+    ("exercises", """
+        INSERT INTO exercises (id, activity_id, title, problem_statement, starter_code, difficulty, language, status, test_cases_json, created_at, updated_at)
+        SELECT 'e' || j || '_' || k || '_' || x, 'a' || j || '_' || k, 'Exercise ' || x, '', '', 'Easy', 'python', 'published', '[]', now(), now()
+        FROM generate_series(1, :modules) j, generate_series(1, :activities_per_module) k, generate_series(1, :exercises_per_activity) x
+    """),
+    ("enrollments", """
+        INSERT INTO enrollments (id, student_id, module_id, status, enrolled_at)
+        SELECT 'en' || i || '_' || n, 'u' || i, 'm' || ((i * (n + 1)) % :modules + 1), 'active', now()
+        FROM generate_series(1, :students) i, generate_series(1, 2) n
+    """),
+    ("submissions", """
+        INSERT INTO submissions (id, student_id, activity_id, status, final_score, created_at, updated_at)
+        SELECT 's' || i || '_' || k, 'u' || i, 'a' || ((i * 2) % :modules + 1) || '_' || k, 'submitted',
+               (i * k) % 100, now() - k * interval '1 day', now() - k * interval '1 day'
+        FROM generate_series(1, :students) i, generate_series(1, :activities_per_module) k
+    """),
+    ("exercise_attempts", """
+        INSERT INTO exercise_attempts (id, submission_id, exercise_id, code_submitted, is_passing, grade, execution_output, error_message, created_at)
+        SELECT 'at' || i || '_' || k || '_' || x, 's' || i || '_' || k, 'e' || ((i * 2) % :modules + 1) || '_' || k || '_' || x,
+               'print(1)', x % 2 = 0, (x * 20) % 100, '', '', now() - k * interval '1 day' + x * interval '1 minute'
+        FROM generate_series(1, :students) i, generate_series(1, :activities_per_module) k, generate_series(1, :exercises_per_activity) x
+    """),
+    ("risk_analyses", """
+        INSERT INTO risk_analyses (id, submission_id, risk_score, risk_level, diagnosis, evidence, teacher_advice, positive_aspects, analyzed_at)
+        SELECT 'r' || i || '_' || k, 's' || i || '_' || k, (i * k) % 100, 'LOW', '', '[]', '', '[]', now()
+        FROM generate_series(1, :students) i, generate_series(1, :activities_per_module) k
+        WHERE (i + k) % 3 = 0
+    """),
+    ("sessions", """
+        INSERT INTO sessions (id, student_id, activity_id, status, start_time, created_at, updated_at)
+        SELECT 'se' || i || '_' || k, 'u' || i, 'a' || ((i * 2) % :modules + 1) || '_' || k, 'active', now(), now(),
+               now() - k * interval '1 hour'
+        FROM generate_series(1, :students) i, generate_series(1, :activities_per_module) k
+    """),
+    ("tutor_messages", """
+        INSERT INTO tutor_messages (id, session_id, role, content, created_at)
+        SELECT 'tm' || i || '_' || k || '_' || y, 'se' || i || '_' || k,
+               CASE WHEN y % 2 = 0 THEN 'ai_tutor' ELSE 'student' END, 'message ' || y, now() + y * interval '1 second'
+        FROM generate_series(1, :students) i, generate_series(1, :activities_per_module) k, generate_series(1, :messages_per_session) y
+    """),
+    ("activity_progress", """
+        INSERT INTO activity_progress (activity_id, student_id, submission_id, status, exercises_attempted, exercises_passed,
+                                       attempts_count, exercise_state, updated_at)
+        SELECT activity_id, student_id, id, status, 3, 1, 3, '{}', now() FROM submissions
+    """),
+]
+
+def seed_sizes(scale: float) -> dict:
+    return {
+        "students": max(200, int(10000 * scale)),
+        "modules": max(20, int(500 * scale)),
+        "activities_per_module": 9,
+        "exercises_per_activity": 3,
+        "messages_per_session": 6,
+    }
+
+def build_checks(sizes: dict):
+    """(name, run(session), tables allowed to be scanned sequentially and why)."""
+    i = 42
+    module = f"m{(i * 2) % sizes['modules'] + 1}"
+    activity = f"a{module[1:]}_1"
+    return [
+        ("SubmissionRepository.find_by_activity_and_student",
+         lambda s: SqlAlchemySubmissionRepository(s).find_by_activity_and_student(activity, f"u{i}"), set()),
+        ("SessionRepository.find_by_id_with_recent_messages",
+         lambda s: SqlAlchemySessionRepository(s).find_by_id_with_recent_messages(f"se{i}_1", 5), set()),
+        ("SubmissionReadRepository.get_student_activity_details",
+         lambda s: SqlAlchemySubmissionReadRepository(s).get_student_activity_details(activity, f"u{i}"), set()),
+        ("SubmissionReadRepository.get_activity_details_for_students",
+         lambda s: SqlAlchemySubmissionReadRepository(s).get_activity_details_for_students(activity), set()),
+        ("ActivityRepository.list_enrolled_modules",
+         lambda s: SqlAlchemyActivityRepository(s).list_enrolled_modules(f"u{i}"), set()),
+        ("ActivityRepository.get_assigned_students",
+         lambda s: SqlAlchemyActivityRepository(s).get_assigned_students(module, limit=50, after=("u1",)), set()),
+        ("ActivityRepository.list_by_teacher (keyset page)",
+         lambda s: SqlAlchemyActivityRepository(s).list_by_teacher("t1", limit=50, after=(datetime(2000, 1, 1), "a1_1")), set()),
+        ("ExerciseRepository.list_by_activity",
+         lambda s: SqlAlchemyExerciseRepository(s).list_by_activity(activity), set()),
+        ("GetActivityStudentsProgress.execute",
+         lambda s: GetActivityStudentsProgress(s).execute(activity), set()),
+        # The role is an ARRAY filter (no index) and the page is ordered by name over all students
+        ("StudentRiskReadRepository.list_students(module_id)",
+         lambda s: SqlAlchemyStudentRiskReadRepository(s).list_students(module_id=module, limit=50, after=("Student 1", "u1")), {"users"}),
+    ]
+
+def seq_scans(plan: dict):
+    """Yields the relation of every Seq Scan node in an EXPLAIN (FORMAT JSON) plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+def explain(engine, statement: str, parameters) -> dict:
+    with engine.connect() as conn:
+        result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    return result[0]["Plan"]
+
+def run_check(engine, run, allowed):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(bind=engine) as session:
+            run(session)
+            session.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    problems = []
+    for statement, parameters in captured:
+        bad = sorted({t for t in seq_scans(explain(engine, statement, parameters)) if t in LARGE_TABLES and t not in allowed})
+        if bad:
+            problems.append((bad, " ".join(statement.split())[:200]))
+    return len(captured), problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="dataset size multiplier (1.0 = 10k students)")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema for manual EXPLAINs")
+    args = parser.parse_args()
+
+    admin = create_engine(sync_url)
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.commit()
+
+    engine = create_engine(sync_url, connect_args={"options": f"-c search_path={SCHEMA}"})
+    sizes = seed_sizes(args.scale)
+    failed = 0
+    try:
+        # Same DDL as the application models, including every index
+        Base.metadata.create_all(engine)
+        print(f"Seeding {SCHEMA}: {sizes}")
+        with engine.connect() as conn:
+            for table, sql in SEED:
+                started = time.monotonic()
+                conn.execute(text(sql), sizes)
+                conn.commit()
+                print(f"  {table}: {time.monotonic() - started:.1f}s")
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+
+        for name, run, allowed in build_checks(sizes):
+            count, problems = run_check(engine, run, allowed)
+            if problems:
+                failed += 1
+                print(f"FAIL {name}")
+                for tables, statement in problems:
+                    print(f"     Seq Scan on {', '.join(tables)}: {statement}...")
+            else:
+                print(f"OK   {name} ({count} queries, index access only)")
+    finally:
+        engine.dispose()
+        if not args.keep:
+            with admin.connect() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+                conn.commit()
+        admin.dispose()
+
+    if failed:
+        print(f"{failed} method(s) scan large tables sequentially")
+        sys.exit(1)
+    print("All hot lookup paths use indexes.")
+
+if __name__ == "__main__":
+    main()
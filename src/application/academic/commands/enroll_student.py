@@ -5,17 +5,20 @@ from src.domain.identity.ports.user_repository import UserRepository
 from src.domain.identity.value_objects.user_id import UserId
 from src.application.shared.unit_of_work import UnitOfWork
 from src.application.academic.dtos.academic_dtos import EnrollStudentRequest, EnrollmentDTO
+from src.application.learning.ports.student_courses_cache import StudentCoursesCachePort
 
 class EnrollStudent:
     def __init__(self, 
                  enrollment_repository: EnrollmentRepository,
                  course_repository: CourseRepository,
                  user_repository: UserRepository,
-                 uow: UnitOfWork):
+                 uow: UnitOfWork,
+                 courses_cache: Optional[StudentCoursesCachePort] = None):
         self.enrollment_repository = enrollment_repository
         self.course_repository = course_repository
         self.user_repository = user_repository
         self.uow = uow
+        self.courses_cache = courses_cache
 
     def execute(self, request: EnrollStudentRequest) -> EnrollmentDTO:
         # Validate Course
@@ -40,6 +43,8 @@ class EnrollStudent:
         
         with self.uow:
             self.enrollment_repository.save(enrollment)
+        if self.courses_cache:
+            self.courses_cache.invalidate_student(request.student_id)
             
         return EnrollmentDTO(
             id=enrollment.id,
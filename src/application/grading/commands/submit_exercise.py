@@ -4,9 +4,8 @@ from src.domain.grading.ports.submission_repository import SubmissionRepository
 from src.domain.grading.ports.code_executor import CodeExecutor
 from src.domain.grading.entities.submission import Submission
 from src.domain.grading.entities.exercise_attempt import ExerciseAttempt
-from src.domain.grading.value_objects.submission_status import SubmissionStatus
 from src.domain.learning.exceptions import ExerciseInvalidException
-from ..dtos.submit_exercise_dto import SubmitExerciseRequest, ExerciseSubmissionResultDTO
+from ..dtos.submit_exercise_dto import SubmitExerciseRequest, ExerciseSubmissionResultDTO, test_results_to_dicts
 
 class SubmitExercise:
     def __init__(
@@ -66,5 +65,7 @@ class SubmitExercise:
             passed=execution_result.is_success,
             stdout=execution_result.stdout,
             stderr=execution_result.stderr,
-            error=execution_result.error
+            error=execution_result.error,
+            score=execution_result.score,
+            test_results=test_results_to_dicts(execution_result.test_results)
         )
@@ -1,6 +1,7 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Iterable
 from src.application.shared.dtos.common import DTO
+from src.domain.grading.value_objects.test_case_result import TestCaseResult
 
 @dataclass
 class SubmitExerciseRequest(DTO):
@@ -17,3 +18,26 @@ class ExerciseSubmissionResultDTO(DTO):
     stdout: str
     stderr: str
     error: Optional[str] = None
+    score: Optional[float] = None
+    test_results: List[Dict[str, Any]] = field(default_factory=list)
+
+def test_results_to_dicts(results: Iterable[TestCaseResult]) -> List[Dict[str, Any]]:
+    """Per-case results for the student; hidden cases only reveal whether they passed."""
+    items = []
+    for r in results:
+        item = {
+            "test_case_id": r.test_case_id,
+            "passed": r.passed,
+            "is_hidden": r.is_hidden,
+            "weight": r.weight,
+            "duration_ms": r.duration_ms,
+        }
+        if not r.is_hidden:
+            item.update({
+                "input_data": r.input_data,
+                "expected_output": r.expected_output,
+                "actual_output": r.actual_output,
+                "error": r.error,
+            })
+        items.append(item)
+    return items
@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from src.domain.grading.ports.code_executor import CodeExecutor
+from src.domain.grading.value_objects.execution_result import ExecutionResult
+from src.domain.learning.entities.exercise import Exercise
+
+EMPTY_CODE_FEEDBACK = "No se ha entregado código. Es necesario implementar la solución para ser evaluado."
+PENDING_REVIEW_FEEDBACK = "Pendiente de revisión manual: la evaluación automática no estuvo disponible."
+MISSING_EXERCISE_FEEDBACK = "El ejercicio ya no existe; se califica con 0."
+
+@dataclass
+class PreGrade:
+    exercise_id: str
+    title: str
+    difficulty: str
+    code: str
+    grade: Optional[float]             # None -> only the LLM can grade it (no test cases)
+    passed: bool
+    feedback: str
+    needs_ai: bool                     # ambiguous: send to the auditor
+    source: str                        # "empty" | "tests" | "ai"
+    execution: Optional[ExecutionResult] = None
+
+    @property
+    def test_summary(self) -> Optional[str]:
+        if not self.execution or not self.execution.tests_total:
+            return None
+        return f"{self.execution.tests_passed}/{self.execution.tests_total} casos de prueba superados"
+
+    def to_audit_input(self) -> Dict[str, Any]:
+        """Shape expected by IAiAuditor.audit_activity."""
+        return {
+            "id": self.exercise_id,
+            "title": self.title,
+            "difficulty": self.difficulty,
+            "code": self.code,
+            "passed": self.passed,
+            "test_summary": self.test_summary,
+        }
+
+    def to_audit_entry(self) -> Dict[str, Any]:
+        """Shape of one item of the auditor's `exercises_audit`."""
+        return {
+            "exercise_id": self.exercise_id,
+            "title": self.title,
+            "grade": self.grade if self.grade is not None else 0,
+            "passed": self.passed,
+            "feedback": self.feedback,
+            "graded_by": self.source,
+            "score": self.execution.score if self.execution else None,
+        }
+
+class PreGrader:
+    """
+    Deterministic first pass over a final submission, so the LLM auditor only
+    sees the exercises it is actually needed for:
+
+    - empty / comment-only code -> 0, no execution
+    - every test case passes   -> `full_pass_grade`
+    - every test case fails    -> `full_fail_grade`
+    - partial pass             -> weighted test score; the LLM only writes feedback
+    - no test cases            -> the LLM grades it, as before; if the auditor fails,
+                                  it is left pending manual review instead of a 0
+    """
+    def __init__(
+        self,
+        code_executor: CodeExecutor,
+        pass_threshold: float = 60.0,
+        full_pass_grade: float = 100.0,
+        full_fail_grade: float = 20.0
+    ):
+        self.code_executor = code_executor
+        self.pass_threshold = pass_threshold
+        self.full_pass_grade = full_pass_grade
+        self.full_fail_grade = full_fail_grade
+
+    def grade(self, exercise: Exercise, code: str, language: str = "python") -> PreGrade:
+        base = {
+            "exercise_id": exercise.id,
+            "title": exercise.title,
+            "difficulty": exercise.difficulty.value,
+            "code": code or "",
+        }
+
+        if self.is_empty_code(code):
+            return PreGrade(**base, grade=0.0, passed=False, feedback=EMPTY_CODE_FEEDBACK, needs_ai=False, source="empty")
+
+        if not exercise.test_cases:
+            return PreGrade(**base, grade=None, passed=False, feedback="", needs_ai=True, source="ai")
+
+        execution = self.code_executor.execute(code=code, language=language, test_cases=exercise.test_cases)
+        passed_count, total = execution.tests_passed, execution.tests_total
+
+        if total and passed_count == total:
+            feedback = f"Tu código superó los {total} casos de prueba."
+            return PreGrade(
+                **base, grade=self.full_pass_grade, passed=True, feedback=feedback,
+                needs_ai=False, source="tests", execution=execution
+            )
+
+        if passed_count == 0:
+            first_error = next((r.error for r in execution.test_results if r.error), None)
+            feedback = f"Tu código no superó ninguno de los {total} casos de prueba."
+            if first_error:
+                feedback += f" Primer error: {first_error}"
+            return PreGrade(
+                **base, grade=self.full_fail_grade, passed=False, feedback=feedback,
+                needs_ai=False, source="tests", execution=execution
+            )
+
+        # Partial pass: the tests decide the grade, the LLM explains what is missing
+        grade = round(execution.score or 0.0, 2)
+        return PreGrade(
+            **base, grade=grade, passed=grade >= self.pass_threshold,
+            feedback=f"Tu código superó {passed_count} de {total} casos de prueba.",
+            needs_ai=True, source="tests", execution=execution
+        )
+
+    @staticmethod
+    def is_empty_code(code: Optional[str]) -> bool:
+        for line in (code or "").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and line != "pass":
+                return False
+        return True
@@ -1,10 +1,19 @@
-from src.domain.ai.ports.rag_service import RagServicePort
+from typing import Optional
+from src.domain.ai.ports.rag_service import RagServicePort, FALLBACK_ANSWERS
+from src.domain.ai.ports.answer_cache import AnswerCachePort
 
 class ChatWithDocumentCommand:
-    def __init__(self, rag_service: RagServicePort):
+    def __init__(self, rag_service: RagServicePort, answer_cache: Optional[AnswerCachePort] = None):
         self.rag_service = rag_service
+        self.answer_cache = answer_cache
 
     def execute(self, activity_id: str, query: str) -> str:
+        # 0. Reuse the answer to a near-identical question about the same material
+        if self.answer_cache:
+            cached = self.answer_cache.get("document_chat", activity_id, None, query)
+            if cached is not None:
+                return cached
+
         # 1. Retrieve context
         context_docs = self.rag_service.query(activity_id, query)
         context_text = "\n\n".join(context_docs)
@@ -14,4 +23,7 @@ class ChatWithDocumentCommand:
 
         # 2. Generate Answer (using Ollama)
         # I'll implement a helper in RagService to call Ollama for chat
-        return self.rag_service.generate_answer(query, context_text)
+        answer = self.rag_service.generate_answer(query, context_text)
+        if self.answer_cache and answer not in FALLBACK_ANSWERS:
+            self.answer_cache.put("document_chat", activity_id, None, query, answer)
+        return answer
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from src.application.shared.unit_of_work import UnitOfWork
 from src.domain.learning.ports.exercise_repository import ExerciseRepository
 from src.domain.learning.ports.document_repository import DocumentRepository
@@ -7,6 +7,7 @@ from src.domain.learning.value_objects.difficulty import Difficulty
 from src.domain.learning.value_objects.programming_language import ProgrammingLanguage
 from src.domain.learning.exceptions import ActivityNotFoundException
 from src.application.learning.ports.exercise_generator import IExerciseGenerator
+from src.application.learning.ports.activity_content_cache import ActivityContentCachePort
 from src.application.learning.dtos.generate_exercises_dto import GenerateExercisesRequest, GeneratedExerciseDTO
 
 class GenerateExercises:
@@ -16,13 +17,15 @@ class GenerateExercises:
         exercise_repository: ExerciseRepository,
         activity_repository: ActivityRepository,
         document_repository: DocumentRepository,
-        unit_of_work: UnitOfWork
+        unit_of_work: UnitOfWork,
+        content_cache: Optional[ActivityContentCachePort] = None
     ):
         self.exercise_generator = exercise_generator
         self.exercise_repository = exercise_repository
         self.activity_repository = activity_repository
         self.document_repository = document_repository
         self.unit_of_work = unit_of_work
+        self.content_cache = content_cache
         
     def execute(self, request: GenerateExercisesRequest) -> List[GeneratedExerciseDTO]:
         # 1. Validate activity exists
@@ -78,5 +81,7 @@ class GenerateExercises:
                 ))
             
             self.unit_of_work.commit()
-            
+
+        if self.content_cache:
+            self.content_cache.invalidate_activity(activity.id)
         return result_dtos
@@ -1,11 +1,21 @@
 from src.application.shared.unit_of_work import UnitOfWork
 from src.domain.learning.ports.activity_repository import ActivityRepository
 from src.domain.learning.exceptions import ActivityNotFoundException
+from src.application.learning.ports.student_courses_cache import StudentCoursesCachePort
+from src.application.learning.ports.activity_content_cache import ActivityContentCachePort
 
 class PublishActivityCommand:
-    def __init__(self, activity_repository: ActivityRepository, unit_of_work: UnitOfWork):
+    def __init__(
+        self,
+        activity_repository: ActivityRepository,
+        unit_of_work: UnitOfWork,
+        courses_cache: StudentCoursesCachePort = None,
+        content_cache: ActivityContentCachePort = None
+    ):
         self.activity_repository = activity_repository
         self.unit_of_work = unit_of_work
+        self.courses_cache = courses_cache
+        self.content_cache = content_cache
 
     def execute(self, activity_id: str, course_id: str = None) -> None:
         activity = self.activity_repository.find_by_id(activity_id)
@@ -25,3 +35,7 @@ class PublishActivityCommand:
             self.activity_repository.save(activity)
             self.unit_of_work.commit()
             print("DEBUG: Commit successful.")
+        if self.courses_cache:
+            self.courses_cache.invalidate_all()
+        if self.content_cache:
+            self.content_cache.invalidate_activity(activity_id)
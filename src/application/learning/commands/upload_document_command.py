@@ -1,21 +1,22 @@
 import os
 import shutil
+import uuid
 from typing import BinaryIO
-from src.domain.ai.ports.rag_service import RagServicePort
+from src.application.learning.ports.document_ingestion_queue import IDocumentIngestionQueue, IngestionJob
 
 class UploadDocumentCommand:
-    def __init__(self, rag_service: RagServicePort):
-        self.rag_service = rag_service
+    def __init__(self, ingestion_queue: IDocumentIngestionQueue):
+        self.ingestion_queue = ingestion_queue
         self.upload_dir = "./uploads"
         os.makedirs(self.upload_dir, exist_ok=True)
 
-    def execute(self, activity_id: str, file_obj: BinaryIO, filename: str) -> str:
-        file_path = os.path.join(self.upload_dir, f"{activity_id}_{filename}")
+    def execute(self, activity_id: str, file_obj: BinaryIO, filename: str) -> IngestionJob:
+        # Unique per upload: two uploads of the same file name must not overwrite each
+        # other while the first one is still queued or being ingested
+        stored_name = f"{activity_id}_{uuid.uuid4().hex}_{os.path.basename(filename)}"
+        file_path = os.path.join(self.upload_dir, stored_name)
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file_obj, buffer)
             
-        # Process for RAG
-        self.rag_service.process_document(activity_id, file_path, filename)
-        
-        # Cleanup file? Maybe keep it.
-        return "Document processed successfully"
+        # Process for RAG in the background; the caller polls the job for progress
+        return self.ingestion_queue.enqueue(activity_id, file_path, filename)
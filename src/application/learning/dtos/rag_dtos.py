@@ -1,8 +1,29 @@
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 
 class ChatRequest(BaseModel):
     query: str
 
 class ChatResponse(BaseModel):
     response: str
+
+class UploadDocumentResponse(BaseModel):
+    message: str
+    job_id: str
+    status: str
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    activity_id: str
+    filename: str
+    status: str
+    progress: float
+    pages_total: Optional[int] = None
+    pages_processed: int = 0
+    chunks_indexed: int = 0
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
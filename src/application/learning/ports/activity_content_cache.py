@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+class ActivityContentCachePort(ABC):
+    """
+    Cached read responses of an activity's content (details, exercise list).
+    Writers call these after committing a change to the activity or its exercises.
+    """
+
+    @abstractmethod
+    def invalidate_activity(self, activity_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def invalidate_all(self) -> None:
+        pass
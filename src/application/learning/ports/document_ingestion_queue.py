@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+@dataclass
+class IngestionJob:
+    id: str
+    activity_id: str
+    filename: str
+    status: str = "queued"  # queued | running | completed | failed
+    pages_total: Optional[int] = None
+    pages_processed: int = 0
+    chunks_indexed: int = 0
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if not self.pages_total:
+            return 0.0
+        return round(self.pages_processed / self.pages_total, 3)
+
+class IDocumentIngestionQueue(ABC):
+    """
+    Interface for the background pipeline that turns an uploaded document
+    into embedded chunks, so uploads don't block the HTTP request.
+    """
+
+    @abstractmethod
+    def enqueue(self, activity_id: str, file_path: str, filename: str) -> IngestionJob:
+        pass
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        pass
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+class StudentCoursesCachePort(ABC):
+    """
+    Per-student cache of the course/module tree shown on the student's home.
+    Readers take a token before querying and store with it, so a result computed
+    before an invalidation is never stored after it.
+    """
+
+    @abstractmethod
+    def get(self, student_id: str) -> Tuple[Optional[List[Any]], Any]:
+        """
+        Returns (cached courses or None on a miss, token to pass to `put`).
+        """
+        pass
+
+    @abstractmethod
+    def put(self, student_id: str, courses: List[Any], token: Any) -> None:
+        pass
+
+    @abstractmethod
+    def invalidate_student(self, student_id: str) -> None:
+        """
+        The student's enrollments changed.
+        """
+        pass
+
+    @abstractmethod
+    def invalidate_all(self) -> None:
+        """
+        Published content changed (publish, status change): every student may see it.
+        """
+        pass
+
+    @abstractmethod
+    def metrics(self) -> Dict[str, Any]:
+        pass
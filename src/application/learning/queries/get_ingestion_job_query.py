@@ -0,0 +1,27 @@
+from typing import Optional
+from ..ports.document_ingestion_queue import IDocumentIngestionQueue
+from ..dtos.rag_dtos import IngestionJobResponse
+
+class GetIngestionJobQuery:
+    def __init__(self, ingestion_queue: IDocumentIngestionQueue):
+        self.ingestion_queue = ingestion_queue
+
+    def execute(self, activity_id: str, job_id: str) -> Optional[IngestionJobResponse]:
+        job = self.ingestion_queue.get_job(job_id)
+        if not job or job.activity_id != activity_id:
+            return None
+        return IngestionJobResponse(
+            job_id=job.id,
+            activity_id=job.activity_id,
+            filename=job.filename,
+            status=job.status,
+            progress=job.progress,
+            pages_total=job.pages_total,
+            pages_processed=job.pages_processed,
+            chunks_indexed=job.chunks_indexed,
+            document_id=job.document_id,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at
+        )
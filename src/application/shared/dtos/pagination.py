@@ -1,8 +1,13 @@
+import base64
+import binascii
+import json
 from dataclasses import dataclass
-from typing import TypeVar, Generic, List
+from datetime import datetime
+from typing import TypeVar, Generic, List, Optional, Sequence, Callable, Any
 from .common import DTO
 
 T = TypeVar('T')
+U = TypeVar('U')
 
 @dataclass
 class PaginationRequest(DTO):
@@ -16,3 +21,67 @@ class PagedResult(Generic[T], DTO):
     page: int
     page_size: int
     total_pages: int
+
+@dataclass
+class CursorPage(Generic[T], DTO):
+    """
+    One page of a keyset-paginated list. No total is computed: `next_cursor` is set
+    only when at least one more row exists after `items`.
+    """
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    def map(self, fn: Callable[[T], U]) -> 'CursorPage[U]':
+        return CursorPage(items=[fn(item) for item in self.items], next_cursor=self.next_cursor)
+
+class InvalidCursorError(ValueError):
+    """The cursor was not issued by this API for this list (or was altered)."""
+    pass
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor holding the sort key of the last row of a page."""
+    values = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+    if not isinstance(values, list) or not values:
+        raise InvalidCursorError("Malformed cursor")
+    try:
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in values]
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+
+# Page size when a cursor comes without an explicit limit
+DEFAULT_PAGE_SIZE = 100
+
+def paginate(
+    fetch: Callable[[Optional[List[Any]], Optional[int]], List[T]],
+    key: Callable[[T], Sequence[Any]],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> CursorPage[T]:
+    """
+    Runs `fetch(after, limit)` (rows strictly after the `after` sort key, in key order)
+    asking for one extra row: its presence is the "has more" signal, so no count query.
+    Without `limit` and `cursor` the client is not paging: the whole list is returned.
+    """
+    if limit is None and not cursor:
+        return CursorPage(items=fetch(None, None))
+    limit = limit or DEFAULT_PAGE_SIZE
+    rows = fetch(decode_cursor(cursor), limit + 1)
+    if len(rows) <= limit:
+        return CursorPage(items=rows)
+    items = rows[:limit]
+    return CursorPage(items=items, next_cursor=encode_cursor(key(items[-1])))
@@ -22,3 +22,24 @@ class UnitOfWork(ABC):
     @abstractmethod
     def rollback(self) -> None:
         pass
+
+class AsyncUnitOfWork(ABC):
+    """
+    Async counterpart of UnitOfWork, used with `async with`.
+    """
+
+    @abstractmethod
+    async def __aenter__(self) -> 'AsyncUnitOfWork':
+        pass
+
+    @abstractmethod
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        pass
+
+    @abstractmethod
+    async def commit(self) -> None:
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        pass
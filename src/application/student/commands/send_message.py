@@ -1,13 +1,17 @@
+import asyncio
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, AsyncIterator, Iterator, List, Dict, Any, Callable, Tuple
 from src.application.shared.dtos.common import DTO
-from src.application.shared.unit_of_work import UnitOfWork
-from src.domain.learning.ports.session_repository import SessionRepository
+from src.application.shared.unit_of_work import UnitOfWork, AsyncUnitOfWork
+from src.domain.learning.ports.session_repository import SessionRepository, AsyncSessionRepository
 import uuid
 from src.domain.learning.entities.chat_message import ChatMessage, MessageSender
-from src.domain.ai.ports.rag_service import RagServicePort
+from src.domain.learning.entities.session import LearningSession
+from src.domain.ai.ports.rag_service import RagServicePort, FALLBACK_ANSWERS
+from src.domain.ai.ports.answer_cache import AnswerCachePort
 
 from src.domain.learning.ports.exercise_repository import ExerciseRepository
+from src.domain.learning.entities.exercise import Exercise
 
 @dataclass
 class SendMessageRequest(DTO):
@@ -27,78 +31,312 @@ class SendMessageToTutor:
         session_repository: SessionRepository,
         exercise_repository: ExerciseRepository,
         rag_service: RagServicePort,
-        unit_of_work: UnitOfWork
+        unit_of_work: UnitOfWork,
+        answer_cache: Optional[AnswerCachePort] = None,
+        history_window: int = 5,
+        stream_persistence: Optional[Callable[[], Tuple[SessionRepository, UnitOfWork]]] = None
     ):
         self.session_repository = session_repository
         self.exercise_repository = exercise_repository
         self.rag_service = rag_service
         self.unit_of_work = unit_of_work
+        self.answer_cache = answer_cache
+        # Messages the tutor prompt looks at; older ones are never loaded
+        self.history_window = history_window
+        # A streamed reply is saved after the request's own DB session is gone:
+        # this opens a fresh repository + unit of work for that final write
+        self.stream_persistence = stream_persistence
 
     def execute(self, request: SendMessageRequest) -> TutorMessageDTO:
-        session = self.session_repository.find_by_id(request.session_id)
+        session = self._start_turn(request)
+
+        # A near-identical question on the same exercise skips retrieval and generation
+        ai_response_text = self._cached_answer(session, request)
+        if ai_response_text is None:
+            prompt_args = self._prepare(session, request)
+
+            # 4. Generate AI Response
+            ai_response_text = self.rag_service.generate_tutor_response(**prompt_args)
+            self._remember_answer(session, request, ai_response_text)
+        
+        self._persist_reply(session, ai_response_text)
+        return TutorMessageDTO(content=ai_response_text)
+
+    def execute_stream(self, request: SendMessageRequest) -> Iterator[str]:
+        """
+        Streams the tutor answer token by token.
+        The AI message is persisted when the stream finishes or when the consumer closes
+        the generator early (client disconnected), with whatever text was produced so far.
+        If the LLM fails mid-answer the error propagates and only the student's message
+        is saved: a truncated answer is neither stored as the tutor's reply nor cached.
+        """
+        # Prepared eagerly so "Session not found" is raised before any byte is streamed
+        session = self._start_turn(request)
+        cached = self._cached_answer(session, request)
+        if cached is not None:
+            return self._stream_reply(session, iter([cached]))
+
+        prompt_args = self._prepare(session, request)
+        stream = self.rag_service.stream_tutor_response(**prompt_args)
+        return self._stream_reply(session, stream, request)
+
+    def _stream_reply(
+        self,
+        session: LearningSession,
+        stream: Iterator[str],
+        request: Optional[SendMessageRequest] = None
+    ) -> Iterator[str]:
+        tokens: List[str] = []
+        completed = failed = False
+        try:
+            for token in stream:
+                tokens.append(token)
+                yield token
+            completed = True
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # Stop upstream generation right away if the student disconnected
+            if hasattr(stream, "close"):
+                stream.close()
+            # Only complete answers are reused; a cut-off one is just saved to the chat
+            answer = "" if failed else "".join(tokens)
+            if completed and request is not None:
+                self._remember_answer(session, request, answer)
+            if self.stream_persistence:
+                self._persist_reply(session, answer, *self.stream_persistence())
+            else:
+                self._persist_reply(session, answer)
+
+    def _start_turn(self, request: SendMessageRequest) -> LearningSession:
+        session = self.session_repository.find_by_id_with_recent_messages(request.session_id, self.history_window)
         if not session:
             raise ValueError("Session not found")
 
         # 1. Add User Message
-        user_msg = ChatMessage.create(
-            id=str(uuid.uuid4()),
-            session_id=str(session.id),
-            content=request.message,
-            sender=MessageSender.STUDENT
-        )
-        session.add_message(user_msg)
+        _add_message(session, request.message, MessageSender.STUDENT)
+        return session
 
+    def _prepare(self, session: LearningSession, request: SendMessageRequest) -> Dict[str, Any]:
         # 2. Retrieve Context (RAG) & Exercise Details
-        activity_id = session.activity_id
-        
-        # Retrieve relevant docs
-        docs = self.rag_service.query(activity_id, request.message)
-        context_str = "\n".join(docs)
-        
-        # Retrieve Exercise Details if exercise_id provided
-        problem_statement = ""
-        solution_code = ""
-        
-        if request.exercise_id:
-            exercise = self.exercise_repository.find_by_id(request.exercise_id)
-            if exercise:
-                problem_statement = exercise.problem_statement
-                solution_code = exercise.solution_code or "No solution code provided."
-        
-        # 3. Prepare History
-        history = [
-            {"role": "user" if m.sender == MessageSender.STUDENT else "assistant", "content": m.content}
-            for m in session.messages
-        ]
-        
-        # 4. Generate AI Response
-        ai_response_text = self.rag_service.generate_tutor_response(
-            query=request.message,
-            context=context_str,
-            history=history,
-            code_context=request.code_context,
-            problem_statement=problem_statement,
-            solution_code=solution_code
+        docs = self.rag_service.query(session.activity_id, request.message)
+        exercise = self.exercise_repository.find_by_id(request.exercise_id) if request.exercise_id else None
+        return _prompt_args(session, request, docs, exercise)
+
+    def _cacheable(self, session: LearningSession) -> bool:
+        return _cacheable(self.answer_cache, session)
+
+    def _cached_answer(self, session: LearningSession, request: SendMessageRequest) -> Optional[str]:
+        if not self._cacheable(session):
+            return None
+        return self.answer_cache.get(
+            "tutor", session.activity_id, request.exercise_id, request.message, request.code_context
         )
-        
-        # 5. Add AI Message
-        ai_msg = ChatMessage.create(
-            id=str(uuid.uuid4()),
-            session_id=str(session.id),
-            content=ai_response_text,
-            sender=MessageSender.AI_TUTOR
+
+    def _remember_answer(self, session: LearningSession, request: SendMessageRequest, answer: str) -> None:
+        # Only called once the model finished the answer: failed or cut-off streams never get here
+        if not self._cacheable(session) or not answer or answer in FALLBACK_ANSWERS:
+            return
+        self.answer_cache.put(
+            "tutor", session.activity_id, request.exercise_id, request.message, answer, request.code_context
         )
-        session.add_message(ai_msg)
-        
-        # 6. Save Session (persists messages via Cascade/Repository logic)
+
+    def _persist_reply(
+        self,
+        session: LearningSession,
+        ai_response_text: str,
+        session_repository: Optional[SessionRepository] = None,
+        unit_of_work: Optional[UnitOfWork] = None
+    ) -> None:
+        session_repository = session_repository or self.session_repository
+        unit_of_work = unit_of_work or self.unit_of_work
+        new_messages = _turn_messages(session, ai_response_text)
+
+        # 6. Append only this turn's messages
         try:
-            with self.unit_of_work:
-                self.session_repository.save(session)
-                self.unit_of_work.commit()
+            with unit_of_work:
+                session_repository.append_messages(session, new_messages)
+                unit_of_work.commit()
         except Exception as e:
             import traceback
             print(f"CRITICAL ERROR saving session/messages: {e}")
             traceback.print_exc()
             raise e
-            
+
+class SendMessageToTutorAsync:
+    """
+    SendMessageToTutor for the async route (DB_ASYNC_ENABLED). The session queries and the
+    LLM call are awaited on the event loop, so a slow answer holds no threadpool thread.
+    Retrieval (embedding + Chroma), the cached exercise lookup and the answer cache are
+    sync and CPU-bound; they run in a worker thread.
+    """
+    def __init__(
+        self,
+        session_repository: AsyncSessionRepository,
+        exercise_repository: ExerciseRepository,
+        rag_service: RagServicePort,
+        unit_of_work: AsyncUnitOfWork,
+        answer_cache: Optional[AnswerCachePort] = None,
+        history_window: int = 5,
+        stream_persistence: Optional[Callable[[], Tuple[AsyncSessionRepository, AsyncUnitOfWork]]] = None
+    ):
+        self.session_repository = session_repository
+        self.exercise_repository = exercise_repository
+        self.rag_service = rag_service
+        self.unit_of_work = unit_of_work
+        self.answer_cache = answer_cache
+        self.history_window = history_window
+        self.stream_persistence = stream_persistence
+
+    async def execute(self, request: SendMessageRequest) -> TutorMessageDTO:
+        session = await self._start_turn(request)
+
+        ai_response_text = await self._cached_answer(session, request)
+        if ai_response_text is None:
+            prompt_args = await self._prepare(session, request)
+            ai_response_text = await self.rag_service.generate_tutor_response_async(**prompt_args)
+            await self._remember_answer(session, request, ai_response_text)
+
+        await self._persist_reply(session, ai_response_text)
         return TutorMessageDTO(content=ai_response_text)
+
+    async def execute_stream(self, request: SendMessageRequest) -> AsyncIterator[str]:
+        """
+        Same persistence rules as SendMessageToTutor.execute_stream.
+        """
+        session = await self._start_turn(request)
+        cached = await self._cached_answer(session, request)
+        if cached is not None:
+            return self._stream_reply(session, _single(cached))
+
+        prompt_args = await self._prepare(session, request)
+        stream = self.rag_service.stream_tutor_response_async(**prompt_args)
+        return self._stream_reply(session, stream, request)
+
+    async def _stream_reply(
+        self,
+        session: LearningSession,
+        stream: AsyncIterator[str],
+        request: Optional[SendMessageRequest] = None
+    ) -> AsyncIterator[str]:
+        tokens: List[str] = []
+        completed = failed = False
+        try:
+            async for token in stream:
+                tokens.append(token)
+                yield token
+            completed = True
+        except Exception:
+            failed = True
+            raise
+        finally:
+            await stream.aclose()
+            answer = "" if failed else "".join(tokens)
+            if completed and request is not None:
+                await self._remember_answer(session, request, answer)
+            persistence = self.stream_persistence() if self.stream_persistence else ()
+            # A client disconnect cancels this task: the final write still runs to the end
+            await asyncio.shield(self._persist_reply(session, answer, *persistence))
+
+    async def _start_turn(self, request: SendMessageRequest) -> LearningSession:
+        session = await self.session_repository.find_by_id_with_recent_messages(request.session_id, self.history_window)
+        if not session:
+            raise ValueError("Session not found")
+        _add_message(session, request.message, MessageSender.STUDENT)
+        return session
+
+    async def _prepare(self, session: LearningSession, request: SendMessageRequest) -> Dict[str, Any]:
+        docs = await asyncio.to_thread(self.rag_service.query, session.activity_id, request.message)
+        exercise = None
+        if request.exercise_id:
+            exercise = await asyncio.to_thread(self.exercise_repository.find_by_id, request.exercise_id)
+        return _prompt_args(session, request, docs, exercise)
+
+    async def _cached_answer(self, session: LearningSession, request: SendMessageRequest) -> Optional[str]:
+        if not _cacheable(self.answer_cache, session):
+            return None
+        return await asyncio.to_thread(
+            self.answer_cache.get,
+            "tutor", session.activity_id, request.exercise_id, request.message, request.code_context
+        )
+
+    async def _remember_answer(self, session: LearningSession, request: SendMessageRequest, answer: str) -> None:
+        if not _cacheable(self.answer_cache, session) or not answer or answer in FALLBACK_ANSWERS:
+            return
+        await asyncio.to_thread(
+            self.answer_cache.put,
+            "tutor", session.activity_id, request.exercise_id, request.message, answer, request.code_context
+        )
+
+    async def _persist_reply(
+        self,
+        session: LearningSession,
+        ai_response_text: str,
+        session_repository: Optional[AsyncSessionRepository] = None,
+        unit_of_work: Optional[AsyncUnitOfWork] = None
+    ) -> None:
+        session_repository = session_repository or self.session_repository
+        unit_of_work = unit_of_work or self.unit_of_work
+        new_messages = _turn_messages(session, ai_response_text)
+        try:
+            async with unit_of_work:
+                await session_repository.append_messages(session, new_messages)
+        except Exception as e:
+            import traceback
+            print(f"CRITICAL ERROR saving session/messages: {e}")
+            traceback.print_exc()
+            raise e
+
+def _add_message(session: LearningSession, content: str, sender: MessageSender) -> ChatMessage:
+    message = ChatMessage.create(
+        id=str(uuid.uuid4()),
+        session_id=str(session.id),
+        content=content,
+        sender=sender
+    )
+    session.add_message(message)
+    return message
+
+def _turn_messages(session: LearningSession, ai_response_text: str) -> List[ChatMessage]:
+    # The student message added by _start_turn is still the last one
+    new_messages = [session.messages[-1]]
+    # 5. Add AI Message (skipped if a stream was cancelled before the first token or failed)
+    if ai_response_text:
+        new_messages.append(_add_message(session, ai_response_text, MessageSender.AI_TUTOR))
+    return new_messages
+
+def _prompt_args(
+    session: LearningSession,
+    request: SendMessageRequest,
+    docs: List[str],
+    exercise: Optional[Exercise]
+) -> Dict[str, Any]:
+    problem_statement = ""
+    solution_code = ""
+    if exercise:
+        problem_statement = exercise.problem_statement
+        solution_code = exercise.solution_code or "No solution code provided."
+
+    # 3. Prepare History
+    history = [
+        {"role": "user" if m.sender == MessageSender.STUDENT else "assistant", "content": m.content}
+        for m in session.messages
+    ]
+
+    return {
+        "query": request.message,
+        "context": "\n".join(docs),
+        "history": history,
+        "code_context": request.code_context,
+        "problem_statement": problem_statement,
+        "solution_code": solution_code
+    }
+
+def _cacheable(answer_cache: Optional[AnswerCachePort], session: LearningSession) -> bool:
+    # The prompt includes the chat history, which the cache key doesn't: only answers
+    # to an opening question (the student message just added is the only one) are shared
+    return answer_cache is not None and len(session.messages) <= 1
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
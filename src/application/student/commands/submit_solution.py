@@ -6,10 +6,13 @@ from src.domain.learning.ports.exercise_repository import ExerciseRepository
 from src.domain.grading.ports.submission_repository import SubmissionRepository
 from src.domain.grading.ports.code_executor import CodeExecutor
 from src.domain.grading.ports.ai_auditor import IAiAuditor
+from src.domain.grading.ports.activity_progress_projection import ActivityProgressProjection
 from src.domain.grading.entities.submission import Submission
 from src.domain.grading.entities.exercise_attempt import ExerciseAttempt
 from src.domain.grading.value_objects.score import Score
 from src.domain.grading.value_objects.execution_result import ExecutionResult
+from src.application.grading.dtos.submit_exercise_dto import test_results_to_dicts
+from src.application.grading.services.pre_grader import PreGrader, PreGrade, PENDING_REVIEW_FEEDBACK, MISSING_EXERCISE_FEEDBACK
 
 @dataclass
 class SubmitSolutionRequest(DTO):
@@ -37,13 +40,17 @@ class SubmitSolution:
         exercise_repository: ExerciseRepository,
         code_executor: CodeExecutor,
         ai_auditor: IAiAuditor,
-        unit_of_work: UnitOfWork
+        unit_of_work: UnitOfWork,
+        pre_grader: Optional[PreGrader] = None,
+        progress_projection: Optional[ActivityProgressProjection] = None
     ):
         self.submission_repository = submission_repository
         self.exercise_repository = exercise_repository
         self.code_executor = code_executor
         self.ai_auditor = ai_auditor
         self.unit_of_work = unit_of_work
+        self.pre_grader = pre_grader or PreGrader(code_executor)
+        self.progress_projection = progress_projection
 
     def execute(self, request: SubmitSolutionRequest) -> SubmitSolutionResponse:
         # 1. Execute Code (if single exercise)
@@ -64,7 +71,11 @@ class SubmitSolution:
                      "stdout": exec_res.stdout,
                      "stderr": exec_res.stderr,
                      "error": exec_res.error,
-                     "success": exec_res.is_success
+                     "success": exec_res.is_success,
+                     "score": exec_res.score,
+                     "tests_passed": exec_res.tests_passed,
+                     "tests_total": exec_res.tests_total,
+                     "test_results": test_results_to_dicts(exec_res.test_results)
                  }
         
         # 2. Handle Final Submission (Audit)
@@ -73,23 +84,12 @@ class SubmitSolution:
         audit_details = {}
 
         if request.is_final_submission and request.all_exercise_codes:
-            exercises_to_audit = []
-            for ex_id, code in request.all_exercise_codes.items():
-                ex = self.exercise_repository.find_by_id(ex_id)
-                if ex:
-                    exercises_to_audit.append({
-                        "id": ex.id,
-                        "title": ex.title,
-                        "difficulty": ex.difficulty.value,
-                        "code": code,
-                        "passed": True # Assumption
-                    })
-            
-            audit_result = self.ai_auditor.audit_activity(exercises_to_audit)
-            final_grade = int(audit_result.get("final_grade", 0))
-            final_feedback = audit_result.get("general_feedback", "")
-            # Ensure details contains the full audit structure for frontend
-            audit_details = audit_result
+            audit_details = self._grade_final_submission(request)
+            # None: an exercise is pending manual review, the submission can't be graded yet
+            final_grade = audit_details.get("final_grade")
+            if final_grade is not None:
+                final_grade = int(final_grade)
+            final_feedback = audit_details.get("general_feedback", "")
 
         # 3. Save Submission
         with self.unit_of_work:
@@ -102,6 +102,8 @@ class SubmitSolution:
                      student_id=request.student_id
                  )
              
+             new_attempts: List[ExerciseAttempt] = []
+
              # Record individual attempt (Manual Run)
              if request.exercise_id and exec_res:
                  attempt = ExerciseAttempt(
@@ -111,6 +113,7 @@ class SubmitSolution:
                      passed=passed
                  )
                  submission.add_attempt(attempt)
+                 new_attempts.append(attempt)
 
              # Implement Final Submission Attempts from Audit
              if request.is_final_submission and audit_details:
@@ -123,7 +126,7 @@ class SubmitSolution:
                      # If not, we skip or log? 
                      # For MVP, assuming ID is present as we added it to prompt.
                      
-                     if ex_id:
+                     if ex_id and ex_audit.get("graded_by") != "missing":
                          # Create execution result from feedback
                          audit_exec_res = ExecutionResult(
                              stdout=ex_audit.get("feedback", ""),
@@ -133,21 +136,31 @@ class SubmitSolution:
                          )
                          
                          code_for_ex = request.all_exercise_codes.get(ex_id, "") if request.all_exercise_codes else ""
+                         ex_grade = ex_audit.get("grade", 0)
                          
                          graded_attempt = ExerciseAttempt(
                              exercise_id=ex_id,
                              code_submitted=code_for_ex,
                              result=audit_exec_res,
                              passed=ex_audit.get("passed", False),
-                             grade=float(ex_audit.get("grade", 0))
+                             # Pending manual review: the attempt keeps the code, without a grade
+                             grade=float(ex_grade) if ex_grade is not None else None
                          )
                          submission.add_attempt(graded_attempt)
+                         new_attempts.append(graded_attempt)
 
              # Update final grade if audited
              if request.is_final_submission:
-                 submission.grade(Score(float(final_grade)))
+                 if final_grade is None:
+                     # Handed in but not graded: the previous grade, if any, stands until the review
+                     submission.submit()
+                     final_grade = int(submission.score.value) if submission.score else 0
+                 else:
+                     submission.grade(Score(float(final_grade)))
              
              self.submission_repository.save(submission)
+             if self.progress_projection:
+                 self.progress_projection.apply(submission, new_attempts)
              self.unit_of_work.commit()
              
              # TRIGGER ASYNC RISK ANALYSIS
@@ -171,3 +184,88 @@ class SubmitSolution:
             execution=execution_dict,
             details=audit_details
         )
+
+    def _grade_final_submission(self, request: SubmitSolutionRequest) -> Dict[str, Any]:
+        """
+        Pre-grades every exercise with its test cases and only sends the ambiguous
+        ones (partial pass, or no test cases) to the AI auditor.
+        Returns the auditor's structure: final_grade, general_feedback, exercises_audit,
+        plus `pending_review`: exercises without test cases the auditor could not grade.
+        While any is pending, final_grade is None.
+        Code sent for an exercise that no longer exists counts as a 0.
+        """
+        pre_grades: List[PreGrade] = []
+        exercises = self.exercise_repository.find_by_ids(list(request.all_exercise_codes))
+        for ex in exercises:
+            pre_grades.append(self.pre_grader.grade(ex, request.all_exercise_codes[ex.id], request.language))
+        found = {str(ex.id) for ex in exercises}
+        missing = [ex_id for ex_id in request.all_exercise_codes if str(ex_id) not in found]
+
+        ambiguous = [pg for pg in pre_grades if pg.needs_ai]
+        ai_result: Dict[str, Any] = {}
+        if ambiguous:
+            print(f"--- [SubmitSolution] {len(pre_grades) - len(ambiguous)} exercises graded by tests, {len(ambiguous)} sent to the AI auditor ---")
+            ai_result = self.ai_auditor.audit_activity([pg.to_audit_input() for pg in ambiguous])
+        ai_by_id = self._match_audit_entries(ambiguous, ai_result.get("exercises_audit"))
+
+        exercises_audit = []
+        for pg in pre_grades:
+            entry = pg.to_audit_entry()
+            ai_entry = ai_by_id.get(str(pg.exercise_id))
+            if pg.needs_ai and ai_entry:
+                entry["feedback"] = ai_entry.get("feedback", entry["feedback"])
+                if pg.grade is None:
+                    # No test cases: the auditor's grade is all we have
+                    entry["grade"] = float(ai_entry.get("grade", 0))
+                    entry["passed"] = bool(ai_entry.get("passed", entry["grade"] >= self.pre_grader.pass_threshold))
+            elif pg.grade is None:
+                # The auditor failed: only it could grade this one, so a teacher has to
+                entry.update(grade=None, feedback=PENDING_REVIEW_FEEDBACK, graded_by="pending_review")
+            exercises_audit.append(entry)
+        for ex_id in missing:
+            exercises_audit.append({
+                "exercise_id": ex_id, "title": "", "grade": 0.0, "passed": False,
+                "feedback": MISSING_EXERCISE_FEEDBACK, "graded_by": "missing", "score": None
+            })
+
+        pending_review = [e["exercise_id"] for e in exercises_audit if e["grade"] is None]
+        grades = [float(e["grade"]) for e in exercises_audit if e["grade"] is not None]
+        final_grade = None
+        if not pending_review:
+            final_grade = round(sum(grades) / len(grades), 2) if grades else 0
+        general_feedback = ai_result.get("general_feedback") or self._summary_feedback(exercises_audit)
+        if pending_review:
+            general_feedback = f"{general_feedback} {len(pending_review)} ejercicio(s) quedan pendientes de revisión manual.".strip()
+        return {
+            "final_grade": final_grade,
+            "general_feedback": general_feedback,
+            "exercises_audit": exercises_audit,
+            "pending_review": pending_review
+        }
+
+    def _match_audit_entries(self, ambiguous: List[PreGrade], audit: Any) -> Dict[str, Dict[str, Any]]:
+        """
+        Auditor entries keyed by exercise id. The model is asked to echo each ID, but an
+        entry with an unknown ID (e.g. "1", the exercise's number) is matched by its
+        position, since exercises are sent and returned in the same order.
+        """
+        if not isinstance(audit, list):
+            return {}
+        known = {pg.exercise_id for pg in ambiguous}
+        matched: Dict[str, Dict[str, Any]] = {}
+        for position, entry in enumerate(audit):
+            if not isinstance(entry, dict):
+                continue
+            exercise_id = str(entry.get("exercise_id"))
+            if exercise_id not in known:
+                if position >= len(ambiguous):
+                    continue
+                exercise_id = ambiguous[position].exercise_id
+            matched.setdefault(exercise_id, entry)
+        return matched
+
+    def _summary_feedback(self, exercises_audit: List[Dict[str, Any]]) -> str:
+        if not exercises_audit:
+            return ""
+        passed = sum(1 for e in exercises_audit if e.get("passed"))
+        return f"Resolviste correctamente {passed} de {len(exercises_audit)} ejercicios según sus casos de prueba."
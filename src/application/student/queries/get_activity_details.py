@@ -39,7 +39,8 @@ class GetActivityDetails:
         if not activity:
             return None
             
-        exercises = self.exercise_repository.list_by_activity(activity_id)
+        # Summary columns only: students never get the reference solution or test cases
+        exercises = self.exercise_repository.list_summaries_by_activity(activity_id)
         
         # Sort exercises by title (Entity does not have order field yet)
         exercises.sort(key=lambda x: x.title)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional
 from src.application.shared.dtos.common import DTO
+from src.application.shared.dtos.pagination import CursorPage, paginate
 from src.domain.learning.ports.activity_repository import ActivityRepository
 
 @dataclass
@@ -15,17 +16,19 @@ class ListStudentActivities:
     def __init__(self, activity_repository: ActivityRepository):
         self.activity_repository = activity_repository
 
-    def execute(self, student_id: str) -> List[ActivitySummaryDTO]:
+    def execute(self, student_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> CursorPage[ActivitySummaryDTO]:
         # Logic: Get published activities visible to student
         # For MVP, maybe just return all published activities?
-        activities = self.activity_repository.find_all_published()
-        return [
-            ActivitySummaryDTO(
-                activity_id=a.id,
-                title=a.title,
-                description=a.description,
-                difficulty="intermediate", # Default for activity summary
-                status=a.status.value
-            )
-            for a in activities
-        ]
+        page = paginate(
+            lambda after, size: self.activity_repository.find_all_published(limit=size, after=after),
+            lambda a: (a.created_at, a.id),
+            limit,
+            cursor
+        )
+        return page.map(lambda a: ActivitySummaryDTO(
+            activity_id=a.id,
+            title=a.title,
+            description=a.description,
+            difficulty="intermediate", # Default for activity summary
+            status=a.status.value
+        ))
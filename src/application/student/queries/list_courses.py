@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict
 from src.application.shared.dtos.common import DTO
 from src.domain.learning.ports.activity_repository import ActivityRepository
-from src.domain.academic.ports.enrollment_repository import EnrollmentRepository
+from src.application.learning.ports.student_courses_cache import StudentCoursesCachePort
 
 logger = logging.getLogger(__name__)
 
@@ -31,39 +31,34 @@ class CourseSummaryDTO(DTO):
     modules: List[ModuleSummaryDTO]
 
 class ListStudentCourses:
-    def __init__(self, activity_repository: ActivityRepository, enrollment_repository: EnrollmentRepository):
+    def __init__(self, activity_repository: ActivityRepository, courses_cache: Optional[StudentCoursesCachePort] = None):
         self.activity_repository = activity_repository
-        self.enrollment_repository = enrollment_repository
+        self.courses_cache = courses_cache
 
     def execute(self, student_id: str) -> List[CourseSummaryDTO]:
         """
         List all courses/modules for a student based on Enrollments.
         Only returns modules the student is actively enrolled in.
         """
+        token = None
+        if self.courses_cache:
+            cached, token = self.courses_cache.get(student_id)
+            if cached is not None:
+                return cached
+
         logger.info(f"Listing courses for student: {student_id}")
-        
-        # 1. Get enrollments for the student
-        enrollments = self.enrollment_repository.list_by_student(student_id)
-        enrolled_module_ids = {e.module_id for e in enrollments if e.module_id}
-        
-        logger.info(f"Found {len(enrollments)} enrollments, modules: {enrolled_module_ids}")
 
-        if not enrolled_module_ids:
-            return []
+        # Enrolled published modules with their published activities, one query
+        enrolled_modules = self.activity_repository.list_enrolled_modules(student_id)
+        logger.info(f"Found {len(enrolled_modules)} enrolled modules")
 
-        # 2. Get all published modules and filter by enrollment
-        all_activities = self.activity_repository.find_all_published()
-        modules = [
-            a for a in all_activities 
-            if a.type.value == "module" and a.id in enrolled_module_ids
-        ]
-        
         # Group by "Parent Course"
         courses_map: Dict[str, CourseSummaryDTO] = {}
-        
-        for module in modules:
+
+        for enrolled in enrolled_modules:
+            module = enrolled.module
             course_id = module.course_id
-            
+
             if course_id not in courses_map:
                 # Placeholder Course logic
                 courses_map[course_id] = CourseSummaryDTO(
@@ -73,13 +68,7 @@ class ListStudentCourses:
                     semester="1",
                     modules=[]
                 )
-            
-            # Get activities for the module
-            activities_in_module = self.activity_repository.list_by_course(module.id)
-            
-            # Filter published and map to DTO
-            published_activities = [a for a in activities_in_module if a.status.value == "published"]
-            
+
             activity_dtos = [
                 ActivitySummaryDTO(
                     activity_id=a.id,
@@ -88,7 +77,7 @@ class ListStudentCourses:
                     difficulty="intermediate", # Default or extract from description/metadata keys
                     status=a.status.value
                 )
-                for a in published_activities
+                for a in enrolled.activities
             ]
 
             courses_map[course_id].modules.append(ModuleSummaryDTO(
@@ -97,5 +86,8 @@ class ListStudentCourses:
                 activity_count=len(activity_dtos),
                 activities=activity_dtos
             ))
-        
-        return list(courses_map.values())
+
+        courses = list(courses_map.values())
+        if self.courses_cache:
+            self.courses_cache.put(student_id, courses, token)
+        return courses
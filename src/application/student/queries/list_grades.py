@@ -1,9 +1,11 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional
 from src.application.shared.dtos.common import DTO
+from src.application.shared.dtos.pagination import CursorPage, paginate
 from sqlalchemy.orm import Session
 from src.infrastructure.persistence.models.grading_models import SubmissionModel
 from src.infrastructure.persistence.models.learning_models import ActivityModel
+from src.infrastructure.persistence.keyset import keyset
 
 @dataclass
 class GradeDTO(DTO):
@@ -20,27 +22,35 @@ class ListStudentGrades:
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
-    def execute(self, student_id: str) -> List[GradeDTO]:
-        # Join Submission and Activity
-        results = (
+    def execute(self, student_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> CursorPage[GradeDTO]:
+        page = paginate(
+            lambda after, size: self._fetch(student_id, after, size),
+            lambda row: (row[0].created_at, row[0].id),
+            limit,
+            cursor
+        )
+        return page.map(lambda row: self._to_dto(*row))
+
+    def _fetch(self, student_id: str, after, limit: Optional[int]):
+        # Join Submission and Activity, newest first (ix_submissions_student_created)
+        query = (
             self.db_session.query(SubmissionModel, ActivityModel)
             .join(ActivityModel, SubmissionModel.activity_id == ActivityModel.id)
             .filter(SubmissionModel.student_id == student_id)
             .filter(SubmissionModel.final_score.isnot(None)) # Only graded ones
-            .all()
         )
-        
-        grades = []
-        for sub, act in results:
-            grades.append(GradeDTO(
-                grade_id=sub.id,
-                activity_id=act.id,
-                grade=sub.final_score if sub.final_score is not None else 0.0,
-                activity_title=act.title,
-                passed=(sub.final_score if sub.final_score is not None else 0.0) >= 60, # Business rule assumption
-                course_name=act.course_id, # Or join with Course if needed
-                max_grade=100,
-                teacher_feedback="Evaluación completada" # Placeholder or fetch from somewhere
-            ))
-            
-        return grades
+        query = keyset(query, [SubmissionModel.created_at, SubmissionModel.id], after, limit, descending=True)
+        return query.all()
+
+    @staticmethod
+    def _to_dto(sub: SubmissionModel, act: ActivityModel) -> GradeDTO:
+        return GradeDTO(
+            grade_id=sub.id,
+            activity_id=act.id,
+            grade=sub.final_score if sub.final_score is not None else 0.0,
+            activity_title=act.title,
+            passed=(sub.final_score if sub.final_score is not None else 0.0) >= 60, # Business rule assumption
+            course_name=act.course_id, # Or join with Course if needed
+            max_grade=100,
+            teacher_feedback="Evaluación completada" # Placeholder or fetch from somewhere
+        )
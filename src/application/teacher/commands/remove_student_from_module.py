@@ -1,13 +1,18 @@
 from dataclasses import dataclass
+from typing import Optional
 from src.domain.learning.ports.activity_repository import ActivityRepository
 from src.application.shared.unit_of_work import UnitOfWork
+from src.application.learning.ports.student_courses_cache import StudentCoursesCachePort
 
 @dataclass
 class RemoveStudentFromModuleCommand:
     activity_repository: ActivityRepository
     unit_of_work: UnitOfWork
+    courses_cache: Optional[StudentCoursesCachePort] = None
 
     def execute(self, module_id: str, student_id: str) -> None:
         with self.unit_of_work:
             self.activity_repository.remove_student_from_module(module_id, student_id)
             self.unit_of_work.commit()
+        if self.courses_cache:
+            self.courses_cache.invalidate_student(student_id)
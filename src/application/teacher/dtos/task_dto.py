@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+class BackgroundTaskResponse(BaseModel):
+    task_id: str
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    payload: Dict[str, Any] = {}
+    last_error: Optional[str] = None
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
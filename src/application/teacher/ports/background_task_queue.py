@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+@dataclass
+class BackgroundTask:
+    id: str
+    kind: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    dedup_key: Optional[str] = None
+    status: str = "pending"  # pending | running | completed | failed
+    attempts: int = 0
+    max_attempts: int = 3
+    last_error: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+class IBackgroundTaskQueue(ABC):
+    """
+    Interface for the persistent queue of slow background work (e.g. LLM risk
+    analysis, document ingestion), so it survives restarts and is processed at a bounded rate.
+    """
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedup_key: Optional[str] = None) -> BackgroundTask:
+        pass
+
+    @abstractmethod
+    def get_task(self, task_id: str) -> Optional[BackgroundTask]:
+        pass
+
+    @abstractmethod
+    def find_by_dedup_key(self, dedup_key: str) -> Optional[BackgroundTask]:
+        pass
@@ -1,10 +1,13 @@
+from datetime import datetime
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
-from src.infrastructure.persistence.models.learning_models import ActivityModel, SessionModel
+from src.domain.learning.ports.exercise_repository import ExerciseRepository
+from src.infrastructure.persistence.models.learning_models import ActivityModel
 from src.infrastructure.persistence.models.academic_models import EnrollmentModel
 from src.infrastructure.persistence.models.user_models import UserModel
-from src.infrastructure.persistence.models.grading_models import SubmissionModel
+from src.infrastructure.persistence.models.grading_models import ActivityProgressModel
 
 class StudentActivityProgressDTO(BaseModel):
     student_id: str
@@ -15,85 +18,76 @@ class StudentActivityProgressDTO(BaseModel):
     avg_score: float
     progress_percentage: float
     status: str 
+    passed_exercises: int = 0
+    attempts: int = 0
+    best_grade: Optional[float] = None
+    last_activity_at: Optional[datetime] = None
 
 class GetActivityStudentsProgress:
-    def __init__(self, db: Session):
+    """
+    Reads the `activity_progress` projection (maintained on every submission save)
+    joined to the module's enrolled students: one row per student, no aggregation.
+    """
+    def __init__(self, db: Session, exercise_repository: ExerciseRepository):
         self.db = db
+        self.exercise_repository = exercise_repository
 
     def execute(self, activity_id: str) -> List[StudentActivityProgressDTO]:
-        # ... (rest of the code is implicitly matched by context if I don't replace it all, but let's be safe and replace the class and execute method or just the DTO and the append part)
-        
         # 1. Get Activity
         activity = self.db.query(ActivityModel).filter_by(id=activity_id).first()
         if not activity:
             return []
 
-        # 2. Get Students Enrolled
+        # 2. Students enrolled in the module, with their progress row (if any)
         target_module_id = activity.course_id 
         if activity.type == 'module':
              target_module_id = activity.id
-             
-        enrollments = (
-            self.db.query(EnrollmentModel)
-            .filter_by(module_id=target_module_id)
-            .all()
-        )
-        
-        student_ids = [e.student_id for e in enrollments]
-        if not student_ids:
-            return []
 
-        students = self.db.query(UserModel).filter(UserModel.id.in_(student_ids)).all()
-        student_map = {s.id: s for s in students}
-        
-        # 3. Get Submissions
-        submissions = (
-            self.db.query(SubmissionModel)
-            .filter(
-                SubmissionModel.activity_id == activity_id,
-                SubmissionModel.student_id.in_(student_ids)
+        rows = (
+            self.db.query(UserModel.id, UserModel.email, UserModel.full_name, ActivityProgressModel)
+            .join(EnrollmentModel, EnrollmentModel.student_id == UserModel.id)
+            .outerjoin(
+                ActivityProgressModel,
+                and_(
+                    ActivityProgressModel.student_id == UserModel.id,
+                    ActivityProgressModel.activity_id == activity_id
+                )
             )
+            .filter(EnrollmentModel.module_id == target_module_id)
+            .order_by(UserModel.full_name, UserModel.id)
             .all()
         )
-        
-        submission_map = {s.student_id: s for s in submissions}
-        
-        # 4. Build Result
+        if not rows:
+            return []
+
+        total = self.exercise_repository.count_by_activity(activity_id)
+
+        # 3. Build Result
         results = []
-        for student_id in student_ids:
-            student = student_map.get(student_id)
-            if not student: 
-                continue
-                
-            submission = submission_map.get(student_id)
-            
-            # Default values
-            submitted = 0
-            avg = 0.0
-            status = 'not_started'
-            
-            if submission:
-                status = submission.status
-                avg = submission.final_score if submission.final_score else 0.0
-                
-                if status in ['submitted', 'graded', 'pending', 'completed']:
-                     submitted = 1 
-                elif status == 'in_progress':
-                     submitted = 0
-            
-            # Calculate progress
-            total = 1 # TODO: Get real exercise count
-            progress = (submitted / total) * 100 if total > 0 else 0.0
+        seen = set()
+        for student_id, email, full_name, progress in rows:
+            if student_id in seen:
+                continue  # enrolled twice in the same module
+            seen.add(student_id)
+
+            attempted = progress.exercises_attempted if progress else 0
+            score = 0.0
+            if progress:
+                score = progress.final_score if progress.final_score is not None else (progress.best_grade or 0.0)
 
             results.append(StudentActivityProgressDTO(
-                student_id=student.id,
-                email=student.email or "",
-                full_name=student.full_name or "Sin Nombre",
+                student_id=student_id,
+                email=email or "",
+                full_name=full_name or "Sin Nombre",
                 total_exercises=total,
-                submitted_exercises=submitted, 
-                avg_score=avg,
-                progress_percentage=progress,
-                status=status
+                submitted_exercises=attempted,
+                avg_score=score,
+                progress_percentage=round(min(attempted, total) / total * 100, 2) if total else 0.0,
+                status=progress.status if progress and progress.status else 'not_started',
+                passed_exercises=progress.exercises_passed if progress else 0,
+                attempts=progress.attempts_count if progress else 0,
+                best_grade=progress.best_grade if progress else None,
+                last_activity_at=progress.last_activity_at if progress else None
             ))
             
         return results
@@ -0,0 +1,30 @@
+from typing import Optional
+from ..ports.background_task_queue import IBackgroundTaskQueue, BackgroundTask
+from ..dtos.task_dto import BackgroundTaskResponse
+
+class GetBackgroundTaskQuery:
+    def __init__(self, task_queue: IBackgroundTaskQueue):
+        self.task_queue = task_queue
+
+    def execute(self, task_id: str) -> Optional[BackgroundTaskResponse]:
+        return self.to_response(self.task_queue.get_task(task_id))
+
+    def execute_by_dedup_key(self, dedup_key: str) -> Optional[BackgroundTaskResponse]:
+        return self.to_response(self.task_queue.find_by_dedup_key(dedup_key))
+
+    def to_response(self, task: Optional[BackgroundTask]) -> Optional[BackgroundTaskResponse]:
+        if not task:
+            return None
+        return BackgroundTaskResponse(
+            task_id=task.id,
+            kind=task.kind,
+            status=task.status,
+            attempts=task.attempts,
+            max_attempts=task.max_attempts,
+            payload=task.payload,
+            last_error=task.last_error,
+            run_after=task.run_after,
+            created_at=task.created_at,
+            started_at=task.started_at,
+            finished_at=task.finished_at
+        )
@@ -1,8 +1,8 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Optional
 from src.domain.learning.ports.activity_repository import ActivityRepository
 from src.domain.identity.ports.user_repository import UserRepository
-from src.domain.identity.value_objects.user_id import UserId
+from src.application.shared.dtos.pagination import CursorPage, paginate
 from src.application.teacher.dtos.student_dto import StudentDTO
 
 @dataclass
@@ -10,17 +10,23 @@ class GetModuleStudentsQuery:
     activity_repository: ActivityRepository
     user_repository: UserRepository
 
-    def execute(self, module_id: str) -> List[StudentDTO]:
-        student_ids = self.activity_repository.get_assigned_students(module_id)
-        students = []
-        for sid in student_ids:
-            user = self.user_repository.find_by_id(UserId(sid))
-            if user:
-                students.append(StudentDTO(
-                    user_id=user.id.value,
-                    full_name=user.full_name or "Unknown",
-                    email=user.email.address,
-                    role="student",
-                    status="active"
-                ))
-        return students
+    def execute(self, module_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> CursorPage[StudentDTO]:
+        page = paginate(
+            lambda after, size: self.activity_repository.get_assigned_students(module_id, limit=size, after=after),
+            lambda sid: (sid,),
+            limit,
+            cursor
+        )
+        # One lookup for the whole page; enrolled ids without a user are skipped as before
+        users = {u.id.value: u for u in self.user_repository.find_by_ids(page.items)}
+        students = [
+            StudentDTO(
+                user_id=user.id.value,
+                full_name=user.full_name or "Unknown",
+                email=user.email.address,
+                role="student",
+                status="active"
+            )
+            for user in (users.get(sid) for sid in page.items) if user
+        ]
+        return CursorPage(items=students, next_cursor=page.next_cursor)
@@ -1,9 +1,27 @@
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 from src.domain.grading.ports.submission_read_repository import SubmissionReadRepository, StudentActivityDetailsDTO
 
+# (chat_history, code_submitted, final_grade) -> risk analysis dict
+RiskEstimator = Callable[[List[Dict[str, str]], str, float], Dict[str, Any]]
+
 class GetStudentActivityDetails:
-    def __init__(self, repository: SubmissionReadRepository):
+    def __init__(self, repository: SubmissionReadRepository, risk_estimator: Optional[RiskEstimator] = None):
         self.repository = repository
+        self.risk_estimator = risk_estimator
 
     def execute(self, activity_id: str, student_id: str) -> Optional[StudentActivityDetailsDTO]:
-        return self.repository.get_student_activity_details(activity_id, student_id)
+        details = self.repository.get_student_activity_details(activity_id, student_id)
+        return self._with_risk_estimate(details) if details else None
+
+    def execute_for_activity(self, activity_id: str, student_ids: Optional[List[str]] = None) -> List[StudentActivityDetailsDTO]:
+        """Every student's details in one batch instead of one request per student."""
+        return [
+            self._with_risk_estimate(details)
+            for details in self.repository.get_activity_details_for_students(activity_id, student_ids)
+        ]
+
+    def _with_risk_estimate(self, details: StudentActivityDetailsDTO) -> StudentActivityDetailsDTO:
+        # Until the background analysis is stored, show an instant rule-based estimate
+        if details.risk_analysis is None and details.final_submitted and self.risk_estimator:
+            details.risk_analysis = self.risk_estimator(details.chat_history, details.code_submitted, details.final_grade)
+        return details
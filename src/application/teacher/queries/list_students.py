@@ -1,57 +1,43 @@
-from dataclasses import dataclass, field
-from typing import List
+from dataclasses import dataclass
+from typing import Optional
 from src.application.shared.dtos.common import DTO
-from src.domain.identity.ports.user_repository import UserRepository
-from src.domain.grading.ports.submission_repository import SubmissionRepository
-from src.domain.learning.ports.session_repository import SessionRepository
+from src.application.shared.dtos.pagination import CursorPage, paginate
+from src.domain.grading.ports.student_risk_read_repository import StudentRiskReadRepository
 
 @dataclass
 class StudentRiskDTO(DTO):
     student_id: str
     email: str
     full_name: str
-    risk_level: str # LOW, MEDIUM, HIGH
+    risk_level: str # LOW, MEDIUM, HIGH, CRITICAL
     average_grade: float
-    last_active: str
+    last_active: str # ISO timestamp of the last session, "" if never
+    risk_score: Optional[int] = None # None until a risk analysis exists
 
 class ListStudentsWithRisk:
-    def __init__(
-        self,
-        user_repository: UserRepository,
-        submission_repository: SubmissionRepository,
-        session_repository: SessionRepository
-    ):
-        self.user_repository = user_repository
-        self.submission_repository = submission_repository
-        self.session_repository = session_repository
+    def __init__(self, repository: StudentRiskReadRepository):
+        self.repository = repository
 
-    def execute(self) -> List[StudentRiskDTO]:
-        students = self.user_repository.find_all_by_role("student")
-        result = []
-        
-        for student in students:
-            # Calculate Risk
-            # 1. Get submissions for student
-            # needed: submission_repo.list_by_student(student.id)
-            # Not implemented in SubmissionRepo interface yet! I should add it.
-            # Assuming exist list_by_student(student_id)
-            # submissions = self.submission_repository.list_by_student(str(student.id))
-            
-            # Simple fallback if not implemented:
-            current_risk = "LOW"
-            avg = 0.0
-            
-            # 2. Check last active session
-            # sessions = self.session_repository.list_by_student(str(student.id))
-            # ...
-            
-            result.append(StudentRiskDTO(
-                student_id=str(student.id),
-                email=student.email.address,
-                full_name=student.full_name or "",
-                risk_level=current_risk,
-                average_grade=avg,
-                last_active="Today"
-            ))
-            
-        return result
+    def execute(
+        self,
+        course_id: Optional[str] = None,
+        module_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> CursorPage[StudentRiskDTO]:
+        page = paginate(
+            lambda after, size: self.repository.list_students(course_id, module_id, size, after),
+            lambda s: (s.full_name or "", s.student_id),
+            limit,
+            cursor
+        )
+        return page.map(lambda s: StudentRiskDTO(
+            student_id=s.student_id,
+            email=s.email,
+            full_name=s.full_name or "",
+            # Students never analyzed keep the previous default
+            risk_level=s.risk_level or "LOW",
+            average_grade=round(s.average_grade, 2) if s.average_grade is not None else 0.0,
+            last_active=s.last_active_at.isoformat() if s.last_active_at else "",
+            risk_score=s.risk_score
+        ))
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any
+
+class AnswerCachePort(ABC):
+    @abstractmethod
+    def get(
+        self,
+        kind: str,
+        activity_id: str,
+        exercise_id: Optional[str],
+        query: str,
+        code_context: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Returns a previously generated answer for a semantically equivalent question
+        in the same activity/exercise, or None on a miss.
+        """
+        pass
+
+    @abstractmethod
+    def put(
+        self,
+        kind: str,
+        activity_id: str,
+        exercise_id: Optional[str],
+        query: str,
+        answer: str,
+        code_context: Optional[str] = None
+    ) -> None:
+        """
+        Stores a generated answer so similar questions can reuse it.
+        """
+        pass
+
+    @abstractmethod
+    def invalidate_activity(self, activity_id: str) -> None:
+        """
+        Drops every cached answer of an activity (e.g. its material changed).
+        """
+        pass
+
+    @abstractmethod
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters and current size.
+        """
+        pass
@@ -1,12 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import List, Any, AsyncIterator, Iterator, Callable, Optional
 from src.domain.learning.ports.document_repository import ActivityDocument
 
+# Texts returned instead of an answer when the LLM is unreachable; never worth caching
+AI_UNAVAILABLE_MESSAGE = "El servidor del Tutor IA está temporalmente inaccesible. Por favor, intenta de nuevo."
+AI_EMPTY_RESPONSE_MESSAGE = "Error: No se recibió respuesta de la IA."
+FALLBACK_ANSWERS = (AI_UNAVAILABLE_MESSAGE, AI_EMPTY_RESPONSE_MESSAGE)
+
+class StreamInterruptedError(Exception):
+    """The LLM stream broke after part of the answer had already been yielded."""
+    pass
+
 class RagServicePort(ABC):
     @abstractmethod
-    def process_document(self, activity_id: str, file_path: str, filename: str) -> ActivityDocument:
+    def process_document(
+        self,
+        activity_id: str,
+        file_path: str,
+        filename: str,
+        on_progress: Optional[Callable[[int, int, int], None]] = None
+    ) -> ActivityDocument:
         """
         Processes a document for RAG: loads, chunks, embeds, and stores.
+        `on_progress(pages_processed, pages_total, chunks_indexed)` is called after each page.
         """
         pass
 
@@ -30,3 +46,50 @@ class RagServicePort(ABC):
         Generates a response acting as a tutor, using context, history, and code.
         """
         pass
+
+
+    @abstractmethod
+    def stream_tutor_response(
+        self,
+        query: str,
+        context: str,
+        history: List[dict],
+        code_context: str = None,
+        problem_statement: str = None,
+        solution_code: str = None
+    ) -> Iterator[str]:
+        """
+        Same as generate_tutor_response, but yields the answer token by token as the LLM produces it.
+        Raises StreamInterruptedError if the LLM fails after some tokens were yielded.
+        """
+        pass
+
+    @abstractmethod
+    async def generate_tutor_response_async(
+        self,
+        query: str,
+        context: str,
+        history: List[dict],
+        code_context: str = None,
+        problem_statement: str = None,
+        solution_code: str = None
+    ) -> str:
+        """
+        Async counterpart of generate_tutor_response: the LLM call is awaited on the event loop.
+        """
+        pass
+
+    @abstractmethod
+    def stream_tutor_response_async(
+        self,
+        query: str,
+        context: str,
+        history: List[dict],
+        code_context: str = None,
+        problem_statement: str = None,
+        solution_code: str = None
+    ) -> AsyncIterator[str]:
+        """
+        Async counterpart of stream_tutor_response, with the same StreamInterruptedError contract.
+        """
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence
 from ..entities.incident import Incident
 
 class IncidentRepository(ABC):
@@ -16,5 +16,9 @@ class IncidentRepository(ABC):
         pass
 
     @abstractmethod
-    def list_all(self) -> List[Incident]:
+    def list_all(self, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[Incident]:
+        """
+        Newest first, ordered by (created_at, id) descending. `after` is the
+        (created_at, id) of the last incident of the previous page.
+        """
         pass
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Set
 from src.domain.shared.entity import AggregateRoot
 from ..value_objects.submission_status import SubmissionStatus
 from ..value_objects.score import Score
@@ -16,10 +16,20 @@ class Submission(AggregateRoot):
     submitted_at: Optional[datetime] = None
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    # Attempts added since the last save (only these are written)
+    _dirty_attempt_ids: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
     
     def add_attempt(self, attempt: ExerciseAttempt) -> None:
         self.attempts.append(attempt)
+        self._dirty_attempt_ids.add(str(attempt.id))
         self.updated_at = datetime.now()
+
+    @property
+    def pending_attempts(self) -> List[ExerciseAttempt]:
+        return [a for a in self.attempts if str(a.id) in self._dirty_attempt_ids]
+
+    def mark_attempts_saved(self) -> None:
+        self._dirty_attempt_ids.clear()
         
     def submit(self) -> None:
         self.status = SubmissionStatus.SUBMITTED
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import List
+from ..entities.submission import Submission
+from ..entities.exercise_attempt import ExerciseAttempt
+
+class ActivityProgressProjection(ABC):
+    """
+    Incrementally maintained progress of a student in an activity, so the teacher
+    views read one row per student instead of aggregating attempts per request.
+    """
+
+    @abstractmethod
+    def apply(self, submission: Submission, new_attempts: List[ExerciseAttempt]) -> None:
+        """
+        Folds a submission and the attempts it just gained into its (activity, student)
+        progress. Runs in the same unit of work as the submission save.
+        """
+        pass
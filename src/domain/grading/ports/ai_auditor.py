@@ -6,7 +6,7 @@ class IAiAuditor(ABC):
     def audit_activity(self, exercises: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Audit a list of exercises and return feedback and grade.
-        exercises: List of dicts with keys: title, difficulty, code, passed.
+        exercises: List of dicts with keys: id, title, difficulty, code, passed and optionally test_summary.
         Returns: Dict with keys: final_grade, general_feedback, exercises_audit.
         """
         pass
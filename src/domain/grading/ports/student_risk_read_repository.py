@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+@dataclass
+class StudentRiskSummary:
+    student_id: str
+    email: str
+    full_name: Optional[str]
+    average_grade: Optional[float]      # mean final_score of graded submissions
+    risk_level: Optional[str]           # level of the most recent risk analysis
+    risk_score: Optional[int]
+    last_active_at: Optional[datetime]  # most recent session update
+
+class StudentRiskReadRepository(ABC):
+    @abstractmethod
+    def list_students(
+        self,
+        course_id: Optional[str] = None,
+        module_id: Optional[str] = None,
+        limit: Optional[int] = 100,
+        after: Optional[Sequence[Any]] = None
+    ) -> List[StudentRiskSummary]:
+        """
+        One page of students with their grade/risk/activity aggregates, ordered by
+        (full_name or "", student_id); `after` is that key of the previous page's last
+        student; without `limit` every student is returned. `course_id` / `module_id`
+        keep only the students enrolled there and restrict the aggregates to that
+        course's or module's activities.
+        """
+        pass
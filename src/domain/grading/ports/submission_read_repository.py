@@ -14,6 +14,8 @@ class StudentActivityDetailsDTO:
     chat_history: List[Dict[str, str]]
     code_submitted: str
     risk_analysis: Optional[Dict[str, Any]] = None
+    # `status` is "submitted" as soon as the student ran any code; this is the final hand-in
+    final_submitted: bool = False
 
 class SubmissionReadRepository(ABC):
     @abstractmethod
@@ -23,3 +25,11 @@ class SubmissionReadRepository(ABC):
         grades, exercises, code, and chat history.
         """
         pass
+
+    @abstractmethod
+    def get_activity_details_for_students(self, activity_id: str, student_ids: Optional[List[str]] = None) -> List[StudentActivityDetailsDTO]:
+        """
+        Same details for many students of one activity in a fixed number of queries.
+        Without `student_ids`, every student with a submission or a session in the activity.
+        """
+        pass
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 from src.domain.shared.value_object import ValueObject
+from .test_case_result import TestCaseResult
 
 @dataclass(frozen=True)
 class ExecutionResult(ValueObject):
@@ -8,7 +9,18 @@ class ExecutionResult(ValueObject):
     stdout: str
     stderr: str
     error: Optional[str] = None
+    # Filled when the code was run against the exercise test cases
+    test_results: Tuple[TestCaseResult, ...] = ()
+    score: Optional[float] = None  # weighted % of passed test cases (0-100)
     
     @property
     def is_success(self) -> bool:
         return self.exit_code == 0 and not self.error
+
+    @property
+    def tests_passed(self) -> int:
+        return sum(1 for r in self.test_results if r.passed)
+
+    @property
+    def tests_total(self) -> int:
+        return len(self.test_results)
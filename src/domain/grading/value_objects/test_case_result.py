@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from typing import Optional
+from src.domain.shared.value_object import ValueObject
+
+@dataclass(frozen=True)
+class TestCaseResult(ValueObject):
+    test_case_id: str
+    passed: bool
+    weight: float = 1.0
+    is_hidden: bool = False
+    duration_ms: float = 0.0
+    input_data: str = ""
+    expected_output: str = ""
+    actual_output: str = ""
+    error: Optional[str] = None
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 from ..entities.user import User
 from ..value_objects.email import Email
 from ..value_objects.user_id import UserId
@@ -15,6 +15,11 @@ class UserRepository(ABC):
         """Find a user by ID."""
         pass
     
+    @abstractmethod
+    def find_by_ids(self, user_ids: List[str]) -> List[User]:
+        """Find several users in one query (unknown ids are skipped, order is not kept)."""
+        pass
+
     @abstractmethod
     def find_by_email(self, email: Email) -> Optional[User]:
         """Find a user by email."""
@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
 from ..entities.activity import Activity
 
+@dataclass
+class EnrolledModule:
+    module: Activity
+    activities: List[Activity] = field(default_factory=list)  # published only
+
 class ActivityRepository(ABC):
     @abstractmethod
     def save(self, activity: Activity) -> None:
@@ -16,11 +22,24 @@ class ActivityRepository(ABC):
         pass
 
     @abstractmethod
-    def list_by_teacher(self, teacher_id: str) -> List[Activity]:
+    def list_by_teacher(self, teacher_id: str, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[Activity]:
+        """
+        Ordered by (created_at, id). `after` is the (created_at, id) of the last activity
+        of the previous page; without `limit` every activity is returned.
+        """
+        pass
+
+    @abstractmethod
+    def find_all_published(self, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[Activity]:
+        """Ordered and paged like list_by_teacher."""
         pass
 
     @abstractmethod
-    def find_all_published(self) -> List[Activity]:
+    def list_enrolled_modules(self, student_id: str) -> List[EnrolledModule]:
+        """
+        Published modules the student is actively enrolled in, each with its
+        published activities, in a single query.
+        """
         pass
 
     @abstractmethod
@@ -32,7 +51,8 @@ class ActivityRepository(ABC):
         pass
 
     @abstractmethod
-    def get_assigned_students(self, module_id: str) -> List[str]:
+    def get_assigned_students(self, module_id: str, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[str]:
+        """Ids of the actively enrolled students, ordered by id; `after` is (student_id,)."""
         pass
 
 
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
 @dataclass
@@ -11,6 +11,8 @@ class ActivityDocument:
     content_text: Optional[str] = None
     embedding_id: Optional[str] = None
     created_at: datetime = datetime.now()
+    content_hash: Optional[str] = None
+    chunk_ids: List[str] = field(default_factory=list)
 
 class DocumentRepository(ABC):
     @abstractmethod
@@ -24,3 +26,7 @@ class DocumentRepository(ABC):
     @abstractmethod
     def find_by_id(self, document_id: str) -> Optional[ActivityDocument]:
         pass
+
+    @abstractmethod
+    def find_by_activity_and_filename(self, activity_id: str, filename: str) -> Optional[ActivityDocument]:
+        pass
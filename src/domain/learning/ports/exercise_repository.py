@@ -1,6 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
 from ..entities.exercise import Exercise
+from ..entities.test_case import TestCase
+from ..value_objects.difficulty import Difficulty
+from ..value_objects.programming_language import ProgrammingLanguage
+from ..value_objects.exercise_status import ExerciseStatus
+
+@dataclass
+class ExerciseSummary:
+    """Exercise as shown in listings: never carries the reference solution."""
+    id: str
+    activity_id: str
+    title: str
+    problem_statement: str
+    starter_code: str
+    difficulty: Difficulty
+    language: ProgrammingLanguage
+    status: ExerciseStatus
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    test_cases: List[TestCase] = field(default_factory=list)  # only when requested
 
 class ExerciseRepository(ABC):
     @abstractmethod
@@ -10,11 +31,32 @@ class ExerciseRepository(ABC):
     @abstractmethod
     def find_by_id(self, exercise_id: str) -> Optional[Exercise]:
         pass
+
+    @abstractmethod
+    def find_by_ids(self, exercise_ids: List[str]) -> List[Exercise]:
+        """
+        Several exercises in one round trip, in the order of `exercise_ids`
+        (unknown ids are skipped).
+        """
+        pass
         
     @abstractmethod
     def list_by_activity(self, activity_id: str) -> List[Exercise]:
         pass
 
+    @abstractmethod
+    def list_summaries_by_activity(self, activity_id: str, with_test_cases: bool = False) -> List[ExerciseSummary]:
+        """
+        Projection of the activity's exercises without solution_code (and without
+        test cases unless `with_test_cases`), for listing pages.
+        """
+        pass
+
     @abstractmethod
     def count_by_activity(self, activity_id: str) -> int:
         pass
+
+    @abstractmethod
+    def count_by_activities(self, activity_ids: List[str]) -> Dict[str, int]:
+        """Exercise counts of several activities in one grouped query (0 when absent)."""
+        pass
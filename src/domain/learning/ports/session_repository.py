@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from ..entities.session import LearningSession
+from ..entities.chat_message import ChatMessage
 
 class SessionRepository(ABC):
     @abstractmethod
@@ -11,6 +12,22 @@ class SessionRepository(ABC):
     def find_by_id(self, session_id: str) -> Optional[LearningSession]:
         pass
         
+    @abstractmethod
+    def find_by_id_with_recent_messages(self, session_id: str, limit: int) -> Optional[LearningSession]:
+        """
+        The session with only its last `limit` messages (oldest first), for callers
+        that don't need the whole conversation.
+        """
+        pass
+
+    @abstractmethod
+    def append_messages(self, session: LearningSession, messages: List[ChatMessage]) -> None:
+        """
+        Inserts `messages` (new to the session) and touches the session, without
+        reading the existing conversation.
+        """
+        pass
+
     @abstractmethod
     def list_by_student(self, student_id: str) -> List[LearningSession]:
         pass
@@ -18,3 +35,20 @@ class SessionRepository(ABC):
     @abstractmethod
     def find_active_by_student(self, student_id: str) -> Optional[LearningSession]:
         pass
+
+class AsyncSessionRepository(ABC):
+    """
+    Async counterpart of SessionRepository for the async database engine.
+    Messages are always loaded explicitly (no lazy loading under asyncio).
+    """
+    @abstractmethod
+    async def find_by_id(self, session_id: str) -> Optional[LearningSession]:
+        pass
+
+    @abstractmethod
+    async def find_by_id_with_recent_messages(self, session_id: str, limit: int) -> Optional[LearningSession]:
+        pass
+
+    @abstractmethod
+    async def append_messages(self, session: LearningSession, messages: List[ChatMessage]) -> None:
+        pass
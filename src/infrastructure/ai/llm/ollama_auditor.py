@@ -1,41 +1,17 @@
-import requests
 import json
 import os
 from typing import List, Dict, Any
 from src.domain.grading.ports.ai_auditor import IAiAuditor
-from src.infrastructure.config.settings import settings
+from src.infrastructure.ai.llm.ollama_client import OllamaClient, OllamaError, ollama_client
 
 class OllamaAuditor(IAiAuditor):
-    def __init__(self):
-        # List of potential URLs to try, similar to ExerciseGenerator
-        self.potential_urls = [
-            "http://187.77.41.214:11434",
-            settings.OLLAMA_BASE_URL.rstrip("/"),
-            "http://host.docker.internal:11434",
-            "http://172.17.0.1:11434", 
-            "http://ollama:11434", 
-            "http://187.77.41.214:11434"
-        ]
-        self.base_url = None
+    def __init__(self, client: OllamaClient = ollama_client, timeout_seconds: float = 120.0):
+        self.client = client
+        self.timeout_seconds = timeout_seconds
         # FIX 1: Unificamos el modelo a llama3.2 para no reventar la RAM
         self.model = "llama3" 
 
-    def _find_working_url(self):
-        if self.base_url:
-            return self.base_url
-        for url in self.potential_urls:
-            try:
-                resp = requests.get(f"{url}/api/tags", timeout=1)
-                if resp.status_code == 200:
-                    self.base_url = url
-                    return url
-            except Exception:
-                continue
-        return settings.OLLAMA_BASE_URL.rstrip("/")
-
     def audit_activity(self, exercises: List[Dict[str, Any]]) -> Dict[str, Any]:
-        base_url = self._find_working_url()
-        
         exercises_text = ""
         for i, ex in enumerate(exercises):
             # Check if code is empty or just comments/whitespace
@@ -45,7 +21,9 @@ class OllamaAuditor(IAiAuditor):
             code_display = "[CÓDIGO VACÍO / NO INTENTADO]" if is_empty else raw_code[:1500]
             
             status_text = "✅ CORRECTO" if ex.get('passed') else "❌ INCORRECTO/NO INTENTADO"
-            exercises_text += f"\n--- EJERCICIO {i+1} ---\nID: {ex.get('id')}\nTítulo: {ex.get('title')}\nDificultad: {ex.get('difficulty')}\nCódigo del Estudiante:\n{code_display}\n---------------------\n"
+            # Test results from the pre-grading stage, when the exercise has test cases
+            tests_line = f"Casos de prueba: {ex['test_summary']}\n" if ex.get('test_summary') else ""
+            exercises_text += f"\n--- EJERCICIO {i+1} ---\nID: {ex.get('id')}\nTítulo: {ex.get('title')}\nDificultad: {ex.get('difficulty')}\n{tests_line}Código del Estudiante:\n{code_display}\n---------------------\n"
 
         prompt = f"""Eres un Profesor Senior de Programación de la UTN con experiencia en evaluación formativa.
 Tu tarea es auditar y calificar una entrega de ejercicios de programación con CRITERIO PEDAGÓGICO.
@@ -120,7 +98,7 @@ Estructura EXACTA:
   "general_feedback": "<Resumen general de la entrega: fortalezas, debilidades, consejo principal para mejorar>",
   "exercises_audit": [
     {{
-      "exercise_id": "<id del ejercicio o su índice>",
+      "exercise_id": "<ID exacto del ejercicio, copiado tal cual>",
       "title": "<título del ejercicio>",
       "grade": <nota 0-100>,
       "passed": <true si grade >= 60, false en caso contrario>,
@@ -133,6 +111,7 @@ Estructura EXACTA:
 IMPORTANTE:
 ═══════════════════════════════════════════════════════════════════
 - NO inventes que el código funciona si está vacío o incompleto.
+- Incluí un elemento en "exercises_audit" por cada ejercicio, en el mismo orden en que aparecen y con su ID exacto.
 - Sé ESTRICTO pero CONSTRUCTIVO en tus evaluaciones.
 - El feedback debe ayudar al alumno a mejorar, no solo señalar errores.
 - Si un ejercicio resuelve el problema de forma poco elegante pero funciona, la nota debe ser 65-75, no 90.
@@ -140,27 +119,23 @@ IMPORTANTE:
 """
         
         try:
-            url = f"{base_url}/api/generate"
-            response = requests.post(
-                url,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json",
-                    "options": {
+            try:
+                result = self.client.generate_sync(
+                    model=self.model,
+                    prompt=prompt,
+                    format="json",
+                    options={
                         "temperature": 0.0, # Deterministic structure
                         "num_predict": 1024
-                    }
-                },
-                timeout=120
-            )
-            
-            if response.status_code != 200:
-                print(f"Ollama Error {response.status_code}: {response.text}")
-                return self._fallback_response(f"Error AI: {response.text}")
+                    },
+                    timeout=self.timeout_seconds
+                )
+            except OllamaError as e:
+                if e.status_code is None:
+                    raise
+                print(f"Ollama Error {e}")
+                return self._fallback_response(f"Error AI: {e}")
 
-            result = response.json()
             raw_response = result.get('response', '{}')
             
             # Robust JSON cleaning
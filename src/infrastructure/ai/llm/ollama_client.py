@@ -0,0 +1,326 @@
+import asyncio
+import json
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterator, List, Optional
+import httpx
+from src.infrastructure.config.settings import settings
+from src.infrastructure.ai.llm.ollama_endpoints import OllamaEndpointRegistry, NoOllamaEndpointError
+
+class OllamaError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+_END = object()
+
+class OllamaClient:
+    """
+    Process-wide async client for the Ollama HTTP API.
+
+    A single httpx.AsyncClient (keep-alive pool) runs on a dedicated event loop thread,
+    so async handlers (`await client.generate(...)`) and the existing sync adapters
+    (`client.generate_sync(...)`) share the same connections, concurrency limit and retries.
+    Unless a call pins `base_url`, the host comes from the shared endpoint registry.
+
+    `max_concurrency` bounds the generations in flight: a streamed answer keeps its
+    slot until the last token (or until the consumer closes it), because Ollama
+    is busy generating for it the whole time. Calls beyond the limit wait their turn.
+    Only failures to reach a host (connect errors, 5xx) are retried; a read timeout
+    means the model was already generating, and retrying would start it over.
+
+    `timeout` is the read timeout of a call: the whole answer for `generate`, the wait
+    for each chunk for `stream_generate`. Calls without one get `read_timeout_seconds`
+    or `stream_chunk_timeout_seconds`, so no call can wait forever.
+    """
+    def __init__(
+        self,
+        registry: OllamaEndpointRegistry,
+        max_concurrency: int = 4,
+        max_keepalive_connections: int = 10,
+        max_retries: int = 2,
+        retry_backoff_seconds: float = 0.5,
+        connect_timeout_seconds: float = 5.0,
+        read_timeout_seconds: float = 120.0,
+        stream_chunk_timeout_seconds: float = 60.0
+    ):
+        self.registry = registry
+        self.max_concurrency = max_concurrency
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.read_timeout_seconds = read_timeout_seconds
+        self.stream_chunk_timeout_seconds = stream_chunk_timeout_seconds
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._loop is not None:
+            return
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="ollama-client", daemon=True)
+            thread.start()
+            asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+            self._thread = thread
+            self._loop = loop
+            print(f"--- [OllamaClient] Started (max_concurrency={self.max_concurrency}, keepalive={self.max_keepalive_connections}) ---")
+
+    async def _open(self) -> None:
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency * 2,
+                max_keepalive_connections=self.max_keepalive_connections
+            )
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def close(self) -> None:
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            if loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
+            self._loop = None
+            self._thread = None
+            self._http = None
+            print("--- [OllamaClient] Closed ---")
+
+    def _submit(self, coro: Coroutine) -> Future:
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # ------------------------------------------------------------------
+    # Async API (awaitable from any event loop)
+    # ------------------------------------------------------------------
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[str] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        payload = self._payload(model, prompt, False, options, format, extra)
+        future = self._submit(self._post_json("/api/generate", payload, timeout, base_url))
+        return await asyncio.wrap_future(future)
+
+    async def stream_generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None,
+        **extra: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        caller_loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        payload = self._payload(model, prompt, True, options, None, extra)
+        pump = self._submit(self._pump_stream(
+            payload, timeout, base_url,
+            lambda item: caller_loop.call_soon_threadsafe(items.put_nowait, item)
+        ))
+        try:
+            while True:
+                item = await items.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            pump.cancel()
+
+    async def list_models(self, base_url: Optional[str] = None, timeout: float = 2.0) -> List[str]:
+        future = self._submit(self._list_models(base_url, timeout))
+        return await asyncio.wrap_future(future)
+
+    async def resolve_base_url(self) -> str:
+        return await asyncio.wrap_future(self._submit(self.registry.resolve(self._fetch_models)))
+
+    # ------------------------------------------------------------------
+    # Sync API (for threadpool handlers and background workers)
+    # ------------------------------------------------------------------
+    def generate_sync(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[str] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        payload = self._payload(model, prompt, False, options, format, extra)
+        return self._submit(self._post_json("/api/generate", payload, timeout, base_url)).result()
+
+    def stream_generate_sync(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None,
+        **extra: Any
+    ) -> Iterator[Dict[str, Any]]:
+        """Yields NDJSON chunks. Closing the iterator cancels the upstream request."""
+        items: queue.Queue = queue.Queue()
+        payload = self._payload(model, prompt, True, options, None, extra)
+        pump = self._submit(self._pump_stream(payload, timeout, base_url, items.put))
+        try:
+            while True:
+                item = items.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            pump.cancel()
+
+    def list_models_sync(self, base_url: Optional[str] = None, timeout: float = 2.0) -> List[str]:
+        return self._submit(self._list_models(base_url, timeout)).result()
+
+    def resolve_base_url_sync(self) -> str:
+        return self._submit(self.registry.resolve(self._fetch_models)).result()
+
+    def endpoints_snapshot(self) -> Dict[str, Any]:
+        return self.registry.snapshot()
+
+    # ------------------------------------------------------------------
+    # Internals (run on the client loop)
+    # ------------------------------------------------------------------
+    def _payload(self, model, prompt, stream, options, format, extra) -> Dict[str, Any]:
+        payload = {"model": model, "prompt": prompt, "stream": stream}
+        if options:
+            payload["options"] = options
+        if format:
+            payload["format"] = format
+        payload.update(extra)
+        return payload
+
+    def _timeout(self, timeout: Optional[float], default: Optional[float] = None) -> httpx.Timeout:
+        if timeout is None:
+            timeout = self.read_timeout_seconds if default is None else default
+        return httpx.Timeout(timeout, connect=min(timeout, self.connect_timeout_seconds))
+
+    async def _base_url(self, pinned: Optional[str]) -> str:
+        if pinned:
+            return pinned.rstrip("/")
+        return await self.registry.resolve(self._fetch_models)
+
+    async def _fetch_models(self, base_url: str, timeout: Optional[float] = None) -> List[str]:
+        timeout = timeout if timeout is not None else self.registry.probe_timeout_seconds
+        response = await self._http.get(f"{base_url.rstrip('/')}/api/tags", timeout=self._timeout(timeout))
+        if response.status_code != 200:
+            raise OllamaError(f"HTTP {response.status_code}: {response.text}", response.status_code)
+        return [m.get('name', '') for m in response.json().get('models', [])]
+
+    async def _list_models(self, base_url: Optional[str], timeout: float) -> List[str]:
+        if base_url is None:
+            # Models of the active endpoint were recorded by the last probe
+            return self.registry.models_for(await self._base_url(None))
+        return await self._fetch_models(base_url, timeout)
+
+    async def _with_retries(self, call, pinned_base_url: Optional[str] = None):
+        """Runs `call(base_url)`, resolving the endpoint again before each retry."""
+        attempt = 0
+        while True:
+            try:
+                base = await self._base_url(pinned_base_url)
+            except NoOllamaEndpointError as e:
+                raise OllamaError(str(e)) from e
+            try:
+                return await call(base)
+            except (httpx.TransportError, OllamaError) as e:
+                unreachable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                retryable = unreachable or (isinstance(e, OllamaError) and (e.status_code or 0) >= 500)
+                if unreachable and not pinned_base_url:
+                    # Let the next attempt pick another host if this one went away
+                    self.registry.report_failure(base, self._fetch_models)
+                if not retryable or attempt >= self.max_retries:
+                    if isinstance(e, OllamaError):
+                        raise
+                    raise OllamaError(f"Ollama request failed: {e}") from e
+                delay = self.retry_backoff_seconds * (2 ** attempt)
+                print(f"--- [OllamaClient] Request failed ({e}), retrying in {delay:.1f}s ---")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _post_json(self, path: str, payload: Dict[str, Any], timeout: Optional[float], base_url: Optional[str]) -> Dict[str, Any]:
+        async def call(base: str):
+            async with self._semaphore:
+                response = await self._http.post(f"{base}{path}", json=payload, timeout=self._timeout(timeout))
+            if response.status_code != 200:
+                raise OllamaError(f"HTTP {response.status_code}: {response.text}", response.status_code)
+            return response.json()
+        return await self._with_retries(call, base_url)
+
+    async def _pump_stream(self, payload: Dict[str, Any], timeout: Optional[float], base_url: Optional[str], emit) -> None:
+        delivered = False
+
+        async def call(base: str):
+            nonlocal delivered
+            async with self._semaphore:
+                # httpx applies the read timeout to each read, i.e. per chunk of the stream
+                chunk_timeout = self._timeout(timeout, self.stream_chunk_timeout_seconds)
+                async with self._http.stream("POST", f"{base}/api/generate", json=payload, timeout=chunk_timeout) as response:
+                    if response.status_code != 200:
+                        body = await response.aread()
+                        raise OllamaError(f"HTTP {response.status_code}: {body.decode(errors='replace')}", response.status_code)
+                    try:
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            delivered = True
+                            emit(chunk)
+                            if chunk.get('done'):
+                                break
+                    except httpx.TransportError as e:
+                        if delivered:
+                            # Not retryable: the consumer already received part of the answer
+                            raise OllamaError(f"Stream interrupted: {e}") from e
+                        raise
+
+        try:
+            await self._with_retries(call, base_url)
+            emit(_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            emit(e if isinstance(e, OllamaError) else OllamaError(str(e)))
+
+ollama_endpoints = OllamaEndpointRegistry(
+    candidate_urls=[settings.OLLAMA_BASE_URL] + settings.OLLAMA_FALLBACK_URLS.split(","),
+    ttl_seconds=settings.OLLAMA_ENDPOINT_TTL_SECONDS,
+    probe_timeout_seconds=settings.OLLAMA_PROBE_TIMEOUT_SECONDS
+)
+
+ollama_client = OllamaClient(
+    registry=ollama_endpoints,
+    max_concurrency=settings.OLLAMA_MAX_CONCURRENCY,
+    max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+    max_retries=settings.OLLAMA_MAX_RETRIES,
+    retry_backoff_seconds=settings.OLLAMA_RETRY_BACKOFF_SECONDS,
+    connect_timeout_seconds=settings.OLLAMA_CONNECT_TIMEOUT_SECONDS,
+    read_timeout_seconds=settings.OLLAMA_READ_TIMEOUT_SECONDS,
+    stream_chunk_timeout_seconds=settings.OLLAMA_STREAM_CHUNK_TIMEOUT_SECONDS
+)
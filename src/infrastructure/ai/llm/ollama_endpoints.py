@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Any
+
+FetchModels = Callable[[str], Awaitable[List[str]]]
+
+class NoOllamaEndpointError(ConnectionError):
+    pass
+
+class OllamaEndpointRegistry:
+    """
+    Process-level discovery of a reachable Ollama host.
+
+    All candidates are probed in parallel (GET /api/tags) and the first healthy one, in
+    priority order, is cached for `ttl_seconds`. When the TTL expires the cached endpoint
+    keeps being served while a background probe refreshes it. When a call against the
+    active endpoint fails, it is marked unhealthy and a background re-probe is scheduled.
+    Lives on the OllamaClient event loop; `snapshot()` is safe to call from any thread.
+    """
+    def __init__(
+        self,
+        candidate_urls: List[str],
+        ttl_seconds: float = 300.0,
+        probe_timeout_seconds: float = 2.0,
+        retry_after_seconds: float = 10.0
+    ):
+        # Keep priority order, drop duplicates and trailing slashes
+        self.candidate_urls: List[str] = []
+        for url in candidate_urls:
+            url = url.strip().rstrip("/")
+            if url and url not in self.candidate_urls:
+                self.candidate_urls.append(url)
+        self.ttl_seconds = ttl_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+
+        self._active_url: Optional[str] = None
+        self._checked_at: float = 0.0
+        self._failed_at: float = 0.0
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._probe_lock = asyncio.Lock()
+        self._background_probe: Optional[asyncio.Task] = None
+
+    async def resolve(self, fetch_models: FetchModels) -> str:
+        if self._active_url:
+            if time.monotonic() - self._checked_at > self.ttl_seconds:
+                self._schedule_probe(fetch_models)
+            return self._active_url
+
+        if self._failed_at and time.monotonic() - self._failed_at < self.retry_after_seconds:
+            raise NoOllamaEndpointError(self._unavailable_message())
+
+        url = await self.refresh(fetch_models)
+        if not url:
+            raise NoOllamaEndpointError(self._unavailable_message())
+        return url
+
+    async def refresh(self, fetch_models: FetchModels) -> Optional[str]:
+        async with self._probe_lock:
+            # Another caller may have finished a probe while we waited for the lock
+            if self._active_url and time.monotonic() - self._checked_at <= self.ttl_seconds:
+                return self._active_url
+
+            print(f"--- [Ollama] Probing endpoints in parallel: {self.candidate_urls} ---")
+            results = await asyncio.gather(
+                *[self._probe(url, fetch_models) for url in self.candidate_urls]
+            )
+            healthy = [url for url, ok in zip(self.candidate_urls, results) if ok]
+            now = time.monotonic()
+            if healthy:
+                if healthy[0] != self._active_url:
+                    print(f"--- [Ollama] Using endpoint {healthy[0]} (models: {self._endpoints[healthy[0]]['models']}) ---")
+                self._active_url = healthy[0]
+                self._checked_at = now
+                self._failed_at = 0.0
+            else:
+                print(f"--- [Ollama] CRITICAL ERROR: {self._unavailable_message()} ---")
+                self._active_url = None
+                self._failed_at = now
+            return self._active_url
+
+    def report_failure(self, url: str, fetch_models: FetchModels) -> None:
+        url = url.rstrip("/")
+        if url in self._endpoints:
+            self._endpoints[url]["healthy"] = False
+        if url == self._active_url:
+            print(f"--- [Ollama] Endpoint {url} failed, re-probing in background ---")
+            self._active_url = None
+            self._schedule_probe(fetch_models)
+
+    def models_for(self, url: str) -> List[str]:
+        return list(self._endpoints.get(url.rstrip("/"), {}).get("models", []))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active_url": self._active_url,
+            "seconds_since_check": round(time.monotonic() - self._checked_at, 1) if self._checked_at else None,
+            "endpoints": {url: dict(info) for url, info in self._endpoints.items()}
+        }
+
+    def _schedule_probe(self, fetch_models: FetchModels) -> None:
+        if self._background_probe and not self._background_probe.done():
+            return
+        # Force the probe even if the cached endpoint looks fresh
+        self._checked_at = 0.0
+        self._background_probe = asyncio.ensure_future(self.refresh(fetch_models))
+
+    async def _probe(self, url: str, fetch_models: FetchModels) -> bool:
+        try:
+            models = await asyncio.wait_for(fetch_models(url), timeout=self.probe_timeout_seconds)
+        except Exception as e:
+            print(f"--- [Ollama] Failed to connect to {url}: {str(e) or type(e).__name__} ---")
+            self._endpoints[url] = {"healthy": False, "models": [], "error": str(e) or type(e).__name__}
+            return False
+        self._endpoints[url] = {"healthy": True, "models": models, "error": None}
+        return True
+
+    def _unavailable_message(self) -> str:
+        return f"Could not connect to Ollama at any URL. Tried: {self.candidate_urls}"
@@ -1,4 +1,3 @@
-import requests
 import json
 from typing import List
 from src.application.learning.ports.exercise_generator import IExerciseGenerator
@@ -6,51 +5,27 @@ from src.domain.learning.entities.exercise import Exercise, TestCase
 from src.domain.learning.value_objects.difficulty import Difficulty
 from src.domain.learning.value_objects.programming_language import ProgrammingLanguage
 from src.domain.learning.value_objects.exercise_status import ExerciseStatus
-from src.infrastructure.config.settings import settings
+from src.infrastructure.ai.llm.ollama_client import OllamaClient, OllamaError, ollama_client
 
 class OllamaExerciseGenerator(IExerciseGenerator):
-    def __init__(self):
-        # List of potential URLs to try - Prioritize external IP first
-        self.potential_urls = [
-            "http://187.77.41.214:11434",  # External Ollama server
-            settings.OLLAMA_BASE_URL.rstrip("/"),
-            "http://host.docker.internal:11434",
-            "http://ollama:11434", # If running in Docker with service name
-            "http://172.17.0.1:11434", # Default Docker bridge gateway
-            "http://187.77.41.214:11434", # Local development
-        ]
-        self.base_url = None
+    def __init__(self, client: OllamaClient = ollama_client, timeout_seconds: float = 300.0):
+        self.client = client
+        # Read timeout per batch
+        self.timeout_seconds = timeout_seconds
+        # Endpoint discovery is shared process-wide by the client's registry
         self.model = "llama3"
         print(f"--- [OllamaExerciseGenerator] Initialized with model: {self.model} ---") 
 
-    def _find_working_url(self):
-        if self.base_url:
-            return self.base_url
-            
-        print("--- [Ollama] Finding working Ollama URL... ---")
-        for url in self.potential_urls:
-            try:
-                # Use /api/tags or /api/version to check connectivity lightly
-                resp = requests.get(f"{url}/api/tags", timeout=2)
-                if resp.status_code == 200:
-                    print(f"--- [Ollama] Connected successfully to {url} ---")
-                    # Verify model is available
-                    tags_data = resp.json()
-                    available_models = [model.get('name', '').split(':')[0] for model in tags_data.get('models', [])]
-                    print(f"--- [Ollama] Available models: {available_models} ---")
-                    if self.model not in available_models and not any(self.model in m for m in available_models):
-                        print(f"--- [Ollama] WARNING: Model '{self.model}' not found. Available: {available_models} ---")
-                        print(f"--- [Ollama] HINT: Run 'ollama pull {self.model}' to download the model ---")
-                    self.base_url = url
-                    return url
-            except Exception as e:
-                print(f"--- [Ollama] Failed to connect to {url}: {str(e)} ---")
-                continue
-        
-        # No working URL found
-        error_msg = f"Could not connect to Ollama at any URL. Tried: {self.potential_urls}"
-        print(f"--- [Ollama] CRITICAL ERROR: {error_msg} ---")
-        raise ConnectionError(error_msg)
+    def _check_model_available(self):
+        # Unreachable Ollama stays a ConnectionError for callers, as before the shared client
+        try:
+            models = self.client.list_models_sync()
+        except OllamaError as e:
+            raise ConnectionError(f"Could not connect to Ollama: {e}") from e
+        available_models = [name.split(':')[0] for name in models]
+        if self.model not in available_models and not any(self.model in m for m in available_models):
+            print(f"--- [Ollama] WARNING: Model '{self.model}' not found. Available: {available_models} ---")
+            print(f"--- [Ollama] HINT: Run 'ollama pull {self.model}' to download the model ---")
 
     def generate(
         self, 
@@ -61,7 +36,7 @@ class OllamaExerciseGenerator(IExerciseGenerator):
         context: str = None
     ) -> List[Exercise]:
         
-        base_url = self._find_working_url()
+        self._check_model_available()
         all_exercises = []
         remaining = count
         batch_size = 1 # Generate one by one to maximize stability with small LLMs
@@ -75,31 +50,25 @@ class OllamaExerciseGenerator(IExerciseGenerator):
             prompt = self._build_prompt(topic, current_batch_size, difficulty, language, context)
             
             try:
-                url = f"{base_url}/api/generate"
-                
-                response = requests.post(
-                    url,
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "format": "json", # Ollama JSON mode
-                        "options": {
+                try:
+                    result = self.client.generate_sync(
+                        model=self.model,
+                        prompt=prompt,
+                        format="json", # Ollama JSON mode
+                        options={
                             "temperature": 0.1, # FIX 2: Temperatura bajísima para forzar estructura lógica y no creativa
                             "top_p": 0.9
-                        }
-                    },
-                    timeout=300 # Timeout per batch
-                )
-                
-                if response.status_code != 200:
-                    print(f"--- [OllamaExerciseGenerator] HTTP ERROR {response.status_code}: {response.text} ---")
-                    if response.status_code == 404:
+                        },
+                        timeout=self.timeout_seconds
+                    )
+                except OllamaError as e:
+                    if e.status_code is None:
+                        raise
+                    print(f"--- [OllamaExerciseGenerator] HTTP ERROR {e} ---")
+                    if e.status_code == 404:
                          print(f"--- [OllamaExerciseGenerator] HINT: Model '{self.model}' might be missing. Try 'ollama pull {self.model}' ---")
                     break
                 
-                response.raise_for_status()
-                result = response.json()
                 raw_response = result['response']
                 
                 # FIX 3: Limpiador de JSON por si la IA mete basura antes de la primera llave
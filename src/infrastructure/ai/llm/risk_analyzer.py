@@ -1,46 +1,18 @@
 import os
 import json
 import logging
-import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional, ContextManager
+from src.infrastructure.config.settings import settings
+from src.infrastructure.ai.llm.ollama_client import OllamaClient, OllamaError, ollama_client
+from src.infrastructure.ai.llm.risk_prefilter import RiskPrefilter, RiskAssessment, risk_prefilter
 
 logger = logging.getLogger(__name__)
 
-class RiskAnalyzer:
-    def __init__(self, model: str = None, base_url: str = None):
-        self.model = model or os.getenv("OLLAMA_MODEL", "llama3")
-        self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://187.77.41.214:11434")
-
-    def analyze_student_risk(self, student_name: str, activity_title: str, chat_history: List[Dict], code_submission: str, grade: float) -> Dict[str, Any]:
-        """
-        Analyzes student risk based on chat history and submission.
-        """
-        
-        # 1. Format Chat History
-        chat_text = ""
-        if not chat_history:
-            chat_text = "No hay interacciones de chat registradas."
-        else:
-            for msg in chat_history[-15:]: # Last 15 messages
-                role = "Estudiante" if msg.get('role') == 'user' else "IA Tutor"
-                chat_text += f"{role}: {msg.get('content')}\n"
-
-        # 2. Build Prompt - MEJORADO DRÁSTICAMENTE
-        prompt = f"""Eres un Psicopedagogo especializado en Educación Tecnológica y Análisis de Conducta en Aprendizaje de Programación.
+RISK_ANALYSIS_INSTRUCTIONS = """Eres un Psicopedagogo especializado en Educación Tecnológica y Análisis de Conducta en Aprendizaje de Programación.
 
-Tu tarea es evaluar el RIESGO DE DESERCIÓN O FRUSTRACIÓN del estudiante '{student_name}' en la actividad '{activity_title}'.
-
-═══════════════════════════════════════════════════════════════════
-DATOS DEL ESTUDIANTE:
-═══════════════════════════════════════════════════════════════════
-📊 Nota Final de la Actividad: {grade}/100
-
-💻 Código Entregado:
-{code_submission[:1000]}
-... (truncado)
-
-🗨️ Historial de Chat con el Tutor IA (Últimas 15 interacciones):
-{chat_text}
+Tu tarea es evaluar el RIESGO DE DESERCIÓN O FRUSTRACIÓN de un estudiante en una actividad de programación. Sus datos (nota, código entregado e historial de chat con el tutor) se indican después de estas instrucciones.
 
 ═══════════════════════════════════════════════════════════════════
 PATRONES A DETECTAR (ANÁLISIS OBLIGATORIO):
@@ -129,7 +101,7 @@ Evalúa el riesgo usando los patrones anteriores y genera un JSON con:
 FORMATO JSON (RESPONDE SOLO ESTO):
 ═══════════════════════════════════════════════════════════════════
 
-{{
+{
   "risk_score": <0-100>,
   "risk_level": "LOW" | "MEDIUM" | "HIGH" | "CRITICAL",
   "diagnosis": "<Diagnóstico basado en EVIDENCIA del chat y código. 2-3 oraciones>",
@@ -139,7 +111,7 @@ FORMATO JSON (RESPONDE SOLO ESTO):
   ],
   "teacher_advice": "<Consejo práctico para el docente sobre cómo actuar con este estudiante>",
   "positive_aspects": ["<Aspecto positivo si existe>", "..."]
-}}
+}
 
 ═══════════════════════════════════════════════════════════════════
 IMPORTANTE:
@@ -148,30 +120,70 @@ IMPORTANTE:
 - Si el chat está vacío, consideralo un factor de riesgo moderado (MEDIUM).
 - NO castigues la frustración legítima si el alumno muestra esfuerzo.
 - La solicitud directa de código ES el indicador más fuerte de riesgo.
+"""
 
+# Sent once per cohort; the returned Ollama `context` is reused for every student
+RISK_ANALYSIS_PRIMING = """
+A continuación recibirás los datos de un estudiante. Hasta entonces, respondé solamente: OK
 """
 
+class RiskAnalyzer:
+    def __init__(self, model: str = None, base_url: str = None, client: OllamaClient = ollama_client, prefilter: Optional[RiskPrefilter] = risk_prefilter):
+        self.model = model or os.getenv("OLLAMA_MODEL", "llama3")
+        # None = use the endpoint discovered by the shared registry
+        self.base_url = base_url
+        self.client = client
+        self.prefilter = prefilter if settings.RISK_PREFILTER_ENABLED else None
+
+    def analyze_student_risk(self, student_name: str, activity_title: str, chat_history: List[Dict], code_submission: str, grade: float, raise_errors: bool = False, context: Optional[List[int]] = None, use_prefilter: bool = True) -> Dict[str, Any]:
+        """
+        Analyzes student risk based on chat history and submission.
+        The rule-based pre-filter answers clear cases; only ambiguous ones reach the LLM.
+        With `raise_errors` a failed call raises instead of returning the fallback
+        result, so a background task can retry it. `context` is the value returned
+        by prime_context(): only the student's data is sent on top of it.
+        """
+        assessment = self.prefilter.assess(chat_history, code_submission, grade) if (use_prefilter and self.prefilter) else None
+        if assessment and not assessment.escalate:
+            return assessment.to_result()
+
+        # 1. Format Chat History
+        chat_text = ""
+        if not chat_history:
+            chat_text = "No hay interacciones de chat registradas."
+        else:
+            for msg in chat_history[-15:]: # Last 15 messages
+                role = "Estudiante" if msg.get('role') == 'user' else "IA Tutor"
+                chat_text += f"{role}: {msg.get('content')}\n"
+
+        # 2. Build Prompt: static instructions first, then this student's data
+        student_prompt = self._student_prompt(student_name, activity_title, chat_text, code_submission or "", grade)
+        extra = {}
+        if context:
+            prompt = student_prompt
+            extra["context"] = context
+        else:
+            prompt = RISK_ANALYSIS_INSTRUCTIONS + student_prompt
+
         try:
-            url = f"{self.base_url}/api/generate"
-            response = requests.post(
-                url,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json",
-                    "options": {
+            try:
+                result = self.client.generate_sync(
+                    model=self.model,
+                    prompt=prompt,
+                    format="json",
+                    options={
                         "temperature": 0.2
-                    }
-                },
-                timeout=60
-            )
+                    },
+                    timeout=settings.OLLAMA_RISK_TIMEOUT_SECONDS,
+                    base_url=self.base_url,
+                    **extra
+                )
+            except OllamaError as e:
+                if e.status_code is None or raise_errors:
+                    raise
+                logger.error(f"Ollama Risk Analysis Failed: {e}")
+                return self._fallback_risk("", assessment)
 
-            if response.status_code != 200:
-                logger.error(f"Ollama Risk Analysis Failed: {response.text}")
-                return self._fallback_risk()
-
-            result = response.json()
             raw_response = result.get('response', '{}')
             
             # Parse JSON
@@ -181,15 +193,121 @@ IMPORTANTE:
                 if start != -1 and end != -1:
                     return json.loads(raw_response[start:end+1])
                 else:
-                    return self._fallback_risk("Error de formato JSON")
+                    if raise_errors:
+                        raise ValueError("Error de formato JSON")
+                    return self._fallback_risk("Error de formato JSON", assessment)
             except Exception:
-                return self._fallback_risk("Error de parsing JSON")
+                if raise_errors:
+                    raise
+                return self._fallback_risk("Error de parsing JSON", assessment)
 
         except Exception as e:
             logger.error(f"Risk Analysis Exception: {e}")
-            return self._fallback_risk(str(e))
+            if raise_errors:
+                raise
+            return self._fallback_risk(str(e), assessment)
+
+    def prime_context(self) -> Optional[List[int]]:
+        """
+        Evaluates the static instructions once and returns the Ollama `context`
+        (the model state after reading them), or None if the server didn't return one.
+        """
+        result = self.client.generate_sync(
+            model=self.model,
+            prompt=RISK_ANALYSIS_INSTRUCTIONS + RISK_ANALYSIS_PRIMING,
+            options={
+                "temperature": 0,
+                "num_predict": 1
+            },
+            timeout=settings.OLLAMA_READ_TIMEOUT_SECONDS,
+            base_url=self.base_url
+        )
+        return result.get('context') or None
+
+    def analyze_cohort(
+        self,
+        students: List[Dict[str, Any]],
+        max_concurrency: int = 4,
+        llm_slot: Optional[ContextManager] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyzes a whole class. Each item of `students` has the arguments of
+        analyze_student_risk (student_name, activity_title, chat_history,
+        code_submission, grade). The instructions are evaluated once and shared
+        through `context`; students run `max_concurrency` at a time, and each LLM
+        call also holds `llm_slot` (e.g. the task queue's per-endpoint semaphore),
+        so the cohort counts against the endpoint's limit like single analyses do.
+        Returns one result per student, in order, with `"failed": True` on the
+        ones whose LLM call failed.
+        """
+        if not students:
+            return []
+
+        # Clear cases are settled by the rules; only ambiguous students need the LLM
+        results: List[Optional[Dict[str, Any]]] = [None] * len(students)
+        assessments: List[Optional[RiskAssessment]] = [None] * len(students)
+        escalated: List[int] = []
+        for i, student in enumerate(students):
+            if self.prefilter:
+                assessments[i] = self.prefilter.assess(student.get("chat_history"), student.get("code_submission"), student.get("grade"))
+                if not assessments[i].escalate:
+                    results[i] = assessments[i].to_result()
+                    continue
+            escalated.append(i)
+        logger.info(f"Risk Analysis cohort: {len(students) - len(escalated)} settled by rules, {len(escalated)} sent to the LLM")
+        if not escalated:
+            return results
+
+        slot = llm_slot or nullcontext()
+        try:
+            with slot:
+                context = self.prime_context()
+        except Exception as e:
+            # Ollama down: every student would fail the same way, let the caller retry
+            logger.error(f"Risk Analysis priming failed: {e}")
+            raise
 
-    def _fallback_risk(self, reason: str = "") -> Dict[str, Any]:
+        def analyze(i: int) -> Dict[str, Any]:
+            try:
+                with slot:
+                    return self.analyze_student_risk(**students[i], raise_errors=True, context=context, use_prefilter=False)
+            except Exception as e:
+                logger.error(f"Risk Analysis failed for {students[i].get('student_name')}: {e}")
+                return {**self._fallback_risk(str(e), assessments[i]), "failed": True}
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="cohort-risk") as pool:
+            for i, result in zip(escalated, pool.map(analyze, escalated)):
+                results[i] = result
+        return results
+
+    def _student_prompt(self, student_name: str, activity_title: str, chat_text: str, code_submission: str, grade: float) -> str:
+        # Only this part changes between students: the instructions come first so the
+        # model can reuse them (Ollama `context` / prompt prefix cache)
+        return f"""
+Estudiante: '{student_name}' | Actividad: '{activity_title}'
+
+═══════════════════════════════════════════════════════════════════
+DATOS DEL ESTUDIANTE:
+═══════════════════════════════════════════════════════════════════
+📊 Nota Final de la Actividad: {grade}/100
+
+💻 Código Entregado:
+{code_submission[:1000]}
+... (truncado)
+
+🗨️ Historial de Chat con el Tutor IA (Últimas 15 interacciones):
+{chat_text}
+
+Evalúa el riesgo del estudiante '{student_name}' siguiendo las instrucciones y RESPONDE SOLO EL JSON.
+"""
+
+    def _fallback_risk(self, reason: str = "", assessment: Optional[RiskAssessment] = None) -> Dict[str, Any]:
+        if assessment:
+            # The LLM failed on an ambiguous case: the rules' provisional score beats an empty one
+            result = assessment.to_result()
+            result["evidence"] = result["evidence"] + [f"Análisis IA no disponible: {reason or 'error de Ollama'}"]
+            result["teacher_advice"] += " Revise manualmente la entrega."
+            return result
         return {
             "risk_score": 0,
             "risk_level": "LOW",
@@ -198,3 +316,5 @@ IMPORTANTE:
             "teacher_advice": "Revise manualmente la entrega.",
             "positive_aspects": []
         }
+
+risk_analyzer = RiskAnalyzer()
@@ -0,0 +1,250 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from src.infrastructure.config.settings import settings
+
+def _bank(*patterns: str) -> List[Pattern]:
+    return [re.compile(p, re.IGNORECASE) for p in patterns]
+
+# Same signals the RiskAnalyzer prompt asks llama3 to look for (rioplatense + neutral Spanish)
+COPY_SEEKING = _bank(
+    r"\b(d[aá]me|pas[aá]me|hac[eé]me|escrib[ií]me|mostrame|resolv[eé]me|complet[aá]me)\b.{0,30}\b(c[oó]digo|soluci[oó]n|ejercicio|programa|respuesta|tarea)\b",
+    r"\b(escrib[ií]|complet[aá]|resolv[eé]|hac[eé])\s+(el|la|este|esta|esto)\s+(c[oó]digo|programa|ejercicio|soluci[oó]n)\b",
+    r"\bresu[eé]lve(lo|me)\b",
+    r"\bhacelo vos\b",
+    r"\b(solo|s[oó]lo)\s+(quiero|necesito)\s+(el|la)\s+(c[oó]digo|respuesta|soluci[oó]n)\b",
+)
+FRUSTRATION = _bank(
+    r"\bno (puedo|me sale|funciona|entiendo nada)\b",
+    r"\b(esto )?es imposible\b",
+    r"\bno sirvo para\b",
+    r"\bqu[eé] (dif[ií]cil|complicado)\b",
+    r"\bestoy (harto|harta|cansado|cansada|perdido|perdida)\b",
+)
+SURRENDER = _bank(
+    r"\bme rindo\b",
+    r"\bdej[aá],? no importa\b",
+    r"\bno (lo )?voy a (hacer|terminar|entregar)\b",
+    r"\b(abandono|largo todo|dejo la materia)\b",
+)
+AGGRESSION = _bank(
+    r"\b(mierda|carajo|put[oa]|boludo|pelotudo|idiota|est[uú]pid[oa]|in[uú]til|basura|forro)\b",
+)
+CONCEPTUAL = _bank(
+    r"\bpor qu[eé]\b",
+    r"\bc[oó]mo funciona\b",
+    r"\bqu[eé] (significa|diferencia|hace)\b",
+    r"\bpara qu[eé] sirve\b",
+    r"\bcu[aá]l es la diferencia\b",
+)
+CODE_SHARE = _bank(
+    r"```",
+    r"\bdef \w+\(",
+    r"\bprint\(",
+    r"\bfor \w+ in\b",
+    r"\b(if|while|elif)\b[^\n]*:",
+)
+
+# A sustained-caps message: enough letters and almost all of them upper case
+_LETTERS = re.compile(r"[A-Za-zÁÉÍÓÚÑáéíóúñ]")
+
+def _is_shouting(text: str) -> bool:
+    letters = _LETTERS.findall(text)
+    if len(letters) < 8:
+        return False
+    upper = sum(1 for c in letters if c.isupper())
+    return upper / len(letters) >= 0.7
+
+def _level(score: int) -> str:
+    if score <= 30:
+        return "LOW"
+    if score <= 60:
+        return "MEDIUM"
+    if score <= 85:
+        return "HIGH"
+    return "CRITICAL"
+
+@dataclass
+class RiskFeatures:
+    user_messages: int = 0
+    code_requests: List[str] = field(default_factory=list)
+    frustration: List[str] = field(default_factory=list)
+    surrender: List[str] = field(default_factory=list)
+    aggression: List[str] = field(default_factory=list)
+    conceptual_questions: int = 0
+    code_shares: int = 0
+    code_length: int = 0
+    grade: float = 0.0
+
+    @property
+    def empty_code(self) -> bool:
+        return self.code_length == 0
+
+@dataclass
+class RiskAssessment:
+    risk_score: int
+    risk_level: str
+    diagnosis: str
+    evidence: List[str]
+    teacher_advice: str
+    positive_aspects: List[str]
+    escalate: bool  # ambiguous: let the LLM decide
+    features: RiskFeatures
+
+    def to_result(self) -> Dict[str, Any]:
+        """Same shape as RiskAnalyzer.analyze_student_risk."""
+        return {
+            "risk_score": self.risk_score,
+            "risk_level": self.risk_level,
+            "diagnosis": self.diagnosis,
+            "evidence": self.evidence,
+            "teacher_advice": self.teacher_advice,
+            "positive_aspects": self.positive_aspects,
+            "analyzed_by": "rules",
+        }
+
+class RiskPrefilter:
+    """
+    Local, LLM-free first pass of the risk analysis. Extracts lexical features from
+    the student's messages (copy-seeking, frustration, surrender, insults, sustained
+    caps, conceptual questions, shared code) plus code length and grade, and scores
+    them with the rubric of the RiskAnalyzer prompt. Only scores inside the
+    ambiguous band [escalate_min, escalate_max] need the LLM.
+    """
+    def __init__(self, escalate_min: int = 35, escalate_max: int = 65, evidence_per_signal: int = 2):
+        self.escalate_min = escalate_min
+        self.escalate_max = escalate_max
+        self.evidence_per_signal = evidence_per_signal
+
+    def extract(self, chat_history: List[Dict], code_submission: Optional[str], grade: Optional[float]) -> RiskFeatures:
+        features = RiskFeatures(grade=float(grade or 0.0), code_length=self._code_length(code_submission))
+        for msg in chat_history or []:
+            if msg.get("role") != "user":
+                continue
+            text = msg.get("content") or ""
+            features.user_messages += 1
+            if any(p.search(text) for p in COPY_SEEKING):
+                features.code_requests.append(text)
+            if any(p.search(text) for p in SURRENDER):
+                features.surrender.append(text)
+            elif any(p.search(text) for p in FRUSTRATION):
+                features.frustration.append(text)
+            if _is_shouting(text) or any(p.search(text) for p in AGGRESSION):
+                features.aggression.append(text)
+            if any(p.search(text) for p in CONCEPTUAL):
+                features.conceptual_questions += 1
+            if any(p.search(text) for p in CODE_SHARE):
+                features.code_shares += 1
+        return features
+
+    def assess(self, chat_history: List[Dict], code_submission: Optional[str], grade: Optional[float]) -> RiskAssessment:
+        features = self.extract(chat_history, code_submission, grade)
+        score, findings, advice = self._score(features)
+        positives = self._positives(features)
+        escalate = self.escalate_min <= score <= self.escalate_max
+
+        return RiskAssessment(
+            risk_score=score,
+            risk_level=_level(score),
+            diagnosis=" ".join(findings) if findings else "Sin señales de riesgo en el chat ni en la entrega.",
+            evidence=self._evidence(features),
+            teacher_advice=advice,
+            positive_aspects=positives or ["Ninguno evidente en esta actividad"],
+            escalate=escalate,
+            features=features
+        )
+
+    def _score(self, f: RiskFeatures) -> Tuple[int, List[str], str]:
+        # (score, finding, advice) per signal; the strongest one decides, positives lower it
+        signals: List[Tuple[int, str, str]] = []
+        requests = len(f.code_requests)
+
+        if requests >= 3:
+            signals.append((100, f"El estudiante pidió la solución directa {requests} veces.",
+                            "Validar autoría del código en clase y reforzar la resolución autónoma de problemas."))
+        elif requests:
+            signals.append((78, f"El estudiante pidió la solución directa {requests} {'vez' if requests == 1 else 'veces'}.",
+                            "Conversar sobre el uso del tutor como guía y no como fuente de soluciones."))
+        if f.surrender:
+            signals.append((88, "El estudiante expresó que abandona la actividad.",
+                            "Contactar al estudiante a la brevedad: hay señales de abandono."))
+        if f.frustration and f.aggression:
+            signals.append((80, "Hay frustración acompañada de mensajes agresivos o en mayúsculas sostenidas.",
+                            "Abordar la frustración en una tutoría individual."))
+        elif len(f.frustration) >= 2:
+            signals.append((60, "El estudiante mostró frustración en varios mensajes.",
+                            "Hacer seguimiento y ofrecer ejemplos guiados."))
+        elif f.frustration or f.aggression:
+            signals.append((35, "Hubo un momento puntual de frustración.",
+                            "Hacer un seguimiento liviano en la próxima clase."))
+
+        if f.user_messages == 0:
+            if f.grade < 40:
+                signals.append((75, "No hubo interacción con el tutor y la nota es baja.",
+                                "Contactar al estudiante: posible desinterés o bloqueo."))
+            elif f.grade > 80:
+                signals.append((50, "Nota alta sin ninguna interacción con el tutor.",
+                                "Validar autoría del código en clase."))
+            else:
+                signals.append((45, "No hay interacciones registradas con el tutor.",
+                                "Invitar al estudiante a usar el tutor para destrabar dudas."))
+        elif f.empty_code and f.user_messages >= 3:
+            signals.append((80, f"Envió {f.user_messages} mensajes al tutor pero entregó el código vacío.",
+                            "Contactar al estudiante: posible rendición tras intentarlo."))
+
+        if not signals:
+            score = 30 if f.grade < 40 else 10
+            return score, [], "Sin acciones necesarias; el estudiante trabaja de forma autónoma."
+
+        score, _, advice = max(signals, key=lambda s: s[0])
+        findings = [finding for _, finding, _ in sorted(signals, key=lambda s: -s[0])]
+        if requests < 3:
+            # Genuine effort lowers the risk (never below the copy-seeking floor of 3+ requests)
+            effort = min(f.conceptual_questions, 2) * 5 + (5 if f.code_shares else 0)
+            score -= effort
+        return max(0, min(100, score)), findings, advice
+
+    def _positives(self, f: RiskFeatures) -> List[str]:
+        positives = []
+        if f.conceptual_questions:
+            positives.append("Hizo preguntas conceptuales específicas")
+        if f.code_shares:
+            positives.append("Compartió su propio código para revisión")
+        if f.grade >= 80 and f.user_messages:
+            positives.append("Aprobó la actividad con buena nota usando el tutor")
+        return positives
+
+    def _evidence(self, f: RiskFeatures) -> List[str]:
+        evidence = []
+        for label, messages in (
+            ("pidió la solución", f.code_requests),
+            ("abandono", f.surrender),
+            ("frustración", f.frustration),
+            ("agresión/mayúsculas", f.aggression),
+        ):
+            for text in messages[:self.evidence_per_signal]:
+                evidence.append(f"Estudiante ({label}): '{text[:120]}'")
+        if f.user_messages == 0:
+            evidence.append("No hay interacciones registradas con el tutor.")
+        if f.empty_code:
+            evidence.append("Código entregado vacío.")
+        return evidence
+
+    @staticmethod
+    def _code_length(code: Optional[str]) -> int:
+        # Ignore comments, blank lines and the "no code" placeholder of the read model
+        if not code or code.strip() == "No se envió código":
+            return 0
+        lines = [line.strip() for line in code.splitlines()]
+        return sum(len(line) for line in lines if line and not line.startswith("#") and line != "pass")
+
+risk_prefilter = RiskPrefilter(
+    escalate_min=settings.RISK_PREFILTER_ESCALATE_MIN,
+    escalate_max=settings.RISK_PREFILTER_ESCALATE_MAX
+)
+
+def estimate_risk(chat_history: List[Dict], code_submission: Optional[str], grade: Optional[float]) -> Dict[str, Any]:
+    """Instant provisional risk for dashboards, before (or instead of) the LLM analysis."""
+    result = risk_prefilter.assess(chat_history, code_submission, grade).to_result()
+    result["provisional"] = True
+    return result
@@ -0,0 +1,191 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Optional, Dict, Any, List, Tuple, Set
+from src.infrastructure.config.settings import settings
+from src.domain.ai.ports.answer_cache import AnswerCachePort
+from src.infrastructure.ai.rag.embedding_engine import EmbeddingEngine, embedding_engine
+
+Scope = Tuple[str, str, str]
+
+class SemanticAnswerCache(AnswerCachePort):
+    """
+    In-process cache of LLM answers, scoped by (kind, activity, exercise).
+
+    A lookup embeds the question and returns the stored answer whose question is
+    closest by cosine similarity, provided it is above `similarity_threshold` and
+    the student's code is close enough to the code the answer was generated for.
+    Entries expire after `ttl_seconds` and the least recently used ones are evicted
+    beyond `max_entries`.
+    """
+    def __init__(
+        self,
+        embedding_engine: EmbeddingEngine,
+        similarity_threshold: float = 0.92,
+        code_similarity_threshold: float = 0.9,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 2000,
+        enabled: bool = True
+    ):
+        self.embedding_engine = embedding_engine
+        self.similarity_threshold = similarity_threshold
+        self.code_similarity_threshold = code_similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._scopes: Dict[Scope, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._code_mismatches = 0
+        self._evictions = 0
+
+    def get(
+        self,
+        kind: str,
+        activity_id: str,
+        exercise_id: Optional[str],
+        query: str,
+        code_context: Optional[str] = None
+    ) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        vector = self._embed(query)
+        code = self._normalize_code(code_context)
+        scope = self._scope(kind, activity_id, exercise_id)
+        now = time.monotonic()
+
+        with self._lock:
+            best_id, best_score, code_mismatch = None, self.similarity_threshold, False
+            for entry_id in list(self._scopes.get(scope, ())):
+                entry = self._entries[entry_id]
+                if now - entry["created_at"] > self.ttl_seconds:
+                    self._remove(entry_id)
+                    continue
+                score = sum(a * b for a, b in zip(vector, entry["vector"]))
+                if score < best_score:
+                    continue
+                if not self._same_code(code, entry["code"]):
+                    code_mismatch = True
+                    continue
+                best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self._misses += 1
+                if code_mismatch:
+                    self._code_mismatches += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self._hits += 1
+            print(f"--- [SemanticAnswerCache] HIT {kind} activity={activity_id} exercise={exercise_id} (similarity {best_score:.3f}) ---")
+            return self._entries[best_id]["answer"]
+
+    def put(
+        self,
+        kind: str,
+        activity_id: str,
+        exercise_id: Optional[str],
+        query: str,
+        answer: str,
+        code_context: Optional[str] = None
+    ) -> None:
+        if not self.enabled or not answer:
+            return
+
+        entry = {
+            "scope": self._scope(kind, activity_id, exercise_id),
+            "vector": self._embed(query),
+            "code": self._normalize_code(code_context),
+            "answer": answer,
+            "created_at": time.monotonic()
+        }
+        entry_id = str(uuid.uuid4())
+        with self._lock:
+            self._entries[entry_id] = entry
+            self._scopes.setdefault(entry["scope"], set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self._evictions += 1
+
+    def invalidate_activity(self, activity_id: str) -> None:
+        with self._lock:
+            for scope in [s for s in self._scopes if s[1] == str(activity_id)]:
+                for entry_id in list(self._scopes.get(scope, ())):
+                    self._remove(entry_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+            "skipped_code_changed": self._code_mismatches,
+            "evictions": self._evictions,
+        }
+
+    def _remove(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        ids = self._scopes.get(entry["scope"])
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._scopes[entry["scope"]]
+
+    def _embed(self, query: str) -> List[float]:
+        vector = self.embedding_engine.encode_query(query)
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _same_code(self, code: str, cached_code: str) -> bool:
+        if code == cached_code:
+            return True
+        if not code or not cached_code:
+            return False
+        matcher = SequenceMatcher(None, code, cached_code, autojunk=False)
+        # quick_ratio is an upper bound, so most different snippets are rejected cheaply
+        return (
+            matcher.quick_ratio() >= self.code_similarity_threshold
+            and matcher.ratio() >= self.code_similarity_threshold
+        )
+
+    @staticmethod
+    def _normalize_code(code_context: Optional[str]) -> str:
+        # Comments, indentation and blank lines don't change what the student is asking about
+        if not code_context:
+            return ""
+        lines = []
+        for line in code_context.splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                lines.append(" ".join(line.split()))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _scope(kind: str, activity_id: str, exercise_id: Optional[str]) -> Scope:
+        return (kind, str(activity_id), str(exercise_id or ""))
+
+answer_cache = SemanticAnswerCache(
+    embedding_engine,
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    code_similarity_threshold=settings.ANSWER_CACHE_CODE_SIMILARITY_THRESHOLD,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    enabled=settings.ANSWER_CACHE_ENABLED
+)
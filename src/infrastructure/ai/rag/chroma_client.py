@@ -0,0 +1,61 @@
+import threading
+from typing import Dict, Any
+from src.infrastructure.config.settings import settings
+
+class ChromaClientProvider:
+    """
+    Holds a single ChromaDB HttpClient for the whole process.
+    The HttpClient keeps its own pooled HTTP session, so sharing it avoids a new
+    connection + heartbeat per request. Collection handles are cached by name.
+    """
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._client = None
+        self._collections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client is not None
+
+    def get_client(self):
+        if self._client is not None:
+            return self._client
+
+        with self._lock:
+            if self._client is None:
+                import chromadb
+                print(f"--- [ChromaClientProvider] Connecting to ChromaDB at {self.host}:{self.port} ---")
+                try:
+                    client = chromadb.HttpClient(host=self.host, port=self.port)
+                    # Health check only once per process instead of once per request
+                    client.heartbeat()
+                except Exception as e:
+                    error_msg = f"Failed to connect to ChromaDB at {self.host}:{self.port}"
+                    print(f"--- [ChromaClientProvider] ERROR: {error_msg} ---")
+                    print(f"--- [ChromaClientProvider] Details: {str(e)} ---")
+                    print("--- [ChromaClientProvider] HINT: Make sure ChromaDB is running. For Docker: docker-compose up chroma ---")
+                    raise ConnectionError(error_msg) from e
+                self._client = client
+                print("--- [ChromaClientProvider] Successfully connected to ChromaDB ---")
+        return self._client
+
+    def get_collection(self, name: str):
+        collection = self._collections.get(name)
+        if collection is not None:
+            return collection
+
+        client = self.get_client()
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = client.get_or_create_collection(name=name)
+        return self._collections[name]
+
+    def reset(self) -> None:
+        """Drops the cached client so the next call reconnects (used on shutdown)."""
+        with self._lock:
+            self._client = None
+            self._collections.clear()
+
+chroma_provider = ChromaClientProvider(settings.CHROMA_DB_HOST, settings.CHROMA_DB_PORT)
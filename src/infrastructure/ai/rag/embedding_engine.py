@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any
+from src.infrastructure.config.settings import settings
+
+class EmbeddingEngine:
+    """
+    Process-wide wrapper around the SentenceTransformer model.
+    The model is loaded lazily on first use (or on warm_up) and shared by every RagService.
+    """
+    def __init__(self, model_name: str, query_cache_size: int = 512):
+        self.model_name = model_name
+        self.query_cache_size = query_cache_size
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._query_cache_hits = 0
+        self._model = None
+        self._lock = threading.Lock()
+        self._load_time_seconds: Optional[float] = None
+        self._encode_calls = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def _get_model(self):
+        if self._model is not None:
+            return self._model
+
+        with self._lock:
+            # Double-checked: another thread may have loaded it while we waited
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                print(f"--- [EmbeddingEngine] Loading embedding model '{self.model_name}'... ---")
+                started = time.perf_counter()
+                self._model = SentenceTransformer(self.model_name)
+                self._load_time_seconds = time.perf_counter() - started
+                print(f"--- [EmbeddingEngine] Model loaded in {self._load_time_seconds:.2f}s ---")
+        return self._model
+
+    def warm_up(self) -> None:
+        self._get_model()
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        model = self._get_model()
+        self._encode_calls += 1
+        return model.encode(texts).tolist()
+
+    def encode_query(self, text: str) -> List[float]:
+        """
+        Single-text encode with a small LRU: the answer cache and the retriever
+        embed the same question back to back.
+        """
+        key = text.strip()
+        with self._query_cache_lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                self._query_cache_hits += 1
+                return vector
+
+        vector = self.encode([key])[0]
+        with self._query_cache_lock:
+            self._query_cache[key] = vector
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "loaded": self.is_loaded,
+            "load_time_seconds": self._load_time_seconds,
+            "encode_calls": self._encode_calls,
+            "query_cache_hits": self._query_cache_hits,
+        }
+
+embedding_engine = EmbeddingEngine(settings.EMBEDDING_MODEL_NAME)
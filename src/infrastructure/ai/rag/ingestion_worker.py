@@ -0,0 +1,124 @@
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from src.infrastructure.config.settings import settings
+from src.application.learning.ports.document_ingestion_queue import IDocumentIngestionQueue, IngestionJob
+from src.application.teacher.ports.background_task_queue import BackgroundTask
+from src.domain.ai.ports.answer_cache import AnswerCachePort
+from src.domain.ai.ports.rag_service import RagServicePort
+from src.infrastructure.persistence.database import SessionLocal
+from src.infrastructure.persistence.repositories.document_repository_impl import SqlAlchemyDocumentRepository
+from src.infrastructure.ai.rag.rag_service import RagService
+from src.infrastructure.ai.rag.answer_cache import answer_cache
+from src.infrastructure.tasks.task_queue import PostgresTaskQueue, task_queue
+
+INGESTION_TASK = "document_ingestion"
+
+# BackgroundTask status -> IngestionJob status (a failed attempt waiting for its retry is queued again)
+_JOB_STATUS = {"pending": "queued", "running": "running", "completed": "completed", "failed": "failed"}
+
+def _default_rag_service(session: Session) -> RagServicePort:
+    return RagService(document_repository=SqlAlchemyDocumentRepository(session))
+
+class DocumentIngestionWorker(IDocumentIngestionQueue):
+    """
+    Document ingestion on the durable task queue (`background_tasks`).
+
+    Uploads only enqueue a task; the PostgresTaskQueue workers run
+    RagService.process_document with a DB session of their own and record the
+    progress in the task row. Any API process can therefore report a job, and
+    queued or interrupted jobs are picked up again after a restart.
+    The uploaded file must be readable by every process running the queue.
+    """
+    def __init__(
+        self,
+        task_queue: PostgresTaskQueue,
+        session_factory: Callable[[], Session] = SessionLocal,
+        rag_service_factory: Callable[[Session], RagServicePort] = _default_rag_service,
+        answer_cache: Optional[AnswerCachePort] = None,
+        max_concurrency: int = 1,
+        progress_interval_seconds: float = 1.0
+    ):
+        self.task_queue = task_queue
+        self.session_factory = session_factory
+        self.rag_service_factory = rag_service_factory
+        self.answer_cache = answer_cache
+        self.progress_interval_seconds = progress_interval_seconds
+
+        # Embedding is CPU-bound: only `max_concurrency` documents at once per process
+        task_queue.limiter.set_limit(INGESTION_TASK, max_concurrency)
+        task_queue.register(INGESTION_TASK, self._run_task, concurrency_key=lambda task: INGESTION_TASK)
+
+    def enqueue(self, activity_id: str, file_path: str, filename: str) -> IngestionJob:
+        task = self.task_queue.enqueue(
+            INGESTION_TASK,
+            {"activity_id": activity_id, "file_path": os.path.abspath(file_path), "filename": filename}
+        )
+        print(f"--- [DocumentIngestionWorker] Queued job {task.id} for {filename} (activity {activity_id}) ---")
+        return self._to_job(task)
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        task = self.task_queue.get_task(job_id)
+        if not task or task.kind != INGESTION_TASK:
+            return None
+        return self._to_job(task)
+
+    def _run_task(self, task: BackgroundTask) -> None:
+        payload = task.payload
+        progress: Dict[str, Any] = {"pages_total": None, "pages_processed": 0, "chunks_indexed": 0}
+        last_report = 0.0
+
+        def on_progress(pages_processed: int, pages_total: int, chunks_indexed: int) -> None:
+            nonlocal last_report
+            progress.update(pages_total=pages_total, pages_processed=pages_processed, chunks_indexed=chunks_indexed)
+            # One row update per interval, not per page
+            now = time.monotonic()
+            if now - last_report >= self.progress_interval_seconds:
+                last_report = now
+                self.task_queue.report_progress(task.id, progress)
+
+        session = self.session_factory()
+        try:
+            rag_service = self.rag_service_factory(session)
+            document = rag_service.process_document(
+                payload["activity_id"], payload["file_path"], payload["filename"], on_progress=on_progress
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"--- [DocumentIngestionWorker] Job {task.id} attempt {task.attempts} failed: {e} ---")
+            # The task queue records the error and schedules the retry
+            raise
+        finally:
+            session.close()
+
+        progress["document_id"] = document.id
+        self.task_queue.report_progress(task.id, progress)
+        # Answers cached for this activity were grounded on the previous material
+        if self.answer_cache:
+            self.answer_cache.invalidate_activity(payload["activity_id"])
+        print(f"--- [DocumentIngestionWorker] Job {task.id} completed ({progress['chunks_indexed']} chunks) ---")
+
+    def _to_job(self, task: BackgroundTask) -> IngestionJob:
+        progress = task.progress or {}
+        return IngestionJob(
+            id=task.id,
+            activity_id=task.payload.get("activity_id"),
+            filename=task.payload.get("filename"),
+            status=_JOB_STATUS.get(task.status, task.status),
+            pages_total=progress.get("pages_total"),
+            pages_processed=progress.get("pages_processed", 0),
+            chunks_indexed=progress.get("chunks_indexed", 0),
+            document_id=progress.get("document_id"),
+            error=task.last_error,
+            created_at=task.created_at,
+            started_at=task.started_at,
+            finished_at=task.finished_at
+        )
+
+ingestion_queue = DocumentIngestionWorker(
+    task_queue=task_queue,
+    answer_cache=answer_cache,
+    max_concurrency=settings.INGESTION_WORKERS
+)
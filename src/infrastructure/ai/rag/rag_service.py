@@ -1,109 +1,172 @@
 import os
 import uuid
-from typing import List
+import hashlib
+from typing import AsyncIterator, Callable, Dict, List, Iterator, Optional, Set, Tuple
 from pypdf import PdfReader
-# from langchain.text_splitter import RecursiveCharacterTextSplitter # Moved inside method
-from sentence_transformers import SentenceTransformer
-import chromadb
 from src.infrastructure.config.settings import settings
 from src.domain.learning.ports.document_repository import DocumentRepository, ActivityDocument
-from src.domain.ai.ports.rag_service import RagServicePort
+from src.domain.ai.ports.rag_service import RagServicePort, StreamInterruptedError, AI_UNAVAILABLE_MESSAGE, AI_EMPTY_RESPONSE_MESSAGE
+from src.infrastructure.ai.rag.embedding_engine import EmbeddingEngine, embedding_engine
+from src.infrastructure.ai.rag.chroma_client import ChromaClientProvider, chroma_provider
+from src.infrastructure.ai.llm.ollama_client import OllamaClient, ollama_client
+from src.infrastructure.ai.rag.text_chunker import IncrementalTextChunker
+
+COLLECTION_NAME = "activity_documents"
+TUTOR_MODEL = "llama3"
+PREVIEW_CHARS = 5000
+
+# (pages_processed, pages_total, chunks_indexed)
+ProgressCallback = Callable[[int, int, int], None]
 
 class RagService(RagServicePort):
-    def __init__(self, document_repository: DocumentRepository):
+    def __init__(
+        self,
+        document_repository: DocumentRepository,
+        embedding_engine: EmbeddingEngine = embedding_engine,
+        chroma_provider: ChromaClientProvider = chroma_provider,
+        ollama_client: OllamaClient = ollama_client,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE
+    ):
+        # Model and Chroma client are process-wide singletons, so building a
+        # RagService per request is cheap (no model load, no heartbeat).
         self.document_repository = document_repository
-        # Initialize ChromaDB in Client/Server mode
-        print(f"--- [RagService] Connecting to ChromaDB at {settings.CHROMA_DB_HOST}:{settings.CHROMA_DB_PORT} ---")
-        try:
-            self.chroma_client = chromadb.HttpClient(
-                host=settings.CHROMA_DB_HOST, 
-                port=settings.CHROMA_DB_PORT
-            )
-            # Simple health check or list collections to verify connection
-            self.chroma_client.heartbeat()
-            print("--- [RagService] Successfully connected to ChromaDB ---")
-        except Exception as e:
-            error_msg = f"Failed to connect to ChromaDB at {settings.CHROMA_DB_HOST}:{settings.CHROMA_DB_PORT}"
-            print(f"--- [RagService] ERROR: {error_msg} ---")
-            print(f"--- [RagService] Details: {str(e)} ---")
-            print(f"--- [RagService] HINT: Make sure ChromaDB is running. For Docker: docker-compose up chroma ---")
-            raise ConnectionError(error_msg) from e
+        self.embedding_model = embedding_engine
+        self.chroma_provider = chroma_provider
+        self.ollama_client = ollama_client
+        self.batch_size = max(1, batch_size)
 
-        self.collection = self.chroma_client.get_or_create_collection(name="activity_documents")
-        # Initialize Embedding Model
-        print("--- [RagService] Loading embedding model 'all-MiniLM-L6-v2'... ---")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("--- [RagService] Embedding model loaded successfully ---") 
+    @property
+    def collection(self):
+        return self.chroma_provider.get_collection(COLLECTION_NAME)
 
-    def process_document(self, activity_id: str, file_path: str, filename: str) -> ActivityDocument:
+    def process_document(
+        self,
+        activity_id: str,
+        file_path: str,
+        filename: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> ActivityDocument:
+        """
+        Streams the PDF page by page: text is chunked incrementally, embedded in
+        batches of EMBEDDING_BATCH_SIZE and upserted to Chroma batch by batch, so
+        memory stays flat and progress can be reported per page.
+
+        Chunk ids are derived from the chunk content, so re-uploading a document
+        only embeds the chunks that changed and deletes the ones that disappeared;
+        unchanged chunks only get their `chunk_index` metadata moved.
+        An identical file is not re-indexed at all.
+        """
         print(f"--- [RagService] Processing document: {filename} for activity {activity_id} ---")
+
+        # 0. Skip unchanged re-uploads
+        try:
+            content_hash = self._file_hash(file_path)
+        except OSError as e:
+            error_msg = f"Failed to read PDF file: {str(e)}"
+            print(f"--- [RagService] ERROR: {error_msg} ---")
+            raise ValueError(error_msg) from e
+        existing = self.document_repository.find_by_activity_and_filename(activity_id, filename)
+        if existing and existing.content_hash == content_hash and existing.chunk_ids:
+            print(f"--- [RagService] {filename} is unchanged ({len(existing.chunk_ids)} chunks already indexed), skipping ---")
+            if on_progress:
+                on_progress(1, 1, len(existing.chunk_ids))
+            return existing
+        previous_ids = set(existing.chunk_ids) if existing else set()
+        if existing and not existing.chunk_ids:
+            # Indexed before chunk ids were tracked: find its chunks by metadata
+            previous_ids = self._indexed_chunk_ids(activity_id, filename)
         
-        # 1. Read PDF
+        # 1. Open PDF
         try:
             print(f"--- [RagService] Reading PDF from {file_path} ---")
             reader = PdfReader(file_path)
-            text = ""
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                text += page_text
-                print(f"--- [RagService] Extracted {len(page_text)} chars from page {page_num + 1} ---")
-            
-            print(f"--- [RagService] Total extracted text: {len(text)} characters ---")
-            
-            if not text.strip():
-                raise ValueError("PDF file appears to be empty or contains no extractable text")
-                
+            total_pages = len(reader.pages)
         except Exception as e:
             error_msg = f"Failed to read PDF file: {str(e)}"
             print(f"--- [RagService] ERROR: {error_msg} ---")
             raise ValueError(error_msg) from e
-        
-        # 2. Split Text
+
         try:
-            print(f"--- [RagService] Splitting text into chunks... ---")
-            from langchain.text_splitter import RecursiveCharacterTextSplitter
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200,
-                length_function=len
-            )
-            chunks = text_splitter.split_text(text)
-            print(f"--- [RagService] Created {len(chunks)} chunks ---")
+            chunker = IncrementalTextChunker(chunk_size=1000, chunk_overlap=200)
         except Exception as e:
             error_msg = f"Failed to split text: {str(e)}"
             print(f"--- [RagService] ERROR: {error_msg} ---")
             raise ValueError(error_msg) from e
-        
-        # 3. Embed & Store
+
+        batch_size = self.batch_size
+        pending: List[str] = []
+        chunk_ids: List[str] = []     # every chunk of the new version, in order
+        upserted_ids: List[str] = []  # chunks this run actually wrote
+        retained: List[Tuple[int, str]] = []  # (new index, id) of chunks kept from the previous version
+        seen: Dict[str, int] = {}
+        preview = ""
+        total_chars = 0
+
+        def index(batch: List[str]) -> None:
+            ids = [self._chunk_id(activity_id, filename, chunk, seen) for chunk in batch]
+            first_index = len(chunk_ids)
+            chunk_ids.extend(ids)
+            fresh = [(i, chunk_id, chunk) for i, (chunk_id, chunk) in enumerate(zip(ids, batch)) if chunk_id not in previous_ids]
+            retained.extend((first_index + i, chunk_id) for i, chunk_id in enumerate(ids) if chunk_id in previous_ids)
+            if fresh:
+                self._index_batch(activity_id, filename, fresh, first_index, upserted_ids)
+
+        # 2. Read -> Split -> Embed & Store, one page at a time
         try:
-            print(f"--- [RagService] Generating embeddings for {len(chunks)} chunks... ---")
-            ids = [str(uuid.uuid4()) for _ in chunks]
-            embeddings = self.embedding_model.encode(chunks).tolist()
-            metadatas = [{"activity_id": activity_id, "filename": filename, "chunk_index": i} for i in range(len(chunks))]
-            
-            print(f"--- [RagService] Storing embeddings in ChromaDB... ---")
-            self.collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                documents=chunks,
-                metadatas=metadatas
-            )
-            print(f"--- [RagService] Successfully stored {len(chunks)} chunks in ChromaDB ---")
+            for page_num, page in enumerate(reader.pages):
+                try:
+                    page_text = page.extract_text() or ""
+                except Exception as e:
+                    raise ValueError(f"Failed to read PDF file: {str(e)}") from e
+                total_chars += len(page_text.strip())
+                if len(preview) < PREVIEW_CHARS:
+                    preview += page_text[:PREVIEW_CHARS - len(preview)]
+
+                pending.extend(chunker.feed(page_text))
+                while len(pending) >= batch_size:
+                    index(pending[:batch_size])
+                    pending = pending[batch_size:]
+
+                if on_progress:
+                    on_progress(page_num + 1, total_pages, len(chunk_ids))
+
+            if total_chars == 0:
+                raise ValueError("Failed to read PDF file: PDF file appears to be empty or contains no extractable text")
+
+            pending.extend(chunker.flush())
+            for i in range(0, len(pending), batch_size):
+                index(pending[i:i + batch_size])
+            if on_progress:
+                on_progress(total_pages, total_pages, len(chunk_ids))
         except Exception as e:
-            error_msg = f"Failed to store embeddings: {str(e)}"
+            # Don't leave a half-indexed version behind; chunks shared with the previous one stay
+            self._discard_chunks(upserted_ids)
+            error_msg = str(e) if isinstance(e, ValueError) else f"Failed to store embeddings: {str(e)}"
             print(f"--- [RagService] ERROR: {error_msg} ---")
             raise ValueError(error_msg) from e
+
+        self._reposition_chunks(activity_id, filename, retained)
+        stale_ids = list(previous_ids - set(chunk_ids))
+        self._discard_chunks(stale_ids)
+        print(
+            f"--- [RagService] Indexed {filename}: {len(chunk_ids)} chunks from {total_pages} pages "
+            f"({len(upserted_ids)} embedded, {len(chunk_ids) - len(upserted_ids)} unchanged, {len(stale_ids)} removed) ---"
+        )
         
-        # 4. Save Metadata to DB
+        # 3. Save Metadata to DB
         try:
             print(f"--- [RagService] Saving document metadata to database... ---")
             doc = ActivityDocument(
-                id=str(uuid.uuid4()),
+                id=existing.id if existing else str(uuid.uuid4()),
                 activity_id=activity_id,
                 filename=filename,
-                content_text=text[:5000],  # Store first 5000 chars as preview or full text if small
-                embedding_id="chroma_collection" 
+                content_text=preview,  # First 5000 chars as preview
+                embedding_id="chroma_collection",
+                content_hash=content_hash,
+                chunk_ids=chunk_ids
             )
+            if existing:
+                doc.created_at = existing.created_at
             self.document_repository.save(doc)
             print(f"--- [RagService] Document processed successfully: {doc.id} ---")
             return doc
@@ -112,8 +175,73 @@ class RagService(RagServicePort):
             print(f"--- [RagService] ERROR: {error_msg} ---")
             raise ValueError(error_msg) from e
 
+    def _index_batch(self, activity_id: str, filename: str, chunks: List[Tuple[int, str, str]], first_index: int, upserted_ids: List[str]) -> None:
+        ids = [chunk_id for _, chunk_id, _ in chunks]
+        documents = [chunk for _, _, chunk in chunks]
+        embeddings = self.embedding_model.encode(documents)
+        metadatas = [
+            {"activity_id": activity_id, "filename": filename, "chunk_index": first_index + offset}
+            for offset, _, _ in chunks
+        ]
+        self.collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas
+        )
+        upserted_ids.extend(ids)
+        print(f"--- [RagService] Embedded batch of {len(ids)} new chunks ({len(upserted_ids)} total) ---")
+
+    def _reposition_chunks(self, activity_id: str, filename: str, chunks: List[Tuple[int, str]]) -> None:
+        # Metadata-only update: kept chunks are not re-embedded, but content inserted or
+        # removed before them shifts their position in the new version
+        for i in range(0, len(chunks), self.batch_size):
+            batch = chunks[i:i + self.batch_size]
+            try:
+                self.collection.update(
+                    ids=[chunk_id for _, chunk_id in batch],
+                    metadatas=[{"activity_id": activity_id, "filename": filename, "chunk_index": index} for index, _ in batch]
+                )
+            except Exception as e:
+                print(f"--- [RagService] WARNING: Could not update the position of {len(batch)} chunks: {e} ---")
+
+    def _discard_chunks(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        try:
+            self.collection.delete(ids=ids)
+        except Exception as e:
+            print(f"--- [RagService] WARNING: Could not remove {len(ids)} chunks: {e} ---")
+
+    def _indexed_chunk_ids(self, activity_id: str, filename: str) -> Set[str]:
+        try:
+            found = self.collection.get(
+                where={"$and": [{"activity_id": activity_id}, {"filename": filename}]},
+                include=[]
+            )
+            return set(found.get("ids") or [])
+        except Exception as e:
+            print(f"--- [RagService] WARNING: Could not list previous chunks of {filename}: {e} ---")
+            return set()
+
+    @staticmethod
+    def _chunk_id(activity_id: str, filename: str, chunk: str, seen: Dict[str, int]) -> str:
+        # Same text in the same document -> same id; repeated chunks get an occurrence suffix
+        digest = hashlib.sha256(f"{activity_id}|{filename}|{chunk}".encode("utf-8")).hexdigest()
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        return digest if occurrence == 0 else f"{digest}-{occurrence}"
+
+    @staticmethod
+    def _file_hash(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
     def query(self, activity_id: str, query_text: str, n_results: int = 3) -> List[str]:
-        query_embedding = self.embedding_model.encode([query_text]).tolist()
+        query_embedding = [self.embedding_model.encode_query(query_text)]
         results = self.collection.query(
             query_embeddings=query_embedding,
             n_results=n_results,
@@ -147,7 +275,54 @@ class RagService(RagServicePort):
         solution_code: str = None
     ) -> str:
         print("DEBUG: generate_tutor_response called")
-        
+        prompt = self._build_tutor_prompt(query, context, history, code_context, problem_statement, solution_code)
+        return self._call_ollama(prompt)
+
+    def stream_tutor_response(
+        self, 
+        query: str, 
+        context: str, 
+        history: List[dict], 
+        code_context: str = None,
+        problem_statement: str = None,
+        solution_code: str = None
+    ) -> Iterator[str]:
+        prompt = self._build_tutor_prompt(query, context, history, code_context, problem_statement, solution_code)
+        return self._stream_ollama(prompt)
+
+    async def generate_tutor_response_async(
+        self,
+        query: str,
+        context: str,
+        history: List[dict],
+        code_context: str = None,
+        problem_statement: str = None,
+        solution_code: str = None
+    ) -> str:
+        prompt = self._build_tutor_prompt(query, context, history, code_context, problem_statement, solution_code)
+        return await self._call_ollama_async(prompt)
+
+    def stream_tutor_response_async(
+        self,
+        query: str,
+        context: str,
+        history: List[dict],
+        code_context: str = None,
+        problem_statement: str = None,
+        solution_code: str = None
+    ) -> AsyncIterator[str]:
+        prompt = self._build_tutor_prompt(query, context, history, code_context, problem_statement, solution_code)
+        return self._stream_ollama_async(prompt)
+
+    def _build_tutor_prompt(
+        self,
+        query: str,
+        context: str,
+        history: List[dict],
+        code_context: str = None,
+        problem_statement: str = None,
+        solution_code: str = None
+    ) -> str:
         # Build history string
         history_str = ""
         for msg in history[-5:]: # Last 5 messages for context window
@@ -263,31 +438,118 @@ CONSULTA ACTUAL DEL ESTUDIANTE:
 TU RESPUESTA (PROFESOR TURING):
 ═══════════════════════════════════════════════════════════════════
 """
-        
-        return self._call_ollama(prompt)
+        return prompt
 
     def _call_ollama(self, prompt: str) -> str:
         try:
-            import requests
-            base_url = settings.OLLAMA_BASE_URL.rstrip("/")
-            model = "llama3"
-            
             print(f"DEBUG: Calling Ollama with prompt length: {len(prompt)}")
-            response = requests.post(
-                f"{base_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.2, # Added parameter: Low temperature makes it stricter and less creative
-                        "top_p": 0.9
-                    }
-                }
+            result = self.ollama_client.generate_sync(
+                model=TUTOR_MODEL,
+                prompt=prompt,
+                options={
+                    "temperature": 0.2, # Added parameter: Low temperature makes it stricter and less creative
+                    "top_p": 0.9
+                },
+                timeout=settings.OLLAMA_READ_TIMEOUT_SECONDS
+            )
+            return result.get('response', AI_EMPTY_RESPONSE_MESSAGE)
+        except Exception as e:
+            print(f"Error calling Ollama: {e}")
+            return AI_UNAVAILABLE_MESSAGE
+
+    def _stream_ollama(self, prompt: str) -> Iterator[str]:
+        """
+        Yields response tokens as Ollama produces them (NDJSON stream).
+        Closing the generator cancels the upstream request, which stops generation.
+        A failure before the first token yields the "unavailable" message instead; after
+        it, StreamInterruptedError is raised so a truncated answer never looks complete.
+        The stream only ends normally once Ollama reports `done: true`.
+        """
+        chunks = self.ollama_client.stream_generate_sync(
+            model=TUTOR_MODEL,
+            prompt=prompt,
+            options={
+                "temperature": 0.2,
+                "top_p": 0.9
+            },
+            timeout=settings.OLLAMA_STREAM_CHUNK_TIMEOUT_SECONDS
+        )
+        produced = done = False
+        try:
+            for chunk in chunks:
+                token = chunk.get('response', "")
+                if token:
+                    produced = True
+                    yield token
+                if chunk.get('done'):
+                    done = True
+        except Exception as e:
+            print(f"Error calling Ollama (stream): {e}")
+            if produced:
+                raise StreamInterruptedError(f"The tutor answer was interrupted: {e}") from e
+            yield AI_UNAVAILABLE_MESSAGE
+            return
+        finally:
+            chunks.close()
+
+        # A connection closed before the final {"done": true} chunk is a cut-off answer too
+        if not done:
+            print("Error calling Ollama (stream): stream ended before completion")
+            if produced:
+                raise StreamInterruptedError("The tutor answer ended before the model reported completion")
+            yield AI_EMPTY_RESPONSE_MESSAGE
+
+    async def _call_ollama_async(self, prompt: str) -> str:
+        # Same as _call_ollama through the client's async API
+        try:
+            result = await self.ollama_client.generate(
+                model=TUTOR_MODEL,
+                prompt=prompt,
+                options={
+                    "temperature": 0.2,
+                    "top_p": 0.9
+                },
+                timeout=settings.OLLAMA_READ_TIMEOUT_SECONDS
             )
-            response.raise_for_status()
-            result = response.json()
-            return result.get('response', "Error: No se recibió respuesta de la IA.")
+            return result.get('response', AI_EMPTY_RESPONSE_MESSAGE)
         except Exception as e:
             print(f"Error calling Ollama: {e}")
-            return "El servidor del Tutor IA está temporalmente inaccesible. Por favor, intenta de nuevo."
\ No newline at end of file
+            return AI_UNAVAILABLE_MESSAGE
+
+    async def _stream_ollama_async(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Same as _stream_ollama through the client's async API: no thread is held
+        while waiting for tokens.
+        """
+        chunks = self.ollama_client.stream_generate(
+            model=TUTOR_MODEL,
+            prompt=prompt,
+            options={
+                "temperature": 0.2,
+                "top_p": 0.9
+            },
+            timeout=settings.OLLAMA_STREAM_CHUNK_TIMEOUT_SECONDS
+        )
+        produced = done = False
+        try:
+            async for chunk in chunks:
+                token = chunk.get('response', "")
+                if token:
+                    produced = True
+                    yield token
+                if chunk.get('done'):
+                    done = True
+        except Exception as e:
+            print(f"Error calling Ollama (stream): {e}")
+            if produced:
+                raise StreamInterruptedError(f"The tutor answer was interrupted: {e}") from e
+            yield AI_UNAVAILABLE_MESSAGE
+            return
+        finally:
+            await chunks.aclose()
+
+        if not done:
+            print("Error calling Ollama (stream): stream ended before completion")
+            if produced:
+                raise StreamInterruptedError("The tutor answer ended before the model reported completion")
+            yield AI_EMPTY_RESPONSE_MESSAGE
@@ -0,0 +1,36 @@
+from typing import List
+
+class IncrementalTextChunker:
+    """
+    Splits text that arrives piece by piece (one PDF page at a time) without
+    keeping the whole document in memory. Chunks are emitted as soon as they are
+    final; the last one stays buffered because it may continue on the next page.
+    """
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, buffer_chunks: int = 4):
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len
+        )
+        self.flush_threshold = chunk_size * buffer_chunks
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        if len(self._buffer) < self.flush_threshold:
+            return []
+
+        chunks = self.splitter.split_text(self._buffer)
+        if len(chunks) <= 1:
+            return []
+        tail = chunks[-1]
+        tail_start = self._buffer.rfind(tail)
+        self._buffer = self._buffer[tail_start:] if tail_start != -1 else tail
+        return chunks[:-1]
+
+    def flush(self) -> List[str]:
+        text, self._buffer = self._buffer, ""
+        if not text.strip():
+            return []
+        return self.splitter.split_text(text)
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from src.infrastructure.config.settings import settings
+from src.domain.learning.entities.exercise import Exercise
+
+def copy_exercise(exercise: Exercise) -> Exercise:
+    """Entities are mutable: callers get their own copy, test cases included."""
+    return replace(exercise, test_cases=[replace(tc) for tc in exercise.test_cases])
+
+class ExerciseCache:
+    """
+    In-process LRU of fully hydrated exercises (test cases already parsed), each
+    stored with the `updated_at` of the row it was built from. Entries younger
+    than the TTL are served as-is; older ones are handed back as stale so the
+    repository can revalidate them against `updated_at` with a cheap query
+    instead of reloading and re-parsing unchanged exercises. Local saves
+    invalidate immediately; edits from another process are seen after the TTL.
+    """
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 2000, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, Tuple[Optional[datetime], float, Exercise]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def token(self) -> int:
+        """Take before querying; `put` drops results read before an invalidation."""
+        with self._lock:
+            return self._generation
+
+    def get(self, exercise_id: str) -> Optional[Tuple[Exercise, Optional[datetime], bool]]:
+        """(copy of the exercise, its updated_at, fresh) or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(exercise_id)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(exercise_id)
+            fresh = time.monotonic() - entry[1] < self.ttl_seconds
+            if fresh:
+                self._hits += 1
+            exercise = entry[2]
+        return copy_exercise(exercise), entry[0], fresh
+
+    def revalidated(self, exercise_id: str) -> None:
+        """The row's updated_at still matches: serve the entry for another TTL."""
+        with self._lock:
+            entry = self._entries.get(exercise_id)
+            if entry:
+                self._entries[exercise_id] = (entry[0], time.monotonic(), entry[2])
+                self._revalidated += 1
+
+    def put(self, exercise: Exercise, updated_at: Optional[datetime], token: int) -> None:
+        if not self.enabled:
+            return
+        exercise = copy_exercise(exercise)
+        with self._lock:
+            if token != self._generation:
+                return  # invalidated while the caller was querying
+            self._entries[exercise.id] = (updated_at, time.monotonic(), exercise)
+            self._entries.move_to_end(exercise.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, exercise_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(exercise_id, None)
+            self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._invalidations += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._revalidated + self._misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "revalidated": self._revalidated,
+            "misses": self._misses,
+            "hit_rate": round((self._hits + self._revalidated) / lookups, 3) if lookups else None,
+            "invalidations": self._invalidations,
+        }
+
+exercise_cache = ExerciseCache(
+    ttl_seconds=settings.EXERCISE_CACHE_TTL_SECONDS,
+    max_entries=settings.EXERCISE_CACHE_MAX_ENTRIES,
+    enabled=settings.EXERCISE_CACHE_ENABLED
+)
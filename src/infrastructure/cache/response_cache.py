@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from src.infrastructure.config.settings import settings
+from src.application.learning.ports.activity_content_cache import ActivityContentCachePort
+
+@dataclass(frozen=True)
+class CachedResponse:
+    etag: str
+    body: bytes  # serialized JSON, sent as-is
+
+class ResponseCache(ActivityContentCachePort):
+    """
+    In-process LRU of serialized GET responses, each tagged with the activity it
+    renders. Same generation scheme as StudentCoursesCache: `invalidate_all` bumps
+    a global counter and `invalidate_activity` a per-activity one, and a `put`
+    computed under older generations is dropped. The TTL bounds staleness across
+    API processes.
+    """
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 2000, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, Tuple[str, Tuple[int, int], float, CachedResponse]]" = OrderedDict()
+        self._generation = 0
+        self._tag_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, key: str, tag: str) -> Tuple[Optional[CachedResponse], Any]:
+        """Returns (cached response or None on a miss, token to pass to `put`)."""
+        with self._lock:
+            token = self._token(tag)
+            entry = self._entries.get(key) if self.enabled else None
+            if entry and entry[1] == token and time.monotonic() - entry[2] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[3], token
+            if entry:
+                del self._entries[key]
+            self._misses += 1
+            return None, token
+
+    def put(self, key: str, tag: str, response: CachedResponse, token: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if token != self._token(tag):
+                return  # invalidated while the caller was rendering
+            self._entries[key] = (tag, token, time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_activity(self, activity_id: str) -> None:
+        with self._lock:
+            self._tag_generations[activity_id] = self._tag_generations.get(activity_id, 0) + 1
+            for key in [k for k, entry in self._entries.items() if entry[0] == activity_id]:
+                del self._entries[key]
+            self._invalidations += 1
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            # Per-activity counters only matter within one global generation
+            self._tag_generations.clear()
+            self._invalidations += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+            "invalidations": self._invalidations,
+        }
+
+    def _token(self, tag: str) -> Tuple[int, int]:
+        return (self._generation, self._tag_generations.get(tag, 0))
+
+response_cache = ResponseCache(
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
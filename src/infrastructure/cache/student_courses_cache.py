@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.infrastructure.config.settings import settings
+from src.application.learning.ports.student_courses_cache import StudentCoursesCachePort
+
+class StudentCoursesCache(StudentCoursesCachePort):
+    """
+    In-process LRU of each student's courses. Invalidation is by generation:
+    `invalidate_all` bumps a global counter and `invalidate_student` a per-student
+    one, and an entry (or a pending `put`) is only valid for the generations it was
+    read under. The TTL bounds staleness when several API processes run, since
+    invalidations are not shared between them.
+    """
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 5000, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], float, List[Any]]]" = OrderedDict()
+        self._generation = 0
+        self._student_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, student_id: str) -> Tuple[Optional[List[Any]], Any]:
+        with self._lock:
+            token = self._token(student_id)
+            entry = self._entries.get(student_id) if self.enabled else None
+            if entry and entry[0] == token and time.monotonic() - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(student_id)
+                self._hits += 1
+                return entry[2], token
+            if entry:
+                del self._entries[student_id]
+            self._misses += 1
+            return None, token
+
+    def put(self, student_id: str, courses: List[Any], token: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if token != self._token(student_id):
+                return  # invalidated while the caller was querying
+            self._entries[student_id] = (token, time.monotonic(), courses)
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_student(self, student_id: str) -> None:
+        with self._lock:
+            self._student_generations[student_id] = self._student_generations.get(student_id, 0) + 1
+            self._entries.pop(student_id, None)
+            self._invalidations += 1
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            # Per-student counters only matter within one global generation
+            self._student_generations.clear()
+            self._invalidations += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+            "invalidations": self._invalidations,
+        }
+
+    def _token(self, student_id: str) -> Tuple[int, int]:
+        return (self._generation, self._student_generations.get(student_id, 0))
+
+student_courses_cache = StudentCoursesCache(
+    ttl_seconds=settings.STUDENT_COURSES_CACHE_TTL_SECONDS,
+    max_entries=settings.STUDENT_COURSES_CACHE_MAX_ENTRIES,
+    enabled=settings.STUDENT_COURSES_CACHE_ENABLED
+)
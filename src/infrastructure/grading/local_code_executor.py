@@ -2,6 +2,7 @@ import subprocess
 import sys
 import tempfile
 import os
+from typing import Optional
 from src.domain.grading.ports.code_executor import CodeExecutor
 from src.domain.grading.value_objects.execution_result import ExecutionResult
 
@@ -14,7 +15,9 @@ class LocalCodeExecutor(CodeExecutor):
                 stderr="Only Python supported in Local Executor",
                 error="Unsupported Language"
             )
+        return self.run(code)
 
+    def run(self, code: str, stdin: str = "", timeout: Optional[float] = None) -> ExecutionResult:
         # Create a temporary file
         with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as tmp:
             tmp_path = tmp.name
@@ -25,9 +28,10 @@ class LocalCodeExecutor(CodeExecutor):
             # Timeout 5 seconds
             result = subprocess.run(
                 [sys.executable, tmp_path],
+                input=stdin,
                 capture_output=True,
                 text=True,
-                timeout=5
+                timeout=timeout or 5
             )
             
             return ExecutionResult(
@@ -0,0 +1,305 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+from src.infrastructure.config.settings import settings
+from src.domain.grading.ports.code_executor import CodeExecutor
+from src.domain.grading.value_objects.execution_result import ExecutionResult
+from src.infrastructure.grading.local_code_executor import LocalCodeExecutor
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+class SandboxWorkerError(Exception):
+    pass
+
+class SandboxBusyError(SandboxWorkerError):
+    """Every worker stayed busy for the whole acquire timeout."""
+    pass
+
+class SandboxWorker:
+    """One warm interpreter running sandbox_worker.py, spoken to over its stdin/stdout pipes."""
+    def __init__(self, python: str = sys.executable):
+        self.process = subprocess.Popen(
+            [python, "-I", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            start_new_session=True
+        )
+        self.runs = 0
+        ready = self._read_line(timeout=10)
+        if not ready.get("ready"):
+            self.terminate()
+            raise SandboxWorkerError("Sandbox worker did not start")
+        self.network_isolated = bool(ready.get("network_isolated"))
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.runs += 1
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise SandboxWorkerError(f"Sandbox worker is gone: {e}") from e
+        return self._read_line(timeout)
+
+    def _read_line(self, timeout: float) -> Dict[str, Any]:
+        # The worker enforces the run timeout itself; this watchdog only catches a hung worker
+        watchdog = threading.Timer(timeout, self.terminate)
+        watchdog.start()
+        try:
+            line = self.process.stdout.readline()
+        finally:
+            watchdog.cancel()
+        if not line:
+            raise SandboxWorkerError("Sandbox worker exited unexpectedly")
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            raise SandboxWorkerError(f"Invalid response from sandbox worker: {line[:200]}") from e
+
+    def terminate(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+
+class PooledCodeExecutor(CodeExecutor):
+    """
+    Runs student code on a pool of pre-started Python workers instead of a fresh
+    interpreter per run. Each run is forked inside a worker into its own network
+    namespace, as an unprivileged uid, with CPU, memory and process limits (see
+    sandbox_worker.py for what is and is not enforced by the kernel); workers are
+    replaced after `max_runs_per_worker` runs or when they crash. Falls back to
+    LocalCodeExecutor where fork() is not available.
+    """
+    def __init__(
+        self,
+        pool_size: int = 4,
+        max_runs_per_worker: int = 50,
+        timeout_seconds: float = 5.0,
+        cpu_seconds: int = 5,
+        memory_mb: int = 256,
+        max_output_bytes: int = 65536,
+        run_as_uid: int = 65534,
+        require_network_isolation: bool = False,
+        acquire_timeout_seconds: float = 30.0,
+        fallback: Optional[LocalCodeExecutor] = None
+    ):
+        self.pool_size = max(1, pool_size)
+        self.max_runs_per_worker = max_runs_per_worker
+        self.timeout_seconds = timeout_seconds
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_output_bytes = max_output_bytes
+        self.run_as_uid = run_as_uid
+        self.require_network_isolation = require_network_isolation
+        self.acquire_timeout_seconds = acquire_timeout_seconds
+        self.network_isolated: Optional[bool] = None
+        self.unprivileged: Optional[bool] = None
+        self.fallback = fallback or LocalCodeExecutor()
+        self.supported = os.name == "posix" and hasattr(os, "fork")
+
+        self._idle: queue.Queue = queue.Queue()
+        self._spawned = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._runs = 0
+        self._recycled = 0
+        self._crashes = 0
+
+    def execute(self, code: str, language: str, test_cases: list) -> ExecutionResult:
+        if language != "python":
+            return ExecutionResult(
+                exit_code=1,
+                stdout="",
+                stderr="Only Python supported in Local Executor",
+                error="Unsupported Language"
+            )
+        return self.run(code)
+
+    def run(self, code: str, stdin: str = "", timeout: Optional[float] = None) -> ExecutionResult:
+        """Runs `code` once, feeding `stdin`, on a warm worker."""
+        if not self.supported:
+            return self.fallback.run(code, stdin, timeout)
+
+        timeout = timeout or self.timeout_seconds
+        request = {
+            "code": code,
+            "stdin": stdin,
+            "timeout": timeout,
+            "cpu_seconds": self.cpu_seconds,
+            "memory_mb": self.memory_mb,
+            "max_output_bytes": self.max_output_bytes,
+            "uid": self.run_as_uid,
+            "require_network_isolation": self.require_network_isolation,
+        }
+
+        try:
+            worker = self._acquire()
+        except SandboxBusyError as e:
+            # Don't fall back to the less isolated LocalCodeExecutor just because the pool is busy
+            print(f"--- [PooledCodeExecutor] {e} ---")
+            return ExecutionResult(exit_code=1, stdout="", stderr="The code runner is busy, try again", error="Sandbox Busy")
+        except SandboxWorkerError as e:
+            print(f"--- [PooledCodeExecutor] Could not start a sandbox worker ({e}), using LocalCodeExecutor ---")
+            return self.fallback.run(code, stdin, timeout)
+
+        healthy = False
+        try:
+            response = worker.run(request, timeout=timeout + 5)
+            healthy = True
+        except SandboxWorkerError as e:
+            self._crashes += 1
+            print(f"--- [PooledCodeExecutor] Worker failed: {e} ---")
+            return ExecutionResult(exit_code=1, stdout="", stderr=str(e), error="Sandbox Error")
+        finally:
+            self._runs += 1
+            self._release(worker, healthy)
+
+        unprivileged = response.get("unprivileged")
+        if unprivileged is False and self.run_as_uid and self.unprivileged is None:
+            print(f"--- [PooledCodeExecutor] WARNING: uid {self.run_as_uid} cannot read the Python install; "
+                  "sandbox runs keep the API's user ---")
+        if unprivileged is not None:
+            self.unprivileged = unprivileged
+
+        if response.get("timed_out"):
+            return ExecutionResult(
+                exit_code=1,
+                stdout=response.get("stdout", ""),
+                stderr="Timeout",
+                error="Execution Timed Out"
+            )
+        return ExecutionResult(
+            exit_code=response.get("exit_code", 1),
+            stdout=response.get("stdout", ""),
+            stderr=response.get("stderr", ""),
+            error=response.get("error")
+        )
+
+    def warm_up(self) -> None:
+        """Starts the whole pool ahead of the first run."""
+        if not self.supported:
+            return
+        workers = []
+        while True:
+            with self._lock:
+                if self._spawned >= self.pool_size:
+                    break
+                self._spawned += 1
+            try:
+                workers.append(self._spawn())
+            except Exception:
+                with self._lock:
+                    self._spawned -= 1
+                raise
+        for worker in workers:
+            self._idle.put(worker)
+        print(f"--- [PooledCodeExecutor] {self._spawned} sandbox workers ready ---")
+
+    def shutdown(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().terminate()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._spawned = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "supported": self.supported,
+            "pool_size": self.pool_size,
+            "workers": self._spawned,
+            "idle": self._idle.qsize(),
+            "runs": self._runs,
+            "recycled": self._recycled,
+            "crashes": self._crashes,
+            "network_isolated": self.network_isolated,
+            "unprivileged": self.unprivileged,
+        }
+
+    def _acquire(self) -> SandboxWorker:
+        deadline = time.monotonic() + self.acquire_timeout_seconds
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_spawn = self._spawned < self.pool_size
+                if can_spawn:
+                    self._spawned += 1
+            if can_spawn:
+                try:
+                    return self._spawn()
+                except Exception as e:
+                    with self._lock:
+                        self._spawned -= 1
+                    raise SandboxWorkerError(str(e)) from e
+
+            # Pool is busy: wait for a worker to come back. Short waits, because a failed
+            # respawn frees a slot without putting anything in the queue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SandboxBusyError(f"No sandbox worker free after {self.acquire_timeout_seconds}s")
+            try:
+                return self._idle.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+
+    def _spawn(self) -> SandboxWorker:
+        worker = SandboxWorker()
+        if self.network_isolated is None and not worker.network_isolated:
+            print("--- [PooledCodeExecutor] WARNING: network namespaces are unavailable; sandbox runs only "
+                  "block sockets at the Python level (not a security boundary) ---")
+        self.network_isolated = worker.network_isolated
+        return worker
+
+    def _release(self, worker: SandboxWorker, healthy: bool) -> None:
+        if not self._closed and healthy and worker.alive and worker.runs < self.max_runs_per_worker:
+            self._idle.put(worker)
+            return
+
+        worker.terminate()
+        if healthy:
+            self._recycled += 1
+        if self._closed:
+            return
+        # Replace it off the request path so the caller doesn't pay the interpreter startup
+        threading.Thread(target=self._replace_worker, name="sandbox-respawn", daemon=True).start()
+
+    def _replace_worker(self) -> None:
+        try:
+            self._idle.put(self._spawn())
+        except Exception as e:
+            with self._lock:
+                self._spawned -= 1
+            print(f"--- [PooledCodeExecutor] Could not respawn sandbox worker: {e} ---")
+
+code_executor = PooledCodeExecutor(
+    pool_size=settings.SANDBOX_POOL_SIZE,
+    max_runs_per_worker=settings.SANDBOX_MAX_RUNS_PER_WORKER,
+    timeout_seconds=settings.SANDBOX_TIMEOUT_SECONDS,
+    cpu_seconds=settings.SANDBOX_CPU_SECONDS,
+    memory_mb=settings.SANDBOX_MEMORY_MB,
+    max_output_bytes=settings.SANDBOX_MAX_OUTPUT_BYTES,
+    run_as_uid=settings.SANDBOX_RUN_AS_UID,
+    require_network_isolation=settings.SANDBOX_REQUIRE_NETWORK_ISOLATION,
+    acquire_timeout_seconds=settings.SANDBOX_ACQUIRE_TIMEOUT_SECONDS
+)
@@ -0,0 +1,313 @@
+"""
+Warm sandbox worker used by PooledCodeExecutor.
+
+Runs as a standalone interpreter (started with `python -I <this file>`), so it
+must not import anything from `src`. Requests arrive as JSON lines on stdin and
+each one is executed in a forked child with resource limits applied:
+
+    {"code": "...", "stdin": "...", "timeout": 5, "cpu_seconds": 5, "memory_mb": 256, "max_output_bytes": 65536,
+     "uid": 65534, "require_network_isolation": false}
+
+The response is one JSON line on stdout:
+
+    {"exit_code": 0, "stdout": "...", "stderr": "...", "timed_out": false, "duration_ms": 3.2}
+
+Isolation of each child, in order:
+  1. a private network namespace (no interfaces but a down loopback), created
+     directly when running as root or through a user namespace otherwise;
+  2. when running as root, a switch to the unprivileged `uid` (so RLIMIT_NPROC
+     is enforced and root-owned files are out of reach), unless that uid cannot
+     read the interpreter's stdlib (e.g. a pyenv under /root); responses report
+     `unprivileged` so the pool can warn about it;
+  3. rlimits on CPU, memory, core dumps and process count.
+Steps 1-3 are kernel-enforced. The Python-level patches of socket/os/posix that
+follow are only a convenience that yields clear error messages: they can be
+bypassed (e.g. via `_socket`) and are NOT a security boundary. Where the kernel
+refuses namespaces (some container runtimes), network access is only blocked by
+those patches; the ready line reports `network_isolated` so the pool can warn,
+and `require_network_isolation` makes such runs fail instead. For untrusted
+deployments run the API container itself without network access to the sandbox.
+"""
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+def _unshare(flags):
+    unshare = getattr(os, "unshare", None)  # Python 3.12+
+    if unshare is not None:
+        unshare(flags)
+        return
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.unshare(flags) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+def _enter_network_namespace():
+    """True when the process now lives in its own, empty network namespace."""
+    # Root (CAP_SYS_ADMIN) can create it directly; other users need a user namespace around it
+    for flags in (CLONE_NEWNET, CLONE_NEWUSER | CLONE_NEWNET):
+        try:
+            _unshare(flags)
+            return True
+        except (OSError, AttributeError):
+            continue
+    return False
+
+def _drop_privileges(uid):
+    if not uid or os.geteuid() != 0:
+        return
+    os.setgroups([])
+    os.setgid(uid)
+    os.setuid(uid)
+
+def _block_network():
+    # Error messages only, not a boundary (see the module docstring)
+    import socket
+
+    def _denied(*args, **kwargs):
+        raise PermissionError("Network access is disabled in the sandbox")
+
+    socket.socket = _denied
+    socket.create_connection = _denied
+    socket.getaddrinfo = _denied
+    socket.socketpair = _denied
+
+def _block_process_spawning():
+    # RLIMIT_NPROC (enforced once root is dropped) is the boundary; these give clear errors
+    import posix
+    import subprocess
+
+    def _denied(*args, **kwargs):
+        raise PermissionError("Starting processes is disabled in the sandbox")
+
+    for module in (os, posix):
+        for name in ("system", "popen", "fork", "forkpty", "execv", "execve", "execl", "execle",
+                     "execlp", "execlpe", "execvp", "execvpe", "spawnv", "spawnve", "spawnl", "spawnle",
+                     "posix_spawn", "posix_spawnp"):
+            if hasattr(module, name):
+                setattr(module, name, _denied)
+    subprocess.Popen = _denied
+
+_uid_usable = {}
+
+def _can_run_as(uid):
+    """Whether `uid` can still load the stdlib; checked once per uid in a throwaway child."""
+    if uid not in _uid_usable:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _drop_privileges(uid)
+                os.listdir(os.path.dirname(os.__file__))
+                os._exit(0)
+            except BaseException:
+                os._exit(1)
+        _, status = os.waitpid(pid, 0)
+        _uid_usable[uid] = os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+    return _uid_usable[uid]
+
+def _apply_limits(cpu_seconds, memory_mb):
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    # No core dumps and no new processes (RLIMIT_NPROC counts every process of the user)
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if hasattr(resource, "RLIMIT_NPROC"):
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+def _run_child(request, stdin_fd, stdout_fd, stderr_fd):
+    """Runs inside the forked child; never returns."""
+    exit_code = 0
+    try:
+        os.dup2(stdin_fd, 0)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        for fd in (stdin_fd, stdout_fd, stderr_fd):
+            os.close(fd)
+        sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", closefd=False)
+
+        isolated = _enter_network_namespace()
+        if not isolated and request.get("require_network_isolation"):
+            raise PermissionError("The sandbox could not isolate the network; refusing to run")
+        # The patches import socket/subprocess, so they go before the uid switch
+        _block_network()
+        _block_process_spawning()
+        _drop_privileges(request.get("uid"))
+        _apply_limits(request.get("cpu_seconds"), request.get("memory_mb"))
+
+        code = compile(request.get("code", ""), "main.py", "exec")
+        exec(code, {"__name__": "__main__", "__builtins__": __builtins__})
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException as e:
+        # Hide this module's frame: students only need to see their own code
+        tb = e.__traceback__.tb_next if e.__traceback__ else None
+        traceback.print_exception(type(e), e, tb)
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(exit_code)
+
+def _collect(pid, in_fd, stdin_data, out_fd, err_fd, timeout, max_output_bytes):
+    buffers = {out_fd: bytearray(), err_fd: bytearray()}
+    open_fds = [out_fd, err_fd]
+    deadline = time.monotonic() + timeout
+    timed_out = False
+
+    # stdin is fed from the same loop that drains stdout/stderr: writing it all upfront
+    # deadlocks once input exceeds the pipe buffer and the child blocks writing output
+    pending = memoryview(stdin_data)
+    if pending:
+        os.set_blocking(in_fd, False)
+    else:
+        os.close(in_fd)
+        in_fd = None
+
+    while open_fds:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        writable_fds = [in_fd] if in_fd is not None else []
+        readable, writable, _ = select.select(open_fds, writable_fds, [], remaining)
+        if writable:
+            try:
+                pending = pending[os.write(in_fd, pending[:65536]):]
+            except BlockingIOError:
+                pass
+            except BrokenPipeError:
+                # The child stopped reading (exited or closed stdin): the rest is dropped
+                pending = pending[:0]
+            if not pending:
+                os.close(in_fd)
+                in_fd = None
+        for fd in readable:
+            data = os.read(fd, 65536)
+            if not data:
+                open_fds.remove(fd)
+                continue
+            room = max_output_bytes - len(buffers[fd])
+            if room > 0:
+                buffers[fd].extend(data[:room])
+
+    # The child may have closed its pipes and kept running
+    status = None
+    while not timed_out:
+        waited, status = os.waitpid(pid, os.WNOHANG)
+        if waited:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            break
+        time.sleep(0.005)
+
+    if timed_out:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        _, status = os.waitpid(pid, 0)
+    if in_fd is not None:
+        os.close(in_fd)
+    for fd in (out_fd, err_fd):
+        os.close(fd)
+
+    if os.WIFEXITED(status):
+        exit_code = os.WEXITSTATUS(status)
+    else:
+        exit_code = 128 + os.WTERMSIG(status) if os.WIFSIGNALED(status) else 1
+
+    stderr = buffers[err_fd].decode("utf-8", errors="replace")
+    if not timed_out and os.WIFSIGNALED(status):
+        sig = os.WTERMSIG(status)
+        if sig == signal.SIGXCPU:
+            stderr += "\nCPU time limit exceeded"
+        elif sig == signal.SIGKILL:
+            stderr += "\nProcess killed (memory limit?)"
+    return exit_code, buffers[out_fd].decode("utf-8", errors="replace"), stderr, timed_out
+
+def _handle(request):
+    started = time.perf_counter()
+    in_r, in_w = os.pipe()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+
+    uid = request.get("uid")
+    if not (uid and os.geteuid() == 0 and _can_run_as(uid)):
+        uid = None
+    request = dict(request, uid=uid)
+
+    pid = os.fork()
+    if pid == 0:
+        os.close(in_w)
+        os.close(out_r)
+        os.close(err_r)
+        _run_child(request, in_r, out_w, err_w)
+
+    os.close(in_r)
+    os.close(out_w)
+    os.close(err_w)
+
+    stdin_data = (request.get("stdin") or "").encode("utf-8")
+    exit_code, stdout, stderr, timed_out = _collect(
+        pid, in_w, stdin_data, out_r, err_r,
+        float(request.get("timeout") or 5),
+        int(request.get("max_output_bytes") or 65536)
+    )
+    return {
+        "exit_code": exit_code,
+        "stdout": stdout,
+        "stderr": stderr,
+        "timed_out": timed_out,
+        "unprivileged": os.geteuid() != 0 or uid is not None,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+def _probe_network_isolation():
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if _enter_network_namespace() else 1)
+    _, status = os.waitpid(pid, 0)
+    return os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+def main():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    out = sys.stdout
+    # Signal readiness so the pool knows the interpreter is warm (and how isolated its runs are)
+    ready = {"ready": True, "pid": os.getpid(), "network_isolated": _probe_network_isolation()}
+    out.write(json.dumps(ready) + "\n")
+    out.flush()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            response = _handle(json.loads(line))
+        except Exception as e:
+            response = {"exit_code": 1, "stdout": "", "stderr": str(e), "timed_out": False, "error": str(e)}
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+if __name__ == "__main__":
+    main()
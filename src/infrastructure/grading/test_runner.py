@@ -0,0 +1,112 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from src.infrastructure.config.settings import settings
+from src.domain.grading.ports.code_executor import CodeExecutor
+from src.domain.grading.value_objects.execution_result import ExecutionResult
+from src.domain.grading.value_objects.test_case_result import TestCaseResult
+from src.domain.learning.entities.test_case import TestCase
+from src.infrastructure.grading.pooled_code_executor import PooledCodeExecutor, code_executor
+
+def normalize_output(text: str) -> str:
+    # Trailing spaces, blank lines and \r\n vs \n are not worth failing a student for
+    lines = [line.rstrip() for line in (text or "").replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).strip()
+
+# What an input() prompt typically ends with: "Ingrese un número: ", "¿Cuántos? ", ">>> "
+PROMPT_ENDINGS = (":", "?", ">")
+
+def output_matches(actual: str, expected: str) -> bool:
+    """
+    Exact match after normalization, or the last lines of the output equal the
+    expected lines. The first of those lines may also carry an input() prompt
+    printed before the result ("Ingrese un número: 5"), but only when the text
+    before the answer ends like a prompt, so "15" or "-5" never match "5".
+    """
+    actual, expected = normalize_output(actual), normalize_output(expected)
+    if actual == expected:
+        return True
+    if not expected:
+        return False
+    expected_lines = expected.split("\n")
+    actual_lines = [line for line in actual.split("\n") if line.strip()]
+    if len(actual_lines) < len(expected_lines):
+        return False
+    tail = actual_lines[-len(expected_lines):]
+    if tail[1:] != expected_lines[1:]:
+        return False
+    first, answer = tail[0], expected_lines[0]
+    if first == answer:
+        return True
+    prefix = first[:-len(answer)] if first.endswith(answer) else None
+    return prefix is not None and prefix != prefix.rstrip() and prefix.rstrip().endswith(PROMPT_ENDINGS)
+
+class TestCaseRunner(CodeExecutor):
+    """
+    Runs the student's code once per TestCase on the sandbox pool, feeding
+    `input_data` on stdin and comparing stdout with `expected_output`.
+    Cases run in parallel; the result carries per-case timing and a score
+    weighted by `TestCase.weight`. Without test cases it is a plain run.
+    """
+    def __init__(self, sandbox: PooledCodeExecutor, max_parallel: int = 4):
+        self.sandbox = sandbox
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="test-runner")
+
+    def execute(self, code: str, language: str, test_cases: list) -> ExecutionResult:
+        if language != "python" or not test_cases:
+            return self.sandbox.execute(code, language, test_cases)
+
+        runs = list(self._pool.map(lambda tc: self._run_case(code, tc), test_cases))
+        results = tuple(result for result, _ in runs)
+
+        total_weight = sum(max(r.weight, 0.0) for r in results)
+        passed_weight = sum(max(r.weight, 0.0) for r in results if r.passed)
+        score = round(passed_weight / total_weight * 100, 2) if total_weight else 0.0
+
+        failed = [r for r in results if not r.passed]
+        # Only visible cases (the ones the student can reproduce) expose their output;
+        # when every case is hidden nothing is shown
+        visible = [(result, run) for (result, run) in runs if not result.is_hidden]
+        shown = visible[0][1] if visible else None
+        first_failure = next((run for (result, run) in visible if not result.passed), None)
+
+        return ExecutionResult(
+            exit_code=0 if not failed else 1,
+            stdout=shown.stdout if shown else "",
+            stderr=first_failure.stderr if first_failure else (shown.stderr if shown else ""),
+            error=None if not failed else f"Failed {len(failed)} of {len(results)} test cases",
+            test_results=results,
+            score=score
+        )
+
+    def _run_case(self, code: str, test_case: TestCase) -> Tuple[TestCaseResult, ExecutionResult]:
+        stdin = test_case.input_data or ""
+        if stdin and not stdin.endswith("\n"):
+            stdin += "\n"
+
+        started = time.perf_counter()
+        run = self.sandbox.run(code, stdin=stdin)
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        passed = run.is_success and output_matches(run.stdout, test_case.expected_output)
+        error: Optional[str] = run.error
+        if not error and run.exit_code != 0:
+            error = (run.stderr.strip().splitlines() or ["Runtime error"])[-1]
+
+        result = TestCaseResult(
+            test_case_id=test_case.id,
+            passed=passed,
+            weight=test_case.weight if test_case.weight is not None else 1.0,
+            is_hidden=test_case.is_hidden,
+            duration_ms=duration_ms,
+            input_data=test_case.input_data,
+            expected_output=test_case.expected_output,
+            actual_output=run.stdout,
+            error=error
+        )
+        return result, run
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+test_case_runner = TestCaseRunner(code_executor, max_parallel=settings.SANDBOX_POOL_SIZE)
@@ -0,0 +1,48 @@
+import hashlib
+import json
+from typing import Any, Callable
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from src.infrastructure.cache.response_cache import CachedResponse, ResponseCache
+
+# Clients may keep the body but must revalidate it (If-None-Match) before reuse
+CACHE_CONTROL = "private, no-cache"
+
+def render(payload: Any) -> CachedResponse:
+    """Serializes once; the strong ETag is a digest of the exact bytes sent."""
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode()
+    return CachedResponse(etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"', body=body)
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+def conditional_response(request: Request, cached: CachedResponse) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+def cached_json(
+    request: Request,
+    cache: ResponseCache,
+    key: str,
+    tag: str,
+    build: Callable[[], Any],
+    cacheable: Callable[[Any], bool] = lambda payload: True
+) -> Response:
+    """
+    Serves `key` from the response cache, calling `build` (the use case) only on a
+    miss. Conditional GETs whose ETag still matches get an empty 304.
+    """
+    cached, token = cache.get(key, tag)
+    if cached is None:
+        payload = build()
+        cached = render(payload)
+        if cacheable(payload):
+            cache.put(key, tag, cached, token)
+    return conditional_response(request, cached)
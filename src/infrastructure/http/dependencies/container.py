@@ -1,8 +1,11 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from src.infrastructure.persistence.database import get_db
+from src.infrastructure.persistence.database import get_db, SessionLocal
+from src.infrastructure.config.settings import settings
 from src.infrastructure.persistence.repositories.activity_repository_impl import SqlAlchemyActivityRepository
 from src.infrastructure.persistence.repositories.exercise_repository_impl import SqlAlchemyExerciseRepository
+from src.infrastructure.cache.exercise_cache import exercise_cache
+from src.infrastructure.cache.response_cache import response_cache
 from src.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
 from src.infrastructure.ai.llm.ollama_service import OllamaExerciseGenerator
 from src.application.learning.commands.generate_exercises import GenerateExercises
@@ -15,20 +18,20 @@ from src.application.identity.commands.authenticate_user import AuthenticateUser
 from src.application.identity.commands.authenticate_user import AuthenticateUser
 from src.infrastructure.persistence.repositories.session_repository_impl import SqlAlchemySessionRepository
 from src.infrastructure.persistence.repositories.submission_repository_impl import SqlAlchemySubmissionRepository
-from src.infrastructure.grading.local_code_executor import LocalCodeExecutor
+from src.infrastructure.grading.test_runner import test_case_runner
 from src.application.student.queries.list_activities import ListStudentActivities
 from src.application.student.commands.start_session import StartLearningSession
-from src.application.student.commands.send_message import SendMessageToTutor
+from src.application.student.commands.send_message import SendMessageToTutor, SendMessageToTutorAsync
 from src.application.student.commands.submit_solution import SubmitSolution
 
 def get_exercise_generator():
-    return OllamaExerciseGenerator()
+    return OllamaExerciseGenerator(timeout_seconds=settings.OLLAMA_EXERCISE_TIMEOUT_SECONDS)
 
 def get_activity_repository(db: Session = Depends(get_db)):
     return SqlAlchemyActivityRepository(db)
 
 def get_exercise_repository(db: Session = Depends(get_db)):
-    return SqlAlchemyExerciseRepository(db)
+    return SqlAlchemyExerciseRepository(db, cache=exercise_cache)
 
 def get_unit_of_work(db: Session = Depends(get_db)):
     # SqlAlchemyUnitOfWork expects a session_factory, but for per-request dependency 
@@ -43,8 +46,11 @@ def get_unit_of_work(db: Session = Depends(get_db)):
 
 from src.infrastructure.persistence.repositories.document_repository_impl import SqlAlchemyDocumentRepository
 from src.infrastructure.ai.rag.rag_service import RagService
+from src.infrastructure.ai.rag.answer_cache import answer_cache
+from src.infrastructure.ai.rag.ingestion_worker import ingestion_queue
 from src.application.learning.commands.upload_document_command import UploadDocumentCommand
 from src.application.learning.commands.chat_with_document_command import ChatWithDocumentCommand
+from src.application.learning.queries.get_ingestion_job_query import GetIngestionJobQuery
 
 def get_document_repository(db: Session = Depends(get_db)):
     return SqlAlchemyDocumentRepository(db)
@@ -52,11 +58,14 @@ def get_document_repository(db: Session = Depends(get_db)):
 def get_rag_service(doc_repo = Depends(get_document_repository)):
     return RagService(document_repository=doc_repo)
 
-def get_upload_document_command(rag_service = Depends(get_rag_service)):
-    return UploadDocumentCommand(rag_service=rag_service)
+def get_upload_document_command():
+    return UploadDocumentCommand(ingestion_queue=ingestion_queue)
+
+def get_ingestion_job_query():
+    return GetIngestionJobQuery(ingestion_queue=ingestion_queue)
 
 def get_chat_with_document_command(rag_service = Depends(get_rag_service)):
-    return ChatWithDocumentCommand(rag_service=rag_service)
+    return ChatWithDocumentCommand(rag_service=rag_service, answer_cache=answer_cache)
 
 def get_generate_exercises_use_case(
     generator = Depends(get_exercise_generator),
@@ -70,7 +79,8 @@ def get_generate_exercises_use_case(
         exercise_repository=exercise_repo,
         activity_repository=activity_repo,
         document_repository=doc_repo,
-        unit_of_work=uow
+        unit_of_work=uow,
+        content_cache=response_cache
     )
 
 def get_user_repository(db: Session = Depends(get_db)):
@@ -120,23 +130,21 @@ def get_enrollment_repository(db: Session = Depends(get_db)):
     return SqlAlchemyEnrollmentRepository(db)
 
 def get_code_executor():
-    return LocalCodeExecutor()
+    return test_case_runner
 
 from src.infrastructure.ai.llm.ollama_auditor import OllamaAuditor
 
 def get_ai_auditor():
-    return OllamaAuditor()
+    return OllamaAuditor(timeout_seconds=settings.OLLAMA_AUDIT_TIMEOUT_SECONDS)
 
 def get_list_activities_query(repo = Depends(get_activity_repository)):
     return ListStudentActivities(activity_repository=repo)
 
 from src.application.student.queries.list_courses import ListStudentCourses
+from src.infrastructure.cache.student_courses_cache import student_courses_cache
 
-def get_list_courses_query(
-    act_repo = Depends(get_activity_repository),
-    enroll_repo = Depends(get_enrollment_repository)
-):
-    return ListStudentCourses(activity_repository=act_repo, enrollment_repository=enroll_repo)
+def get_list_courses_query(act_repo = Depends(get_activity_repository)):
+    return ListStudentCourses(activity_repository=act_repo, courses_cache=student_courses_cache)
 
 from src.application.student.queries.get_activity_details import GetActivityDetails
 
@@ -167,22 +175,73 @@ def get_send_message_use_case(
         session_repository=session_repo,
         exercise_repository=ex_repo,
         rag_service=rag_service,
-        unit_of_work=uow
+        unit_of_work=uow,
+        answer_cache=answer_cache,
+        history_window=settings.TUTOR_HISTORY_WINDOW,
+        stream_persistence=_standalone_session_persistence
     )
 
+def _standalone_session_persistence():
+    # get_db's teardown runs before a StreamingResponse body: the stream's final write
+    # gets its own session, closed by the unit of work
+    db = SessionLocal()
+    return SqlAlchemySessionRepository(db), SqlAlchemyUnitOfWork(lambda: db)
+
+# --- Async database path (DB_ASYNC_ENABLED) ---
+# Providers for the `async def` tutor chat route: Postgres and Ollama waits hold no threadpool thread
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.persistence.database import get_async_db, AsyncSessionLocal
+from src.infrastructure.persistence.unit_of_work import SqlAlchemyAsyncUnitOfWork
+from src.infrastructure.persistence.repositories.async_session_repository_impl import AsyncSqlAlchemySessionRepository
+
+def get_async_unit_of_work(db: AsyncSession = Depends(get_async_db)):
+    return SqlAlchemyAsyncUnitOfWork(lambda: db)
+
+def get_async_session_repository(db: AsyncSession = Depends(get_async_db)):
+    return AsyncSqlAlchemySessionRepository(db)
+
+def get_send_message_async_use_case(
+    session_repo = Depends(get_async_session_repository),
+    ex_repo = Depends(get_exercise_repository),
+    rag_service = Depends(get_rag_service),
+    uow = Depends(get_async_unit_of_work)
+):
+    return SendMessageToTutorAsync(
+        session_repository=session_repo,
+        exercise_repository=ex_repo,
+        rag_service=rag_service,
+        unit_of_work=uow,
+        answer_cache=answer_cache,
+        history_window=settings.TUTOR_HISTORY_WINDOW,
+        stream_persistence=_standalone_async_session_persistence
+    )
+
+def _standalone_async_session_persistence():
+    # Same reason as _standalone_session_persistence: get_async_db is closed before the stream ends
+    db = AsyncSessionLocal()
+    return AsyncSqlAlchemySessionRepository(db), SqlAlchemyAsyncUnitOfWork(lambda: db)
+
+from src.infrastructure.persistence.repositories.activity_progress_projection_impl import SqlAlchemyActivityProgressProjection
+
+def get_activity_progress_projection(db: Session = Depends(get_db)):
+    return SqlAlchemyActivityProgressProjection(db)
+
 def get_submit_solution_use_case(
     sub_repo = Depends(get_submission_repository),
     ex_repo = Depends(get_exercise_repository),
     executor = Depends(get_code_executor),
     auditor = Depends(get_ai_auditor),
-    uow = Depends(get_unit_of_work)
+    uow = Depends(get_unit_of_work),
+    progress = Depends(get_activity_progress_projection)
 ):
     return SubmitSolution(
         submission_repository=sub_repo,
         exercise_repository=ex_repo,
         code_executor=executor,
         ai_auditor=auditor,
-        unit_of_work=uow
+        unit_of_work=uow,
+        progress_projection=progress
     )
 
 from src.application.learning.commands.create_activity_command import CreateActivityCommand
@@ -205,7 +264,12 @@ def get_publish_activity_command(
     repo = Depends(get_activity_repository),
     uow = Depends(get_unit_of_work)
 ):
-    return PublishActivityCommand(activity_repository=repo, unit_of_work=uow)
+    return PublishActivityCommand(
+        activity_repository=repo,
+        unit_of_work=uow,
+        courses_cache=student_courses_cache,
+        content_cache=response_cache
+    )
 
 
 
@@ -215,8 +279,21 @@ def get_submission_read_repository(db: Session = Depends(get_db)):
     return SqlAlchemySubmissionReadRepository(db)
 
 from src.application.teacher.queries.get_student_activity_details import GetStudentActivityDetails
+from src.infrastructure.ai.llm.risk_prefilter import estimate_risk
 
 def get_student_activity_details_query(
     repo = Depends(get_submission_read_repository)
 ):
-    return GetStudentActivityDetails(repository=repo)
+    return GetStudentActivityDetails(repository=repo, risk_estimator=estimate_risk)
+
+from src.infrastructure.tasks.task_queue import task_queue
+from src.application.teacher.queries.get_background_task import GetBackgroundTaskQuery
+
+def get_background_task_query():
+    return GetBackgroundTaskQuery(task_queue=task_queue)
+
+from src.infrastructure.persistence.repositories.student_risk_read_repository_impl import SqlAlchemyStudentRiskReadRepository
+from src.application.teacher.queries.list_students import ListStudentsWithRisk
+
+def get_list_students_query(db: Session = Depends(get_db)):
+    return ListStudentsWithRisk(repository=SqlAlchemyStudentRiskReadRepository(db))
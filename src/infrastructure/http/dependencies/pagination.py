@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Query, Response
+from src.application.shared.dtos.pagination import CursorPage
+
+@dataclass
+class PageParams:
+    limit: Optional[int]
+    cursor: Optional[str]
+
+def get_page_params(
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; without limit and cursor the whole list is returned"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page")
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor)
+
+def set_page_headers(response: Response, page: CursorPage) -> None:
+    """List bodies stay plain arrays; the cursor for the next page travels in headers."""
+    response.headers["X-Has-More"] = "true" if page.has_more else "false"
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
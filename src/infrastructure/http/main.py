@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from src.infrastructure.http.routers.learning import generator_router
 from src.infrastructure.http.routers.learning import rag_router
 from src.infrastructure.http.routers.identity import auth_router
@@ -8,9 +11,53 @@ from src.infrastructure.http.routers.academic import academic_router
 from src.infrastructure.http.routers.governance import governance_router
 from src.infrastructure.http.routers.analytics import analytics_router
 import src.infrastructure.persistence.models  # Register models
-from src.infrastructure.persistence.database import engine, Base
+from src.infrastructure.persistence.database import engine, async_engine, Base
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI(title="Fase Final MVP")
+from src.infrastructure.config.settings import settings
+from src.application.shared.dtos.pagination import InvalidCursorError
+from src.infrastructure.ai.rag.embedding_engine import embedding_engine
+from src.infrastructure.ai.rag.chroma_client import chroma_provider
+from src.infrastructure.ai.rag.answer_cache import answer_cache
+from src.infrastructure.cache.response_cache import response_cache
+from src.infrastructure.cache.exercise_cache import exercise_cache
+from src.infrastructure.cache.student_courses_cache import student_courses_cache
+from src.infrastructure.grading.pooled_code_executor import code_executor
+from src.infrastructure.grading.test_runner import test_case_runner
+from src.infrastructure.ai.llm.ollama_client import ollama_client
+from src.infrastructure.tasks.task_queue import task_queue
+import src.infrastructure.tasks.analyze_risk_task  # Register task handlers
+import src.infrastructure.tasks.cohort_risk_task
+import src.infrastructure.ai.rag.ingestion_worker
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared AI resources live for the whole process, not per request
+    if settings.RAG_WARMUP_ON_STARTUP:
+        try:
+            await run_in_threadpool(embedding_engine.warm_up)
+            await run_in_threadpool(chroma_provider.get_client)
+        except Exception as e:
+            # Keep the API up; RAG endpoints will retry lazily on first use
+            print(f"--- [Startup] RAG warm-up failed: {e} ---")
+    if settings.SANDBOX_WARMUP_ON_STARTUP:
+        try:
+            await run_in_threadpool(code_executor.warm_up)
+        except Exception as e:
+            # Workers will be started on demand (or LocalCodeExecutor used) instead
+            print(f"--- [Startup] Sandbox warm-up failed: {e} ---")
+    # Resume tasks queued before a restart
+    task_queue.start()
+    yield
+    task_queue.shutdown()
+    test_case_runner.shutdown()
+    code_executor.shutdown()
+    await run_in_threadpool(ollama_client.close)
+    chroma_provider.reset()
+    if async_engine is not None:
+        await async_engine.dispose()
+    await run_in_threadpool(engine.dispose)
+
+app = FastAPI(title="Fase Final MVP", lifespan=lifespan)
 
 
 
@@ -33,7 +80,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination metadata of list endpoints, validator of cached content
+    expose_headers=["X-Has-More", "X-Next-Cursor", "ETag"],
 )
+
+@app.exception_handler(InvalidCursorError)
+def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/health/rag")
+def rag_health_check():
+    return {
+        "embedding": embedding_engine.metrics(),
+        "chroma_connected": chroma_provider.is_connected,
+        "answer_cache": answer_cache.metrics()
+    }
+
+@app.get("/health/sandbox")
+def sandbox_health_check():
+    return code_executor.metrics()
+
+@app.get("/health/cache")
+def cache_health_check():
+    return {
+        "responses": response_cache.metrics(),
+        "exercises": exercise_cache.metrics(),
+        "student_courses": student_courses_cache.metrics()
+    }
+
+@app.get("/health/tasks")
+def tasks_health_check():
+    return task_queue.metrics()
+
+@app.get("/health/ollama")
+def ollama_health_check():
+    return ollama_client.endpoints_snapshot()
@@ -9,6 +9,7 @@ from src.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
 from src.application.academic.commands.create_subject import CreateSubject
 from src.application.academic.commands.create_course import CreateCourse
 from src.application.academic.commands.enroll_student import EnrollStudent
+from src.infrastructure.cache.student_courses_cache import student_courses_cache
 from typing import List
 from src.application.academic.dtos.academic_dtos import (
     CreateSubjectRequest, CreateCourseRequest, EnrollStudentRequest, SubjectDTO, CourseDTO, EnrollmentDTO
@@ -69,7 +70,7 @@ def enroll_student(
     uow: SqlAlchemyUnitOfWork = Depends(get_unit_of_work)
 ):
     try:
-        command = EnrollStudent(repo, course_repo, user_repo, uow)
+        command = EnrollStudent(repo, course_repo, user_repo, uow, courses_cache=student_courses_cache)
         return command.execute(request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -7,6 +7,8 @@ from src.infrastructure.persistence.repositories.incident_repository_impl import
 from src.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
 from src.application.governance.commands.report_incident import ReportIncident
 from src.application.governance.dtos.governance_dtos import ReportIncidentRequest, IncidentDTO
+from src.application.shared.dtos.pagination import paginate
+from src.infrastructure.http.dependencies.pagination import PageParams, get_page_params, set_page_headers
 
 router = APIRouter()
 
@@ -32,9 +34,17 @@ def report_incident(
 
 @router.get("/incidents", response_model=List[IncidentDTO])
 def list_incidents(
+    response: Response,
+    paging: PageParams = Depends(get_page_params),
     repo: SqlAlchemyIncidentRepository = Depends(get_incident_repository)
 ):
-    incidents = repo.list_all()
+    page = paginate(
+        lambda after, size: repo.list_all(limit=size, after=after),
+        lambda inc: (inc.created_at, inc.id),
+        paging.limit,
+        paging.cursor
+    )
+    set_page_headers(response, page)
     return [
         IncidentDTO(
             id=inc.id,
@@ -47,5 +57,5 @@ def list_incidents(
             resolved_at=inc.resolved_at,
             resolution_notes=inc.resolution_notes
         )
-        for inc in incidents
+        for inc in page.items
     ]
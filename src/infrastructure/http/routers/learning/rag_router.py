@@ -1,25 +1,43 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from src.application.learning.commands.upload_document_command import UploadDocumentCommand
 from src.application.learning.commands.chat_with_document_command import ChatWithDocumentCommand
-from src.infrastructure.http.dependencies.container import get_upload_document_command, get_chat_with_document_command
-from src.application.learning.dtos.rag_dtos import ChatRequest, ChatResponse
+from src.application.learning.queries.get_ingestion_job_query import GetIngestionJobQuery
+from src.infrastructure.http.dependencies.container import get_upload_document_command, get_chat_with_document_command, get_ingestion_job_query
+from src.application.learning.dtos.rag_dtos import ChatRequest, ChatResponse, UploadDocumentResponse, IngestionJobResponse
 
 router = APIRouter()
 
-@router.post("/activities/{activity_id}/document")
+@router.post("/activities/{activity_id}/document", response_model=UploadDocumentResponse, status_code=202)
 def upload_document(
     activity_id: str,
     file: UploadFile = File(...),
     command: UploadDocumentCommand = Depends(get_upload_document_command)
 ):
+    """
+    Queues the document for ingestion and returns its job id (202).
+    The job lives in the background task queue: it can be polled from any API process
+    and survives a restart. The file is stored in ./uploads, which every process
+    running the queue must share.
+    """
     try:
         # Decoupling: Unpack UploadFile here in the Infrastructure layer
         # command expects a file-like object and a filename
-        message = command.execute(activity_id, file.file, file.filename)
-        return {"message": message}
+        job = command.execute(activity_id, file.file, file.filename)
+        return UploadDocumentResponse(message="Document queued for processing", job_id=job.id, status=job.status)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/activities/{activity_id}/document/jobs/{job_id}", response_model=IngestionJobResponse)
+def get_document_job(
+    activity_id: str,
+    job_id: str,
+    query: GetIngestionJobQuery = Depends(get_ingestion_job_query)
+):
+    job = query.execute(activity_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @router.post("/activities/{activity_id}/chat", response_model=ChatResponse)
 def chat_with_document(
     activity_id: str,
@@ -1,24 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from typing import List, Iterator, AsyncIterator, Union
+import json
 import logging
 import traceback
 from src.application.student.queries.list_activities import ListStudentActivities, ActivitySummaryDTO
 from src.application.student.commands.start_session import StartLearningSession, StartSessionRequest
-from src.application.student.commands.send_message import SendMessageToTutor, SendMessageRequest, TutorMessageDTO
+from src.application.student.commands.send_message import SendMessageToTutor, SendMessageToTutorAsync, SendMessageRequest, TutorMessageDTO
 from src.application.student.commands.submit_solution import SubmitSolution, SubmitSolutionRequest, SubmitSolutionResponse
 from src.application.student.queries.list_courses import ListStudentCourses, CourseSummaryDTO
 from src.infrastructure.http.dependencies.container import (
     get_list_activities_query,
     get_start_session_use_case,
     get_send_message_use_case,
+    get_send_message_async_use_case,
     get_submit_solution_use_case,
     get_list_courses_query,
     get_session_repository
 )
+from src.infrastructure.http.dependencies.pagination import PageParams, get_page_params, set_page_headers
+from src.infrastructure.http.dependencies.conditional import cached_json, conditional_response, render
+from src.infrastructure.cache.response_cache import response_cache
 from src.domain.learning.ports.session_repository import SessionRepository
 from src.application.student.queries.get_session_details import GetSessionDetails, SessionDetailsDTO
 from src.application.student.queries.list_grades import ListStudentGrades, GradeDTO
 from src.infrastructure.persistence.database import get_db
+from src.infrastructure.config.settings import settings
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -27,20 +35,26 @@ router = APIRouter()
 
 @router.get("/courses", response_model=List[CourseSummaryDTO])
 def list_courses(
+    request: Request,
     student_id: str = "default_student", # Mock auth for now or from token
     query: ListStudentCourses = Depends(get_list_courses_query)
 ):
     # In a real app, extract student_id from token
     # For now, we might receive it as query param or generic default
     # But current auth middleware should inject "current_user"
-    return query.execute(student_id)
+    # The data itself is cached per student by ListStudentCourses; the ETag spares the transfer
+    return conditional_response(request, render(query.execute(student_id)))
 
 @router.get("/activities", response_model=List[ActivitySummaryDTO])
 def list_activities(
+    response: Response,
     student_id: str = "default_student", # Mock auth for now or from token
+    paging: PageParams = Depends(get_page_params),
     use_case: ListStudentActivities = Depends(get_list_activities_query)
 ):
-    return use_case.execute(student_id)
+    page = use_case.execute(student_id, limit=paging.limit, cursor=paging.cursor)
+    set_page_headers(response, page)
+    return page.items
 
 from src.application.student.queries.get_activity_details import GetActivityDetails, ActivityDetailsDTO
 from src.infrastructure.http.dependencies.container import get_activity_details_query
@@ -48,12 +62,20 @@ from src.infrastructure.http.dependencies.container import get_activity_details_
 @router.get("/activities/{activity_id}", response_model=ActivityDetailsDTO)
 def get_activity_details(
     activity_id: str,
+    request: Request,
     query: GetActivityDetails = Depends(get_activity_details_query)
 ):
-    result = query.execute(activity_id)
-    if not result:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    return result
+    def build():
+        result = query.execute(activity_id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return result
+
+    # Only published content is cached: drafts are still being edited
+    return cached_json(
+        request, response_cache, f"student:activity:{activity_id}", activity_id, build,
+        cacheable=lambda details: details.status == "published"
+    )
 
 @router.post("/sessions", status_code=status.HTTP_201_CREATED)
 def start_session(
@@ -70,18 +92,78 @@ def start_session(
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/sessions/{session_id}/chat", response_model=TutorMessageDTO)
 def send_message(
     session_id: str,
     request: SendMessageRequest,
+    stream: bool = False,
     use_case: SendMessageToTutor = Depends(get_send_message_use_case)
 ):
+    """
+    With ?stream=true the answer is sent as Server-Sent Events:
+    one `data: {"token": ...}` event per token, then `event: done`.
+    """
     request.session_id = session_id # Ensure ID from path
     try:
+        if stream:
+            tokens = use_case.execute_stream(request)
+            return StreamingResponse(
+                _sse_events(tokens),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         return use_case.execute(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+async def send_message_async(
+    session_id: str,
+    request: SendMessageRequest,
+    stream: bool = False,
+    use_case: SendMessageToTutorAsync = Depends(get_send_message_async_use_case)
+):
+    """
+    With ?stream=true the answer is sent as Server-Sent Events:
+    one `data: {"token": ...}` event per token, then `event: done`.
+    """
+    request.session_id = session_id # Ensure ID from path
+    try:
+        if stream:
+            tokens = await use_case.execute_stream(request)
+            return StreamingResponse(
+                _sse_events(tokens),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        return await use_case.execute(request)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# With the async engine enabled the tutor chat is served from the event loop (asyncpg + the
+# async Ollama API); otherwise it runs in the threadpool like every other route
+router.add_api_route(
+    "/sessions/{session_id}/chat",
+    send_message_async if settings.DB_ASYNC_ENABLED else send_message,
+    methods=["POST"],
+    response_model=TutorMessageDTO
+)
+
+async def _sse_events(tokens: Union[Iterator[str], AsyncIterator[str]]):
+    # A sync token generator (sync Ollama API + SQLAlchemy) is driven from the threadpool.
+    # Closing it in `finally` also runs on client disconnect, which persists the partial answer.
+    is_async = hasattr(tokens, "__aiter__")
+    try:
+        async for token in (tokens if is_async else iterate_in_threadpool(tokens)):
+            yield f"data: {json.dumps({'token': token}, ensure_ascii=False)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        logger.error(f"Error streaming tutor response: {e}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    finally:
+        if is_async:
+            await tokens.aclose()
+        else:
+            await run_in_threadpool(tokens.close)
+
 from pydantic import BaseModel
 from typing import Optional, Dict
 
@@ -99,8 +181,8 @@ def submit_solution(
     use_case: SubmitSolution = Depends(get_submit_solution_use_case),
     session_repo: SessionRepository = Depends(get_session_repository)
 ):
-    # 1. Fetch Session to get student_id and activity_id
-    session = session_repo.find_by_id(session_id)
+    # 1. Fetch Session to get student_id and activity_id (no messages needed)
+    session = session_repo.find_by_id_with_recent_messages(session_id, 0)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -136,8 +218,12 @@ def get_session_details(
 
 @router.get("/grades", response_model=List[GradeDTO])
 def list_grades(
+    response: Response,
     student_id: str = "default_student",
+    paging: PageParams = Depends(get_page_params),
     db: Session = Depends(get_db)
 ):
     query = ListStudentGrades(db)
-    return query.execute(student_id)
+    page = query.execute(student_id, limit=paging.limit, cursor=paging.cursor)
+    set_page_headers(response, page)
+    return page.items
@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
 from src.application.teacher.queries.get_dashboard import GetTeacherDashboard, TeacherDashboardDTO
 from src.application.teacher.queries.list_students import ListStudentsWithRisk, StudentRiskDTO
 from src.infrastructure.http.dependencies.container import (
     get_user_repository,
     get_activity_repository,
-    get_submission_repository,
-    get_session_repository,
-    get_exercise_repository
+    get_exercise_repository,
+    get_list_students_query
 )
+from src.infrastructure.http.dependencies.pagination import PageParams, get_page_params, set_page_headers
+from src.infrastructure.http.dependencies.conditional import cached_json
+from src.infrastructure.cache.response_cache import response_cache
 
 router = APIRouter()
 
@@ -22,12 +24,15 @@ def get_dashboard(
 
 @router.get("/students", response_model=List[StudentRiskDTO])
 def list_students(
-    user_repo = Depends(get_user_repository),
-    submission_repo = Depends(get_submission_repository),
-    session_repo = Depends(get_session_repository)
+    response: Response,
+    course_id: Optional[str] = None,
+    module_id: Optional[str] = None,
+    paging: PageParams = Depends(get_page_params),
+    query: ListStudentsWithRisk = Depends(get_list_students_query)
 ):
-    query = ListStudentsWithRisk(user_repo, submission_repo, session_repo)
-    return query.execute()
+    page = query.execute(course_id=course_id, module_id=module_id, limit=paging.limit, cursor=paging.cursor)
+    set_page_headers(response, page)
+    return page.items
 
 from src.application.learning.dtos.activity_dtos import CreateActivityRequest, ActivityResponse
 from src.application.learning.commands.create_activity_command import CreateActivityCommand
@@ -45,10 +50,14 @@ def create_activity(
 
 @router.get("/activities", response_model=List[ActivityResponse])
 def list_teacher_activities(
+    response: Response,
     teacher_id: str = Depends(get_current_user_id),
+    paging: PageParams = Depends(get_page_params),
     query: ListTeacherActivitiesQuery = Depends(get_list_teacher_activities_query)
 ):
-    return query.execute(teacher_id)
+    page = query.execute(teacher_id, limit=paging.limit, cursor=paging.cursor)
+    set_page_headers(response, page)
+    return page.items
 
 @router.get("/activities/{activity_id}", response_model=ActivityResponse)
 def get_activity(
@@ -98,31 +107,36 @@ class ExerciseResponse(BaseModel):
 @router.get("/activities/{activity_id}/exercises", response_model=List[ExerciseResponse])
 def get_activity_exercises(
     activity_id: str,
+    request: Request,
     exercise_repo = Depends(get_exercise_repository)
 ):
-    exercises = exercise_repo.list_by_activity(activity_id) or []
-    return [
-        ExerciseResponse(
-            id=ex.id,
-            activity_id=ex.activity_id,
-            title=ex.title,
-            problem_statement=ex.problem_statement,
-            starter_code=ex.starter_code,
-            difficulty=ex.difficulty.value,
-            language=ex.language.value,
-            status=ex.status.value,
-            test_cases=[
-                {
-                    "input_data": tc.input_data,
-                    "expected_output": tc.expected_output,
-                    "is_hidden": tc.is_hidden,
-                    "weight": tc.weight
-                } for tc in ex.test_cases
-            ],
-            created_at=ex.created_at,
-            updated_at=ex.updated_at
-        ) for ex in exercises
-    ]
+    def build():
+        # Listing projection: test cases yes, solution_code no
+        exercises = exercise_repo.list_summaries_by_activity(activity_id, with_test_cases=True)
+        return [
+            ExerciseResponse(
+                id=ex.id,
+                activity_id=ex.activity_id,
+                title=ex.title,
+                problem_statement=ex.problem_statement,
+                starter_code=ex.starter_code,
+                difficulty=ex.difficulty.value,
+                language=ex.language.value,
+                status=ex.status.value,
+                test_cases=[
+                    {
+                        "input_data": tc.input_data,
+                        "expected_output": tc.expected_output,
+                        "is_hidden": tc.is_hidden,
+                        "weight": tc.weight
+                    } for tc in ex.test_cases
+                ],
+                created_at=ex.created_at,
+                updated_at=ex.updated_at
+            ) for ex in exercises
+        ]
+
+    return cached_json(request, response_cache, f"teacher:exercises:{activity_id}", activity_id, build)
 
 @router.get("/modules/{module_id}/activities", response_model=List[ActivityResponse])
 def get_module_activities(
@@ -132,6 +146,7 @@ def get_module_activities(
 ):
     # We use list_by_course because we are using module_id as the course_id link
     activities = activity_repo.list_by_course(module_id)
+    exercise_counts = exercise_repo.count_by_activities([a.id for a in activities])
     return [
         ActivityResponse(
             id=a.id,
@@ -144,7 +159,7 @@ def get_module_activities(
             order=a.order,
             created_at=a.created_at,
             updated_at=a.updated_at,
-            exercise_count=exercise_repo.count_by_activity(a.id)
+            exercise_count=exercise_counts[a.id]
         ) for a in activities
     ]
 
@@ -184,23 +199,29 @@ def update_activity_status(
         raise HTTPException(status_code=400, detail="Invalid status")
 
     activity_repo.update_status(activity_id, request.status)
+    student_courses_cache.invalidate_all()
+    response_cache.invalidate_activity(activity_id)
     return {"message": "Status updated successfully", "status": request.status}
 
 
 from src.application.teacher.dtos.student_dto import StudentDTO, AddStudentsRequest
 from src.application.teacher.queries.get_module_students import GetModuleStudentsQuery
 from src.application.teacher.commands.add_students_to_module import AddStudentsToModuleCommand
-from src.application.teacher.commands.remove_student_from_module import RemoveStudentFromModuleCommand
 from src.infrastructure.http.dependencies.container import get_unit_of_work
+from src.infrastructure.cache.student_courses_cache import student_courses_cache
 
 @router.get("/modules/{module_id}/students", response_model=List[StudentDTO])
 def get_module_students(
     module_id: str,
+    response: Response,
+    paging: PageParams = Depends(get_page_params),
     activity_repo = Depends(get_activity_repository),
     user_repo = Depends(get_user_repository)
 ):
     query = GetModuleStudentsQuery(activity_repo, user_repo)
-    return query.execute(module_id)
+    page = query.execute(module_id, limit=paging.limit, cursor=paging.cursor)
+    set_page_headers(response, page)
+    return page.items
 
 @router.post("/modules/{module_id}/students")
 def add_students_to_module(
@@ -209,14 +230,10 @@ def add_students_to_module(
     activity_repo = Depends(get_activity_repository),
     uow = Depends(get_unit_of_work)
 ):
-    command = AddStudentsToModuleCommand(activity_repo, uow)
+    command = AddStudentsToModuleCommand(activity_repo, uow, courses_cache=student_courses_cache)
     command.execute(module_id, request.student_ids)
     return {"message": "Students added successfully"}
 
-    command = RemoveStudentFromModuleCommand(activity_repo, uow)
-    command.execute(module_id, student_id)
-    return {"message": "Student removed successfully"}
-
 
 # --- Analytics & Inspection Endpoints ---
 
@@ -226,6 +243,15 @@ from src.infrastructure.http.dependencies.container import get_student_activity_
 from src.infrastructure.persistence.database import get_db
 from sqlalchemy.orm import Session
 
+@router.get("/activities/{activity_id}/students/details", response_model=List[StudentActivityDetailsDTO])
+def get_activity_students_details(
+    activity_id: str,
+    student_ids: Optional[List[str]] = Query(None),
+    query: GetStudentActivityDetails = Depends(get_student_activity_details_query)
+):
+    # Whole class in one call; `student_ids` narrows it down
+    return query.execute_for_activity(activity_id, student_ids)
+
 @router.get("/activities/{activity_id}/students/{student_id}/details", response_model=StudentActivityDetailsDTO)
 def get_student_activity_details(
     activity_id: str,
@@ -267,8 +293,60 @@ from src.application.teacher.queries.get_activity_students import GetActivityStu
 @router.get("/activities/{activity_id}/students", response_model=List[StudentActivityProgressDTO])
 def get_activity_students_progress(
     activity_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exercise_repo = Depends(get_exercise_repository)
 ):
-    query = GetActivityStudentsProgress(db)
+    query = GetActivityStudentsProgress(db, exercise_repo)
     return query.execute(activity_id)
 
+
+
+# --- Background Tasks ---
+
+from src.application.teacher.queries.get_background_task import GetBackgroundTaskQuery
+from src.application.teacher.dtos.task_dto import BackgroundTaskResponse
+from src.infrastructure.tasks.analyze_risk_task import risk_analysis_dedup_key
+from src.infrastructure.http.dependencies.container import get_background_task_query
+
+@router.get("/tasks/{task_id}", response_model=BackgroundTaskResponse)
+def get_background_task(
+    task_id: str,
+    query: GetBackgroundTaskQuery = Depends(get_background_task_query)
+):
+    task = query.execute(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+@router.get("/submissions/{submission_id}/risk-analysis/task", response_model=BackgroundTaskResponse)
+def get_risk_analysis_task(
+    submission_id: str,
+    query: GetBackgroundTaskQuery = Depends(get_background_task_query)
+):
+    task = query.execute_by_dedup_key(risk_analysis_dedup_key(submission_id))
+    if not task:
+        raise HTTPException(status_code=404, detail="No risk analysis queued for this submission")
+    return task
+
+from src.infrastructure.tasks.cohort_risk_task import enqueue_cohort_risk_analysis, cohort_risk_analysis_dedup_key
+
+@router.post("/activities/{activity_id}/risk-analysis", response_model=BackgroundTaskResponse, status_code=202)
+def analyze_activity_risk(
+    activity_id: str,
+    activity_repo = Depends(get_activity_repository),
+    query: GetBackgroundTaskQuery = Depends(get_background_task_query)
+):
+    # Whole class in one background task; results land in each student's details
+    if not activity_repo.find_by_id(activity_id):
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return query.to_response(enqueue_cohort_risk_analysis(activity_id))
+
+@router.get("/activities/{activity_id}/risk-analysis/task", response_model=BackgroundTaskResponse)
+def get_activity_risk_analysis_task(
+    activity_id: str,
+    query: GetBackgroundTaskQuery = Depends(get_background_task_query)
+):
+    task = query.execute_by_dedup_key(cohort_risk_analysis_dedup_key(activity_id))
+    if not task:
+        raise HTTPException(status_code=404, detail="No risk analysis queued for this activity")
+    return task
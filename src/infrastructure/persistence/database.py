@@ -7,13 +7,26 @@ sync_url = settings.DATABASE_URL
 if "+asyncpg" in sync_url:
     sync_url = sync_url.replace("+asyncpg", "")
 
+# Same URL with the asyncpg driver, for the optional async engine
+async_url = sync_url.replace("postgresql+psycopg2://", "postgresql://").replace("postgresql://", "postgresql+asyncpg://", 1)
+
 engine = create_engine(
-    sync_url, 
-    pool_pre_ping=True, 
-    echo=settings.DB_ECHO
+    sync_url,
+    pool_pre_ping=True,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    # Server-side cap so a runaway query can't hold a pooled connection forever
+    connect_args={"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Schema scripts (update_db_schema.py, scripts/init_db.py): no statement timeout, since
+# backfills and index builds legitimately run longer than any request query
+migration_engine = create_engine(sync_url, pool_pre_ping=True, echo=settings.DB_ECHO)
+
 Base = declarative_base()
 
 def get_db():
@@ -22,3 +35,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# --- Optional async path (DB_ASYNC_ENABLED, requires asyncpg) ---
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC_ENABLED:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        async_url,
+        pool_pre_ping=True,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_ASYNC_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        connect_args={"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    )
+    # expire_on_commit=False: attributes stay readable after commit without an implicit (sync) refresh
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access is disabled; set DB_ASYNC_ENABLED=true (requires asyncpg)")
+    async with AsyncSessionLocal() as db:
+        yield db
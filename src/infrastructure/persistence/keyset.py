@@ -0,0 +1,23 @@
+from typing import Any, Optional, Sequence
+from sqlalchemy import tuple_
+from src.application.shared.dtos.pagination import InvalidCursorError
+
+def keyset(query, columns: Sequence[Any], after: Optional[Sequence[Any]] = None, limit: Optional[int] = None, descending: bool = False):
+    """
+    Keyset (seek) pagination for an ORM Query or a Select: orders by `columns`, which
+    must end in a unique column, and keeps the rows strictly after the `after` key with a
+    row comparison, so each page is an index range scan whatever its depth.
+    Without `limit` the whole ordered list is returned.
+    """
+    if after is not None:
+        if len(after) != len(columns):
+            raise InvalidCursorError("Cursor does not belong to this list")
+        for column, value in zip(columns, after):
+            if value is not None and not isinstance(value, column.type.python_type):
+                raise InvalidCursorError("Cursor does not belong to this list")
+        row, bound = tuple_(*columns), tuple_(*after)
+        query = query.where(row < bound if descending else row > bound)
+    query = query.order_by(*[c.desc() if descending else c for c in columns])
+    if limit is not None:
+        query = query.limit(limit)
+    return query
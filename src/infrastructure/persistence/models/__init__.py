@@ -2,9 +2,9 @@ from .learning_models import ActivityModel, ExerciseModel, SessionModel
 from .grading_models import SubmissionModel, ExerciseAttemptModel
 from .user_models import UserModel
 from .learning_models import ActivityModel, ExerciseModel, SessionModel
-from .grading_models import SubmissionModel, ExerciseAttemptModel
+from .grading_models import SubmissionModel, ExerciseAttemptModel, ActivityProgressModel
 from .user_models import UserModel
 from .ai_tutor_models import TutorMessageModel, CognitiveTraceModel
 from .academic_models import SubjectModel, CourseModel, EnrollmentModel
 from .governance_models import IncidentModel
-
+from .task_models import BackgroundTaskModel
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -39,4 +39,9 @@ class EnrollmentModel(Base):
     enrolled_at = Column(DateTime, default=datetime.utcnow)
 
     course = relationship("CourseModel", back_populates="enrollments")
+
+    __table_args__ = (
+        Index("ix_enrollments_module_student", "module_id", "student_id"),
+        Index("ix_enrollments_student_status", "student_id", "status"),
+    )
     # student = relationship("UserModel") # Assuming UserModel is in same metadata, but avoiding circular import unless necessary.
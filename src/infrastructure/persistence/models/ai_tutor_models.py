@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer, Float, Boolean, Text
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer, Float, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -17,6 +17,11 @@ class TutorMessageModel(Base):
 
     session = relationship("SessionModel", back_populates="messages")
 
+    __table_args__ = (
+        # Last N messages of a session (tutor history window)
+        Index("ix_tutor_messages_session_created", "session_id", "created_at"),
+    )
+
 class CognitiveTraceModel(Base):
     __tablename__ = "cognitive_traces"
 
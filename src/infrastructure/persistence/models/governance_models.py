@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, Enum as SqlEnum
+from sqlalchemy import Column, String, DateTime, Text, Index, Enum as SqlEnum
 from datetime import datetime
 import uuid
 from ..database import Base
@@ -15,3 +15,8 @@ class IncidentModel(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     resolved_at = Column(DateTime, nullable=True)
     resolution_notes = Column(Text, default="")
+
+    __table_args__ = (
+        # Keyset pages of list_all, newest first
+        Index("ix_incidents_created", "created_at", "id"),
+    )
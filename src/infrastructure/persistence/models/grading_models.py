@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer, Float, Boolean, Text, JSON
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer, Float, Boolean, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 from ....domain.grading.value_objects.submission_status import SubmissionStatus
@@ -20,6 +20,13 @@ class SubmissionModel(Base):
     attempts = relationship("ExerciseAttemptModel", back_populates="submission", cascade="all, delete-orphan")
     risk_analysis = relationship("RiskAnalysisModel", uselist=False, back_populates="submission", cascade="all, delete-orphan") # One-to-One
 
+    __table_args__ = (
+        # One submission per student and activity (find_by_activity_and_student)
+        Index("uq_submissions_activity_student", "activity_id", "student_id", unique=True),
+        # Keyset pages of a student's grades, newest first
+        Index("ix_submissions_student_created", "student_id", "created_at", "id"),
+    )
+
 class ExerciseAttemptModel(Base):
     __tablename__ = "exercise_attempts"
 
@@ -35,6 +42,11 @@ class ExerciseAttemptModel(Base):
 
     submission = relationship("SubmissionModel", back_populates="attempts")
 
+    __table_args__ = (
+        # Attempts of a submission in order (details view, progress backfill)
+        Index("ix_exercise_attempts_submission_created", "submission_id", "created_at"),
+    )
+
 class RiskAnalysisModel(Base):
     __tablename__ = "risk_analyses"
     
@@ -49,3 +61,20 @@ class RiskAnalysisModel(Base):
     analyzed_at = Column(DateTime, default=datetime.utcnow)
     
     submission = relationship("SubmissionModel", back_populates="risk_analysis")
+
+class ActivityProgressModel(Base):
+    """Projection maintained on every submission save; see SqlAlchemyActivityProgressProjection."""
+    __tablename__ = "activity_progress"
+
+    activity_id = Column(String, ForeignKey("activities.id"), primary_key=True)
+    student_id = Column(String, primary_key=True, index=True)
+    submission_id = Column(String, nullable=True)
+    status = Column(String, nullable=True)                   # SubmissionStatus of the submission
+    exercises_attempted = Column(Integer, nullable=False, default=0)
+    exercises_passed = Column(Integer, nullable=False, default=0)
+    attempts_count = Column(Integer, nullable=False, default=0)
+    best_grade = Column(Float, nullable=True)                # best grade over all exercises
+    final_score = Column(Float, nullable=True)
+    exercise_state = Column(JSON, nullable=False, default=dict)  # {exercise_id: {passed, best_grade, attempts}}
+    last_activity_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Integer, JSON, Index
+from sqlalchemy.orm import relationship, deferred
 from ..database import Base
 from ....domain.learning.value_objects.difficulty import Difficulty
 from ....domain.learning.value_objects.programming_language import ProgrammingLanguage
@@ -23,20 +23,27 @@ class ActivityModel(Base):
 
     exercises = relationship("ExerciseModel", back_populates="activity")
 
+    __table_args__ = (
+        # Keyset pages of list_by_teacher / find_all_published
+        Index("ix_activities_teacher_created", "teacher_id", "created_at", "id"),
+        Index("ix_activities_status_created", "status", "created_at", "id"),
+    )
+
 class ExerciseModel(Base):
     __tablename__ = "exercises"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    activity_id = Column(String, ForeignKey("activities.id"), nullable=False)
+    activity_id = Column(String, ForeignKey("activities.id"), nullable=False, index=True)
     title = Column(String, nullable=False)
     problem_statement = Column(String, nullable=False)
     starter_code = Column(String, nullable=False)
-    solution_code = Column(String, nullable=True) # AI Generated Solution for Grading
+    # Heavy columns are deferred: listings never read them, full loads undefer the "heavy" group
+    solution_code = deferred(Column(String, nullable=True), group="heavy") # AI Generated Solution for Grading
     # Storing Enums as Strings in DB for simplicity and portability
     difficulty = Column(String, nullable=False) 
     language = Column(String, nullable=False)
     status = Column(String, default=ExerciseStatus.DRAFT.value)
-    test_cases_json = Column(String, nullable=True) # Storing test cases as JSON
+    test_cases_json = deferred(Column(String, nullable=True), group="heavy") # Storing test cases as JSON
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
@@ -57,6 +64,11 @@ class SessionModel(Base):
     # Relation to messages
     messages = relationship("TutorMessageModel", back_populates="session")
 
+    __table_args__ = (
+        # Latest session of each student in an activity
+        Index("ix_sessions_activity_student_updated", "activity_id", "student_id", "updated_at"),
+    )
+
 
 
 class ActivityDocumentModel(Base):
@@ -67,5 +79,7 @@ class ActivityDocumentModel(Base):
     filename = Column(String, nullable=False)
     content_text = Column(String, nullable=True) # Using String/Text for small content, or large text
     embedding_id = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)   # sha256 of the uploaded file
+    chunk_ids = Column(JSON, nullable=True)         # deterministic ids of its chunks in Chroma
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Text, JSON, Index
+from ..database import Base
+
+class BackgroundTaskModel(Base):
+    __tablename__ = "background_tasks"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False, index=True)          # e.g. "risk_analysis"
+    dedup_key = Column(String, nullable=True, unique=True)      # one live task per key (e.g. per submission)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="pending")  # pending | running | completed | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime, nullable=True)
+    locked_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    progress = Column(JSON, nullable=True)                      # reported by the handler while it runs
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Workers claim with: status = 'pending' AND run_after <= now() ORDER BY run_after
+        Index("ix_background_tasks_status_run_after", "status", "run_after"),
+    )
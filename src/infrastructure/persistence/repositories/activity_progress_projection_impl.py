@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from src.domain.grading.ports.activity_progress_projection import ActivityProgressProjection
+from src.domain.grading.entities.submission import Submission
+from src.domain.grading.entities.exercise_attempt import ExerciseAttempt
+from src.infrastructure.persistence.models.grading_models import ActivityProgressModel
+
+class SqlAlchemyActivityProgressProjection(ActivityProgressProjection):
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def apply(self, submission: Submission, new_attempts: List[ExerciseAttempt]) -> None:
+        # Make sure the row exists, then lock it: concurrent runs of the same student serialize here
+        self.db_session.execute(
+            pg_insert(ActivityProgressModel)
+            .values(
+                activity_id=submission.activity_id,
+                student_id=submission.student_id,
+                exercise_state={},
+                exercises_attempted=0,
+                exercises_passed=0,
+                attempts_count=0
+            )
+            .on_conflict_do_nothing(index_elements=["activity_id", "student_id"])
+        )
+        progress = self.db_session.execute(
+            select(ActivityProgressModel)
+            .where(
+                ActivityProgressModel.activity_id == submission.activity_id,
+                ActivityProgressModel.student_id == submission.student_id
+            )
+            .with_for_update()
+        ).scalar_one()
+
+        state = {k: dict(v) for k, v in (progress.exercise_state or {}).items()}
+        last_activity = progress.last_activity_at
+        for attempt in new_attempts:
+            # Same fallback as the teacher's details view for ungraded runs
+            grade = attempt.grade if attempt.grade is not None else (100.0 if attempt.passed else 0.0)
+            exercise = state.setdefault(attempt.exercise_id, {"passed": False, "best_grade": 0.0, "attempts": 0})
+            exercise["passed"] = exercise["passed"] or attempt.passed
+            exercise["best_grade"] = max(exercise["best_grade"], grade)
+            exercise["attempts"] += 1
+            if last_activity is None or attempt.created_at > last_activity:
+                last_activity = attempt.created_at
+
+        # Assign a new dict: in-place changes to a JSON column are not detected
+        progress.exercise_state = state
+        progress.exercises_attempted = len(state)
+        progress.exercises_passed = sum(1 for exercise in state.values() if exercise["passed"])
+        progress.attempts_count = (progress.attempts_count or 0) + len(new_attempts)
+        progress.best_grade = max((exercise["best_grade"] for exercise in state.values()), default=None)
+        progress.submission_id = str(submission.id)
+        progress.status = submission.status.value
+        if submission.score is not None:
+            progress.final_score = submission.score.value
+        progress.last_activity_at = max(last_activity or submission.updated_at, submission.updated_at)
+        progress.updated_at = datetime.utcnow()
@@ -1,9 +1,11 @@
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from ....domain.learning.ports.activity_repository import ActivityRepository
+from typing import Any, Optional, List, Dict, Sequence
+from sqlalchemy import and_
+from sqlalchemy.orm import Session, aliased
+from ....domain.learning.ports.activity_repository import ActivityRepository, EnrolledModule
 from ....domain.learning.entities.activity import Activity, ActivityType
 from ....domain.learning.value_objects.exercise_status import ExerciseStatus
 from ..models.learning_models import ActivityModel
+from ..keyset import keyset
 
 class SqlAlchemyActivityRepository(ActivityRepository):
     def __init__(self, session: Session):
@@ -65,43 +67,59 @@ class SqlAlchemyActivityRepository(ActivityRepository):
             ) for m in models
         ]
 
-    def list_by_teacher(self, teacher_id: str) -> List[Activity]:
-        print(f"DEBUG: list_by_teacher called for {teacher_id}")
-        models = self.session.query(ActivityModel).filter_by(teacher_id=teacher_id).all()
-        print(f"DEBUG: Found {len(models)} activities")
-        for m in models:
-            print(f"DEBUG: Activity {m.id} type={m.type}")
-        return [
-            Activity(
-                id=m.id,
-                course_id=m.course_id,
-                teacher_id=m.teacher_id,
-                title=m.title,
-                description=m.description,
-                type=ActivityType(m.type),
-                status=ExerciseStatus(m.status),
-                order=m.order,
-                created_at=m.created_at,
-                updated_at=m.updated_at
-            ) for m in models
-        ]
+    def list_by_teacher(self, teacher_id: str, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[Activity]:
+        query = self.session.query(ActivityModel).filter(ActivityModel.teacher_id == teacher_id)
+        query = keyset(query, [ActivityModel.created_at, ActivityModel.id], after, limit)
+        return [self._to_entity(m) for m in query.all()]
 
-    def find_all_published(self) -> List[Activity]:
-        models = self.session.query(ActivityModel).filter(ActivityModel.status == "published").all()
-        return [
-            Activity(
-                id=m.id,
-                course_id=m.course_id,
-                teacher_id=m.teacher_id,
-                title=m.title,
-                description=m.description,
-                type=ActivityType(m.type),
-                status=ExerciseStatus(m.status),
-                order=m.order,
-                created_at=m.created_at,
-                updated_at=m.updated_at
-            ) for m in models
-        ]
+    def find_all_published(self, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[Activity]:
+        query = self.session.query(ActivityModel).filter(ActivityModel.status == "published")
+        query = keyset(query, [ActivityModel.created_at, ActivityModel.id], after, limit)
+        return [self._to_entity(m) for m in query.all()]
+
+    def list_enrolled_modules(self, student_id: str) -> List[EnrolledModule]:
+        from ..models.academic_models import EnrollmentModel
+        Module = aliased(ActivityModel)
+        Child = aliased(ActivityModel)
+        rows = (
+            self.session.query(Module, Child)
+            .join(EnrollmentModel, EnrollmentModel.module_id == Module.id)
+            .outerjoin(Child, and_(Child.course_id == Module.id, Child.status == "published"))
+            .filter(
+                EnrollmentModel.student_id == student_id,
+                EnrollmentModel.status == "active",
+                Module.type == "module",
+                Module.status == "published"
+            )
+            .order_by(Module.order, Module.created_at, Module.id, Child.order, Child.created_at, Child.id)
+            .all()
+        )
+
+        modules: Dict[str, EnrolledModule] = {}
+        seen = set()
+        for module, child in rows:
+            if module.id not in modules:
+                modules[module.id] = EnrolledModule(module=self._to_entity(module))
+            # A duplicated enrollment repeats every child row
+            if child is not None and (module.id, child.id) not in seen:
+                seen.add((module.id, child.id))
+                modules[module.id].activities.append(self._to_entity(child))
+        return list(modules.values())
+
+    @staticmethod
+    def _to_entity(m: ActivityModel) -> Activity:
+        return Activity(
+            id=m.id,
+            course_id=m.course_id,
+            teacher_id=m.teacher_id,
+            title=m.title,
+            description=m.description,
+            type=ActivityType(m.type),
+            status=ExerciseStatus(m.status),
+            order=m.order,
+            created_at=m.created_at,
+            updated_at=m.updated_at
+        )
 
     def add_student_to_module(self, module_id: str, student_id: str) -> None:
         from ..models.academic_models import EnrollmentModel
@@ -127,10 +145,13 @@ class SqlAlchemyActivityRepository(ActivityRepository):
         ).delete()
         self.session.flush()
 
-    def get_assigned_students(self, module_id: str) -> List[str]:
+    def get_assigned_students(self, module_id: str, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[str]:
         from ..models.academic_models import EnrollmentModel
-        enrollments = self.session.query(EnrollmentModel).filter_by(
-            module_id=module_id,
-            status="active"
-        ).all()
-        return [e.student_id for e in enrollments]
+        # Distinct: a student enrolled twice is listed once, and student_id becomes a
+        # unique keyset key. Served by ix_enrollments_module_student
+        query = self.session.query(EnrollmentModel.student_id).filter(
+            EnrollmentModel.module_id == module_id,
+            EnrollmentModel.status == "active"
+        ).distinct()
+        query = keyset(query, [EnrollmentModel.student_id], after, limit)
+        return [student_id for (student_id,) in query.all()]
@@ -0,0 +1,61 @@
+from typing import List, Optional
+from sqlalchemy import select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.learning.ports.session_repository import AsyncSessionRepository
+from src.domain.learning.entities.session import LearningSession
+from src.domain.learning.entities.chat_message import ChatMessage
+from src.infrastructure.persistence.models.learning_models import SessionModel
+from src.infrastructure.persistence.models.ai_tutor_models import TutorMessageModel
+from src.infrastructure.persistence.repositories.session_repository_impl import SqlAlchemySessionRepository
+
+class AsyncSqlAlchemySessionRepository(AsyncSessionRepository):
+    """
+    Same statements as SqlAlchemySessionRepository on an AsyncSession.
+    Reuses its mapper; messages are always queried explicitly, never lazy-loaded.
+    """
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def find_by_id(self, session_id: str) -> Optional[LearningSession]:
+        return await self._load(session_id, None)
+
+    async def find_by_id_with_recent_messages(self, session_id: str, limit: int) -> Optional[LearningSession]:
+        return await self._load(session_id, limit)
+
+    async def append_messages(self, session: LearningSession, messages: List[ChatMessage]) -> None:
+        if messages:
+            await self.db_session.execute(
+                insert(TutorMessageModel),
+                [
+                    {
+                        "id": str(msg.id),
+                        "session_id": str(session.id),
+                        "role": msg.sender.value,
+                        "content": msg.content,
+                        "created_at": msg.created_at
+                    }
+                    for msg in messages
+                ]
+            )
+        await self.db_session.execute(
+            update(SessionModel)
+            .where(SessionModel.id == str(session.id))
+            .values(status=session.status.value, end_time=session.end_time, updated_at=session.updated_at)
+        )
+
+    async def _load(self, session_id: str, limit: Optional[int]) -> Optional[LearningSession]:
+        model = await self.db_session.get(SessionModel, session_id)
+        if not model:
+            return None
+        messages = []
+        if limit is None or limit > 0:
+            query = (
+                select(TutorMessageModel)
+                .where(TutorMessageModel.session_id == session_id)
+                .order_by(TutorMessageModel.created_at.desc(), TutorMessageModel.id.desc())
+            )
+            if limit is not None:
+                query = query.limit(limit)
+            messages = list((await self.db_session.execute(query)).scalars())
+            messages.reverse()
+        return SqlAlchemySessionRepository._to_entity(model, messages)
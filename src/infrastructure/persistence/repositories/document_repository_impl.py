@@ -16,6 +16,8 @@ class SqlAlchemyDocumentRepository(DocumentRepository):
                 filename=document.filename,
                 content_text=document.content_text,
                 embedding_id=document.embedding_id,
+                content_hash=document.content_hash,
+                chunk_ids=list(document.chunk_ids),
                 created_at=document.created_at
             )
             self.session.add(model)
@@ -23,29 +25,38 @@ class SqlAlchemyDocumentRepository(DocumentRepository):
             model.filename = document.filename
             model.content_text = document.content_text
             model.embedding_id = document.embedding_id
+            model.content_hash = document.content_hash
+            model.chunk_ids = list(document.chunk_ids)
 
     def find_by_activity(self, activity_id: str) -> List[ActivityDocument]:
         models = self.session.query(ActivityDocumentModel).filter_by(activity_id=activity_id).all()
-        return [
-            ActivityDocument(
-                id=m.id,
-                activity_id=m.activity_id,
-                filename=m.filename,
-                content_text=m.content_text,
-                embedding_id=m.embedding_id,
-                created_at=m.created_at
-            ) for m in models
-        ]
+        return [self._to_entity(m) for m in models]
 
     def find_by_id(self, document_id: str) -> Optional[ActivityDocument]:
         model = self.session.query(ActivityDocumentModel).filter_by(id=document_id).first()
         if not model:
             return None
+        return self._to_entity(model)
+
+    def find_by_activity_and_filename(self, activity_id: str, filename: str) -> Optional[ActivityDocument]:
+        model = (
+            self.session.query(ActivityDocumentModel)
+            .filter_by(activity_id=activity_id, filename=filename)
+            .order_by(ActivityDocumentModel.created_at.desc())
+            .first()
+        )
+        if not model:
+            return None
+        return self._to_entity(model)
+
+    def _to_entity(self, model: ActivityDocumentModel) -> ActivityDocument:
         return ActivityDocument(
             id=model.id,
             activity_id=model.activity_id,
             filename=model.filename,
             content_text=model.content_text,
             embedding_id=model.embedding_id,
-            created_at=model.created_at
+            created_at=model.created_at,
+            content_hash=model.content_hash,
+            chunk_ids=list(model.chunk_ids or [])
         )
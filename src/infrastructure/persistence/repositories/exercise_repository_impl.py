@@ -1,17 +1,20 @@
 import json
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from ....domain.learning.ports.exercise_repository import ExerciseRepository
+from typing import Optional, List, Dict
+from sqlalchemy import func
+from sqlalchemy.orm import Session, undefer_group
+from ....domain.learning.ports.exercise_repository import ExerciseRepository, ExerciseSummary
 from ....domain.learning.entities.exercise import Exercise
 from ....domain.learning.entities.test_case import TestCase
 from ....domain.learning.value_objects.difficulty import Difficulty
 from ....domain.learning.value_objects.programming_language import ProgrammingLanguage
 from ....domain.learning.value_objects.exercise_status import ExerciseStatus
 from ..models.learning_models import ExerciseModel
+from ...cache.exercise_cache import ExerciseCache
 
 class SqlAlchemyExerciseRepository(ExerciseRepository):
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, cache: Optional[ExerciseCache] = None):
         self.session = session
+        self.cache = cache
 
     def save(self, exercise: Exercise) -> None:
         model = self.session.query(ExerciseModel).filter_by(id=exercise.id).first()
@@ -40,25 +43,119 @@ class SqlAlchemyExerciseRepository(ExerciseRepository):
         model.test_cases_json = json.dumps(test_cases_data)
         
         model.updated_at = exercise.updated_at
+        if self.cache:
+            # A read racing the commit may re-cache the old row; its updated_at check after the TTL catches it
+            self.cache.invalidate(exercise.id)
 
     def find_by_id(self, exercise_id: str) -> Optional[Exercise]:
-        model = self.session.query(ExerciseModel).filter_by(id=exercise_id).first()
-        if not model:
-            return None
-            
-        return self._map_to_entity(model)
+        exercises = self.find_by_ids([exercise_id])
+        return exercises[0] if exercises else None
+
+    def find_by_ids(self, exercise_ids: List[str]) -> List[Exercise]:
+        ids = list(dict.fromkeys(exercise_ids))
+        found: Dict[str, Exercise] = {}
+        token = self.cache.token() if self.cache else None
+        if self.cache:
+            stale = {}
+            for exercise_id in ids:
+                entry = self.cache.get(exercise_id)
+                if entry is None:
+                    continue
+                exercise, updated_at, fresh = entry
+                if fresh:
+                    found[exercise_id] = exercise
+                else:
+                    stale[exercise_id] = (exercise, updated_at)
+            if stale:
+                # Older than the TTL: only reload the rows whose updated_at moved
+                rows = self.session.query(ExerciseModel.id, ExerciseModel.updated_at).filter(ExerciseModel.id.in_(list(stale))).all()
+                for exercise_id, updated_at in rows:
+                    exercise, cached_at = stale[exercise_id]
+                    if updated_at == cached_at:
+                        self.cache.revalidated(exercise_id)
+                        found[exercise_id] = exercise
+
+        missing = [i for i in ids if i not in found]
+        if missing:
+            models = (
+                self.session.query(ExerciseModel)
+                .options(undefer_group("heavy"))
+                .filter(ExerciseModel.id.in_(missing))
+                .all()
+            )
+            for model in models:
+                exercise = self._map_to_entity(model)
+                if self.cache:
+                    self.cache.put(exercise, model.updated_at, token)
+                found[model.id] = exercise
+        return [found[i] for i in ids if i in found]
 
     def list_by_activity(self, activity_id: str) -> List[Exercise]:
-        models = self.session.query(ExerciseModel).filter_by(activity_id=activity_id).all()
+        models = self.session.query(ExerciseModel).options(undefer_group("heavy")).filter_by(activity_id=activity_id).all()
         return [self._map_to_entity(m) for m in models]
 
+    def list_summaries_by_activity(self, activity_id: str, with_test_cases: bool = False) -> List[ExerciseSummary]:
+        columns = [
+            ExerciseModel.id, ExerciseModel.activity_id, ExerciseModel.title, ExerciseModel.problem_statement,
+            ExerciseModel.starter_code, ExerciseModel.difficulty, ExerciseModel.language, ExerciseModel.status,
+            ExerciseModel.created_at, ExerciseModel.updated_at
+        ]
+        if with_test_cases:
+            columns.append(ExerciseModel.test_cases_json)
+        rows = self.session.query(*columns).filter(ExerciseModel.activity_id == activity_id).all()
+        return [
+            ExerciseSummary(
+                id=row.id,
+                activity_id=row.activity_id,
+                title=row.title,
+                problem_statement=row.problem_statement,
+                starter_code=row.starter_code,
+                difficulty=self._difficulty(row.difficulty),
+                language=self._language(row.language),
+                status=self._status(row.status),
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                test_cases=self._test_cases(row.id, row.test_cases_json) if with_test_cases else []
+            )
+            for row in rows
+        ]
+
     def count_by_activity(self, activity_id: str) -> int:
         return self.session.query(ExerciseModel).filter_by(activity_id=activity_id).count()
 
+    def count_by_activities(self, activity_ids: List[str]) -> Dict[str, int]:
+        counts = dict.fromkeys(activity_ids, 0)
+        if activity_ids:
+            rows = (
+                self.session.query(ExerciseModel.activity_id, func.count(ExerciseModel.id))
+                .filter(ExerciseModel.activity_id.in_(activity_ids))
+                .group_by(ExerciseModel.activity_id)
+                .all()
+            )
+            counts.update(rows)
+        return counts
+
     def _map_to_entity(self, model: ExerciseModel) -> Exercise:
+        return Exercise(
+            id=model.id,
+            activity_id=model.activity_id,
+            title=model.title,
+            problem_statement=model.problem_statement,
+            starter_code=model.starter_code,
+            solution_code=model.solution_code,
+            difficulty=self._difficulty(model.difficulty),
+            language=self._language(model.language),
+            status=self._status(model.status),
+            test_cases=self._test_cases(model.id, model.test_cases_json),
+            created_at=model.created_at,
+            updated_at=model.updated_at
+        )
+
+    @staticmethod
+    def _test_cases(exercise_id: str, test_cases_json: Optional[str]) -> List[TestCase]:
         try:
-            test_cases_data = json.loads(model.test_cases_json or "[]")
-            test_cases = [
+            test_cases_data = json.loads(test_cases_json or "[]")
+            return [
                 TestCase(
                     input_data=tc["input_data"],
                     expected_output=tc["expected_output"],
@@ -67,35 +164,26 @@ class SqlAlchemyExerciseRepository(ExerciseRepository):
                 ) for tc in test_cases_data
             ]
         except Exception as e:
-            print(f"Error parsing test cases for exercise {model.id}: {e}")
-            test_cases = []
+            print(f"Error parsing test cases for exercise {exercise_id}: {e}")
+            return []
 
+    @staticmethod
+    def _difficulty(value: str) -> Difficulty:
         try:
-            diff = Difficulty(model.difficulty)
+            return Difficulty(value)
         except ValueError:
-            diff = Difficulty.MEDIUM # Fallback
+            return Difficulty.MEDIUM # Fallback
 
+    @staticmethod
+    def _language(value: str) -> ProgrammingLanguage:
         try:
-            lang = ProgrammingLanguage(model.language)
+            return ProgrammingLanguage(value)
         except ValueError:
-            lang = ProgrammingLanguage.PYTHON # Fallback
-            
+            return ProgrammingLanguage.PYTHON # Fallback
+
+    @staticmethod
+    def _status(value: str) -> ExerciseStatus:
         try:
-            status = ExerciseStatus(model.status)
+            return ExerciseStatus(value)
         except ValueError:
-            status = ExerciseStatus.DRAFT # Fallback
-        
-        return Exercise(
-            id=model.id,
-            activity_id=model.activity_id,
-            title=model.title,
-            problem_statement=model.problem_statement,
-            starter_code=model.starter_code,
-            solution_code=model.solution_code,
-            difficulty=diff,
-            language=lang,
-            status=status,
-            test_cases=test_cases,
-            created_at=model.created_at,
-            updated_at=model.updated_at
-        )
+            return ExerciseStatus.DRAFT # Fallback
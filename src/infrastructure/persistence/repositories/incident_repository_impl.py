@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence
 from sqlalchemy.orm import Session
 from src.domain.governance.ports.incident_repository import IncidentRepository
 from src.domain.governance.entities.incident import Incident, IncidentType, IncidentSeverity, IncidentStatus
 from src.infrastructure.persistence.models.governance_models import IncidentModel
+from src.infrastructure.persistence.keyset import keyset
 
 class SqlAlchemyIncidentRepository(IncidentRepository):
     def __init__(self, db: Session):
@@ -38,9 +39,9 @@ class SqlAlchemyIncidentRepository(IncidentRepository):
         models = self.db.query(IncidentModel).filter(IncidentModel.student_id == student_id).all()
         return [self._to_entity(m) for m in models]
 
-    def list_all(self) -> List[Incident]:
-        models = self.db.query(IncidentModel).all()
-        return [self._to_entity(m) for m in models]
+    def list_all(self, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None) -> List[Incident]:
+        query = keyset(self.db.query(IncidentModel), [IncidentModel.created_at, IncidentModel.id], after, limit, descending=True)
+        return [self._to_entity(m) for m in query.all()]
         
     def _to_entity(self, model: IncidentModel) -> Incident:
         incident = Incident(
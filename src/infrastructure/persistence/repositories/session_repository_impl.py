@@ -1,4 +1,5 @@
 from typing import List, Optional
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from src.domain.learning.ports.session_repository import SessionRepository
 from src.domain.learning.entities.session import LearningSession
@@ -28,25 +29,38 @@ class SqlAlchemySessionRepository(SessionRepository):
             model.end_time = session.end_time
             model.updated_at = session.updated_at
         
-        # Sync Messages
-        # For simplicity, we add messages that are not yet in DB. 
-        # Assuming ID consistency.
-        # Ideally we might wipe and recreate or diff, but here we just ensure they exist.
-        
-        # We need to flush/commit the session model first to ensure it's attached? 
-        # No, adding to model.messages should work if model is attached.
-        
-        current_msg_ids = {m.id for m in model.messages}
-        for msg in session.messages:
-            if str(msg.id) not in current_msg_ids:
-                new_msg = TutorMessageModel(
-                    id=str(msg.id),
-                    session_id=str(session.id),
-                    role=msg.sender.value,
-                    content=msg.content,
-                    created_at=msg.created_at
-                )
-                model.messages.append(new_msg)
+        # Only the messages of this entity are checked, never the whole conversation
+        # (the entity may hold just a window of it, see find_by_id_with_recent_messages)
+        msg_ids = [str(msg.id) for msg in session.messages]
+        existing_ids = set()
+        if msg_ids:
+            existing_ids = {
+                row[0] for row in self.db_session.query(TutorMessageModel.id).filter(TutorMessageModel.id.in_(msg_ids))
+            }
+        new_messages = [msg for msg in session.messages if str(msg.id) not in existing_ids]
+        if new_messages:
+            self.db_session.add_all([self._to_model(session, msg) for msg in new_messages])
+
+    def append_messages(self, session: LearningSession, messages: List[ChatMessage]) -> None:
+        if messages:
+            self.db_session.execute(
+                insert(TutorMessageModel),
+                [
+                    {
+                        "id": str(msg.id),
+                        "session_id": str(session.id),
+                        "role": msg.sender.value,
+                        "content": msg.content,
+                        "created_at": msg.created_at
+                    }
+                    for msg in messages
+                ]
+            )
+        self.db_session.execute(
+            update(SessionModel)
+            .where(SessionModel.id == str(session.id))
+            .values(status=session.status.value, end_time=session.end_time, updated_at=session.updated_at)
+        )
 
     def find_by_id(self, session_id: str) -> Optional[LearningSession]:
         model = self.db_session.query(SessionModel).filter(SessionModel.id == session_id).first()
@@ -54,6 +68,22 @@ class SqlAlchemySessionRepository(SessionRepository):
             return None
         return self._to_entity(model)
 
+    def find_by_id_with_recent_messages(self, session_id: str, limit: int) -> Optional[LearningSession]:
+        model = self.db_session.query(SessionModel).filter(SessionModel.id == session_id).first()
+        if not model:
+            return None
+        messages = []
+        if limit > 0:
+            messages = (
+                self.db_session.query(TutorMessageModel)
+                .filter(TutorMessageModel.session_id == session_id)
+                .order_by(TutorMessageModel.created_at.desc(), TutorMessageModel.id.desc())
+                .limit(limit)
+                .all()
+            )
+            messages.reverse()
+        return self._to_entity(model, messages)
+
     def list_by_student(self, student_id: str) -> List[LearningSession]:
         models = self.db_session.query(SessionModel).filter(SessionModel.student_id == student_id).all()
         return [self._to_entity(m) for m in models]
@@ -67,7 +97,18 @@ class SqlAlchemySessionRepository(SessionRepository):
             return self._to_entity(model)
         return None
 
-    def _to_entity(self, model: SessionModel) -> LearningSession:
+    @staticmethod
+    def _to_model(session: LearningSession, msg: ChatMessage) -> TutorMessageModel:
+        return TutorMessageModel(
+            id=str(msg.id),
+            session_id=str(session.id),
+            role=msg.sender.value,
+            content=msg.content,
+            created_at=msg.created_at
+        )
+
+    @staticmethod
+    def _to_entity(model: SessionModel, messages: Optional[List[TutorMessageModel]] = None) -> LearningSession:
         try:
             status_enum = SessionStatus(model.status)
         except:
@@ -83,8 +124,8 @@ class SqlAlchemySessionRepository(SessionRepository):
         )
         
         # Map messages
-        # sort by created_at
-        sorted_msgs = sorted(model.messages, key=lambda m: m.created_at)
+        # sort by created_at (a preloaded window is already in order)
+        sorted_msgs = messages if messages is not None else sorted(model.messages, key=lambda m: m.created_at)
         for m in sorted_msgs:
             try:
                 sender = MessageSender(m.role)
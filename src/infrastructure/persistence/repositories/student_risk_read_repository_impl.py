@@ -0,0 +1,97 @@
+from typing import Any, List, Optional, Sequence
+from sqlalchemy import select, func, or_, true, exists, Select
+from sqlalchemy.orm import Session
+from src.domain.grading.ports.student_risk_read_repository import StudentRiskReadRepository, StudentRiskSummary
+from src.infrastructure.persistence.models.user_models import UserModel
+from src.infrastructure.persistence.models.academic_models import EnrollmentModel
+from src.infrastructure.persistence.models.learning_models import ActivityModel, SessionModel
+from src.infrastructure.persistence.models.grading_models import SubmissionModel, RiskAnalysisModel
+from src.infrastructure.persistence.keyset import keyset
+
+class SqlAlchemyStudentRiskReadRepository(StudentRiskReadRepository):
+    """
+    Teacher's student list in a single statement: the page of students is picked
+    first (keyset on name, id), then three LATERAL subqueries compute
+    the average grade, latest risk analysis and last session of those students only.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+    def list_students(
+        self,
+        course_id: Optional[str] = None,
+        module_id: Optional[str] = None,
+        limit: Optional[int] = 100,
+        after: Optional[Sequence[Any]] = None
+    ) -> List[StudentRiskSummary]:
+        rows = self.session.execute(student_page_query(course_id, module_id, limit, after)).all()
+        return to_summaries(rows)
+
+def student_page_query(course_id: Optional[str], module_id: Optional[str], limit: Optional[int], after: Optional[Sequence[Any]]) -> Select:
+    """One page of students with their aggregates, ordered by (full_name or "", id)."""
+    sort_name = func.coalesce(UserModel.full_name, "").label("sort_name")
+    students = select(UserModel.id, UserModel.email, UserModel.full_name, sort_name).where(UserModel.roles.any("student"))
+    scope = None
+    if module_id:
+        students = students.where(exists().where(
+            EnrollmentModel.student_id == UserModel.id,
+            EnrollmentModel.module_id == module_id
+        ))
+        # The module itself plus the activities inside it
+        scope = select(ActivityModel.id).where(or_(ActivityModel.id == module_id, ActivityModel.course_id == module_id))
+    elif course_id:
+        modules = select(ActivityModel.id).where(ActivityModel.course_id == course_id, ActivityModel.type == "module")
+        students = students.where(exists().where(
+            EnrollmentModel.student_id == UserModel.id,
+            or_(EnrollmentModel.course_id == course_id, EnrollmentModel.module_id.in_(modules))
+        ))
+        scope = select(ActivityModel.id).where(or_(ActivityModel.course_id == course_id, ActivityModel.course_id.in_(modules)))
+
+    page = keyset(students, [func.coalesce(UserModel.full_name, ""), UserModel.id], after, limit).subquery("page")
+
+    grades = select(func.avg(SubmissionModel.final_score).label("average_grade")).where(
+        SubmissionModel.student_id == page.c.id,
+        SubmissionModel.final_score.isnot(None)
+    )
+    risk = (
+        select(RiskAnalysisModel.risk_level, RiskAnalysisModel.risk_score)
+        .join(SubmissionModel, SubmissionModel.id == RiskAnalysisModel.submission_id)
+        .where(SubmissionModel.student_id == page.c.id)
+        .order_by(RiskAnalysisModel.analyzed_at.desc())
+        .limit(1)
+    )
+    last_session = select(func.max(SessionModel.updated_at).label("last_active_at")).where(
+        SessionModel.student_id == page.c.id
+    )
+    if scope is not None:
+        grades = grades.where(SubmissionModel.activity_id.in_(scope))
+        risk = risk.where(SubmissionModel.activity_id.in_(scope))
+        last_session = last_session.where(SessionModel.activity_id.in_(scope))
+    grades, risk, last_session = grades.lateral("grades"), risk.lateral("risk"), last_session.lateral("last_session")
+
+    page_query = (
+        select(
+            page.c.id, page.c.email, page.c.full_name,
+            grades.c.average_grade, risk.c.risk_level, risk.c.risk_score, last_session.c.last_active_at
+        )
+        .select_from(page)
+        .outerjoin(grades, true())
+        .outerjoin(risk, true())
+        .outerjoin(last_session, true())
+        .order_by(page.c.sort_name, page.c.id)
+    )
+    return page_query
+
+def to_summaries(rows) -> List[StudentRiskSummary]:
+    return [
+        StudentRiskSummary(
+            student_id=row.id,
+            email=row.email,
+            full_name=row.full_name,
+            average_grade=float(row.average_grade) if row.average_grade is not None else None,
+            risk_level=row.risk_level,
+            risk_score=row.risk_score,
+            last_active_at=row.last_active_at
+        )
+        for row in rows
+    ]
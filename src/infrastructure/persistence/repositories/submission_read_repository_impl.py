@@ -1,99 +1,142 @@
+import json
+from collections import defaultdict
 from typing import Optional, List, Dict, Any
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from src.domain.grading.ports.submission_read_repository import SubmissionReadRepository, StudentActivityDetailsDTO
-from src.infrastructure.persistence.models.grading_models import SubmissionModel, ExerciseAttemptModel
+from src.infrastructure.persistence.models.grading_models import SubmissionModel, ExerciseAttemptModel, RiskAnalysisModel
 from src.infrastructure.persistence.models.learning_models import ActivityModel, SessionModel
 from src.infrastructure.persistence.models.ai_tutor_models import TutorMessageModel
+from src.domain.grading.value_objects.submission_status import SubmissionStatus
+
+# Runs leave a submission PENDING; only the final hand-in submits/grades it
+FINAL_SUBMISSION_STATUSES = (SubmissionStatus.SUBMITTED.value, SubmissionStatus.GRADED.value)
 
 class SqlAlchemySubmissionReadRepository(SubmissionReadRepository):
+    """
+    Read model for the teacher's student/activity views. Whatever the number of
+    students, details are built from four queries: the activity, submissions with
+    their risk analysis, their attempts, and the messages of each student's
+    latest session. Only the columns the DTO needs are selected.
+    """
     def __init__(self, session: Session):
         self.session = session
 
     def get_student_activity_details(self, activity_id: str, student_id: str) -> Optional[StudentActivityDetailsDTO]:
-        # 1. Fetch Submission
-        submission = (
-            self.session.query(SubmissionModel)
-            .filter_by(activity_id=activity_id, student_id=student_id)
-            .first()
-        )
+        details = self.get_activity_details_for_students(activity_id, [student_id])
+        if details:
+            return details[0]
+        # Activity exists but the student never opened it
+        activity = self.session.get(ActivityModel, activity_id)
+        return self._build(activity, student_id, None, None, [], []) if activity else None
 
-        # 2. Fetch Activity
-        activity = self.session.query(ActivityModel).filter_by(id=activity_id).first()
+    def get_activity_details_for_students(self, activity_id: str, student_ids: Optional[List[str]] = None) -> List[StudentActivityDetailsDTO]:
+        # 1. Activity
+        activity = self.session.get(ActivityModel, activity_id)
         if not activity:
-            return None
+            return []
+
+        # 2. Submissions + persisted risk analysis (latest submission per student)
+        submission_query = (
+            select(SubmissionModel.id, SubmissionModel.student_id, SubmissionModel.final_score,
+                   SubmissionModel.status, SubmissionModel.created_at, RiskAnalysisModel)
+            .outerjoin(RiskAnalysisModel, RiskAnalysisModel.submission_id == SubmissionModel.id)
+            .where(SubmissionModel.activity_id == activity_id)
+            .order_by(SubmissionModel.student_id, SubmissionModel.created_at.desc())
+        )
+        if student_ids is not None:
+            submission_query = submission_query.where(SubmissionModel.student_id.in_(student_ids))
+        submissions: Dict[str, Any] = {}
+        risks: Dict[str, Optional[RiskAnalysisModel]] = {}
+        for row in self.session.execute(submission_query):
+            if row.student_id not in submissions:
+                submissions[row.student_id] = row
+                risks[row.student_id] = row.RiskAnalysisModel
 
-        # 3. Fetch Session & Chats
-        session = (
-            self.session.query(SessionModel)
-            .filter_by(activity_id=activity_id, student_id=student_id)
-            .order_by(SessionModel.updated_at.desc())
-            .first()
+        # 3. Attempts of those submissions
+        attempts_by_submission = defaultdict(list)
+        submission_ids = [row.id for row in submissions.values()]
+        if submission_ids:
+            attempts = self.session.execute(
+                select(ExerciseAttemptModel.submission_id, ExerciseAttemptModel.exercise_id,
+                       ExerciseAttemptModel.is_passing, ExerciseAttemptModel.grade,
+                       ExerciseAttemptModel.execution_output, ExerciseAttemptModel.error_message,
+                       ExerciseAttemptModel.code_submitted)
+                .where(ExerciseAttemptModel.submission_id.in_(submission_ids))
+                .order_by(ExerciseAttemptModel.created_at)
+            )
+            for attempt in attempts:
+                attempts_by_submission[attempt.submission_id].append(attempt)
+
+        # 4. Messages of each student's most recent session
+        latest_sessions = (
+            select(SessionModel.id, SessionModel.student_id)
+            .where(SessionModel.activity_id == activity_id)
+            .order_by(SessionModel.student_id, SessionModel.updated_at.desc())
+            .distinct(SessionModel.student_id)
+        )
+        if student_ids is not None:
+            latest_sessions = latest_sessions.where(SessionModel.student_id.in_(student_ids))
+        latest_sessions = latest_sessions.subquery()
+        messages = self.session.execute(
+            select(latest_sessions.c.student_id, TutorMessageModel.role,
+                   TutorMessageModel.content, TutorMessageModel.created_at)
+            .join(latest_sessions, TutorMessageModel.session_id == latest_sessions.c.id)
+            .order_by(latest_sessions.c.student_id, TutorMessageModel.created_at.asc())
         )
-        
-        chat_history = []
-        if session:
-            chats = (
-                self.session.query(TutorMessageModel)
-                .filter_by(session_id=session.id)
-                .order_by(TutorMessageModel.created_at.asc())
-                .all()
+        chats_by_student = defaultdict(list)
+        for message in messages:
+            chats_by_student[message.student_id].append(
+                {"role": message.role, "content": message.content, "timestamp": message.created_at.isoformat()}
             )
-            chat_history = [
-                {"role": c.role, "content": c.content, "timestamp": c.created_at.isoformat()}
-                for c in chats
-            ]
 
-        # 4. Construct Data
+        if student_ids is None:
+            student_ids = sorted(set(submissions) | set(chats_by_student))
+        results = []
+        for student_id in student_ids:
+            submission = submissions.get(student_id)
+            if not submission and student_id not in chats_by_student:
+                continue
+            attempts = attempts_by_submission.get(submission.id, []) if submission else []
+            results.append(self._build(
+                activity, student_id, submission, risks.get(student_id), attempts, chats_by_student.get(student_id, [])
+            ))
+        return results
+
+    def _build(self, activity, student_id, submission, risk, attempts, chat_history) -> StudentActivityDetailsDTO:
         grade = submission.final_score if submission and submission.final_score is not None else 0.0
         status = "submitted" if submission else "pending"
-        
+
         exercises_details = []
         code_parts = []
-        
-        if submission:
-            attempts = (
-                self.session.query(ExerciseAttemptModel)
-                .filter_by(submission_id=submission.id)
-                .all()
-            )
-            for attempt in attempts:
-                exercises_details.append({
-                    "exercise_id": attempt.exercise_id,
-                    "passed": attempt.is_passing,
-                    "grade": attempt.grade if attempt.grade is not None else (100 if attempt.is_passing else 0),
-                    "feedback": attempt.execution_output or attempt.error_message or "Sin feedback" 
-                })
-                if attempt.code_submitted:
-                    code_parts.append(f"# Ejercicio {attempt.exercise_id}\n{attempt.code_submitted}\n")
-                
+        for attempt in attempts:
+            exercises_details.append({
+                "exercise_id": attempt.exercise_id,
+                "passed": attempt.is_passing,
+                "grade": attempt.grade if attempt.grade is not None else (100 if attempt.is_passing else 0),
+                "feedback": attempt.execution_output or attempt.error_message or "Sin feedback"
+            })
+            if attempt.code_submitted:
+                code_parts.append(f"# Ejercicio {attempt.exercise_id}\n{attempt.code_submitted}\n")
+
         # Combine all code submissions
         full_code_submission = "\n".join(code_parts) if code_parts else "No se envió código"
 
-        # Check for persisted risk analysis
         risk_analysis = None
-        if submission and hasattr(submission, 'risk_analysis') and submission.risk_analysis:
-            ra = submission.risk_analysis
-            import json
-            try:
-                evidence = json.loads(ra.evidence) if ra.evidence else []
-                positive_aspects = json.loads(ra.positive_aspects) if ra.positive_aspects else []
-            except:
-                evidence = []
-                positive_aspects = []
-                
+        if risk:
             risk_analysis = {
-                "risk_score": ra.risk_score,
-                "risk_level": ra.risk_level,
-                "diagnosis": ra.diagnosis,
-                "evidence": evidence,
-                "teacher_advice": ra.teacher_advice,
-                "positive_aspects": positive_aspects,
-                "analyzed_at": ra.analyzed_at.isoformat()
+                "risk_score": risk.risk_score,
+                "risk_level": risk.risk_level,
+                "diagnosis": risk.diagnosis,
+                "evidence": self._json_list(risk.evidence),
+                "teacher_advice": risk.teacher_advice,
+                "positive_aspects": self._json_list(risk.positive_aspects),
+                "analyzed_at": risk.analyzed_at.isoformat()
             }
 
         return StudentActivityDetailsDTO(
             student_id=student_id,
-            activity_id=activity_id,
+            activity_id=activity.id,
             activity_title=activity.title,
             status=status,
             final_grade=grade,
@@ -101,5 +144,18 @@ class SqlAlchemySubmissionReadRepository(SubmissionReadRepository):
             exercises=exercises_details,
             chat_history=chat_history,
             code_submitted=full_code_submission,
-            risk_analysis=risk_analysis
+            risk_analysis=risk_analysis,
+            final_submitted=bool(submission) and submission.status in FINAL_SUBMISSION_STATUSES
         )
+
+    @staticmethod
+    def _json_list(value) -> List[Any]:
+        # JSON columns come back as lists; older rows stored them as JSON strings
+        if not value:
+            return []
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return []
+        return value if isinstance(value, list) else []
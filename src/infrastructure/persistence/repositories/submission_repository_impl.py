@@ -1,7 +1,10 @@
 from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from src.domain.grading.ports.submission_repository import SubmissionRepository
 from src.domain.grading.entities.submission import Submission
+from src.domain.grading.entities.exercise_attempt import ExerciseAttempt
 from src.domain.grading.value_objects.submission_status import SubmissionStatus
 from src.domain.grading.value_objects.score import Score
 from src.infrastructure.persistence.models.grading_models import SubmissionModel, ExerciseAttemptModel
@@ -28,35 +31,34 @@ class SqlAlchemySubmissionRepository(SubmissionRepository):
                 created_at=submission.created_at,
                 updated_at=submission.updated_at
             )
-            self.db_session.add(model)
+            try:
+                with self.db_session.begin_nested():
+                    self.db_session.add(model)
+            except IntegrityError:
+                # A concurrent first submission of the same student won the insert
+                # (uq_submissions_activity_student): record this one on that row instead
+                model = self.db_session.query(SubmissionModel).filter(
+                    SubmissionModel.activity_id == submission.activity_id,
+                    SubmissionModel.student_id == submission.student_id
+                ).one()
+                print(f"--- [SqlAlchemySubmissionRepository] Concurrent submission for {submission.activity_id}/{submission.student_id}, merged into {model.id} ---")
+                submission.id = sid = model.id
+                if submission.score:
+                    model.status = submission.status.value
+                    model.final_score = submission.score.value
+                model.updated_at = submission.updated_at
         else:
             model.status = submission.status.value
             model.final_score = submission.score.value if submission.score else None
             model.updated_at = submission.updated_at
 
-        # Save Attempts
-        for attempt in submission.attempts:
-             att_model = self.db_session.query(ExerciseAttemptModel).filter(ExerciseAttemptModel.id == str(attempt.id)).first()
-             if not att_model:
-                 att_model = ExerciseAttemptModel(
-                     id=str(attempt.id),
-                     submission_id=sid,
-                     exercise_id=attempt.exercise_id,
-                     code_submitted=attempt.code_submitted,
-                     is_passing=attempt.passed,
-                     grade=attempt.grade,
-                     execution_output=attempt.result.stdout if attempt.result else "",
-                     error_message=attempt.result.error if attempt.result else "",
-                     created_at=attempt.created_at
-                 )
-                 self.db_session.add(att_model)
-             else:
-                 # Update existing attempt
-                 att_model.code_submitted = attempt.code_submitted
-                 att_model.is_passing = attempt.passed
-                 att_model.grade = attempt.grade
-                 att_model.execution_output = attempt.result.stdout if attempt.result else att_model.execution_output
-                 att_model.error_message = attempt.result.error if attempt.result else att_model.error_message
+        # Only the attempts added since the last save, in one INSERT round trip
+        pending = submission.pending_attempts
+        if pending:
+            # The attempts reference the submission row: write it first
+            self.db_session.flush()
+            self.db_session.execute(attempts_insert(sid, pending))
+        submission.mark_attempts_saved()
 
     def find_by_activity_and_student(self, activity_id: str, student_id: str) -> Optional[Submission]:
         model = self.db_session.query(SubmissionModel).filter(
@@ -78,7 +80,8 @@ class SqlAlchemySubmissionRepository(SubmissionRepository):
         models = self.db_session.query(SubmissionModel).filter(SubmissionModel.student_id == student_id).all()
         return [self._to_entity(m) for m in models]
 
-    def _to_entity(self, model: SubmissionModel) -> Submission:
+    @staticmethod
+    def _to_entity(model: SubmissionModel) -> Submission:
         sub = Submission(
             activity_id=model.activity_id,
             student_id=model.student_id
@@ -91,11 +94,24 @@ class SqlAlchemySubmissionRepository(SubmissionRepository):
         sub.created_at = model.created_at
         sub.updated_at = model.updated_at
         
-        # Load attempts (lazy loading issues?)
-        # Ideally we eagerly load or accessing model.attempts triggers it within session.
-        # But here we convert to entity.
-        # We need to map attempts too if we want them in entity.
-        # For MVP, let's skip deep mapping unless used. 
-        # SubmitSolution uses `add_attempt`, so it maintains in memory list.
-        # Finding submission should probably load them.
+        # Attempts are not hydrated: writers only append (see pending_attempts)
+        # and readers query exercise_attempts directly
         return sub
+
+def attempts_insert(submission_id: str, attempts: List[ExerciseAttempt]):
+    """Bulk INSERT of new attempts; saved attempts are never rewritten, so a retried save is a no-op."""
+    stmt = pg_insert(ExerciseAttemptModel).values([
+        {
+            "id": str(attempt.id),
+            "submission_id": submission_id,
+            "exercise_id": attempt.exercise_id,
+            "code_submitted": attempt.code_submitted,
+            "is_passing": attempt.passed,
+            "grade": attempt.grade,
+            "execution_output": attempt.result.stdout if attempt.result else "",
+            "error_message": attempt.result.error if attempt.result else "",
+            "created_at": attempt.created_at
+        }
+        for attempt in attempts
+    ])
+    return stmt.on_conflict_do_nothing(index_elements=[ExerciseAttemptModel.id])
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from src.domain.identity.ports.user_repository import UserRepository
 from src.domain.identity.entities.user import User, UserRole
@@ -43,6 +43,12 @@ class SqlAlchemyUserRepository(UserRepository):
             return None
         return self._to_entity(model)
 
+    def find_by_ids(self, user_ids: List[str]) -> List[User]:
+        if not user_ids:
+            return []
+        models = self.db.query(UserModel).filter(UserModel.id.in_(user_ids)).all()
+        return [self._to_entity(m) for m in models]
+
     def find_by_email(self, email: Email) -> Optional[User]:
         model = self.db.query(UserModel).filter(UserModel.email == email.address).first()
         if not model:
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from src.application.shared.unit_of_work import UnitOfWork
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.application.shared.unit_of_work import UnitOfWork, AsyncUnitOfWork
 
 class SqlAlchemyUnitOfWork(UnitOfWork):
     def __init__(self, session_factory):
@@ -22,3 +23,25 @@ class SqlAlchemyUnitOfWork(UnitOfWork):
 
     def rollback(self):
         self.session.rollback()
+
+class SqlAlchemyAsyncUnitOfWork(AsyncUnitOfWork):
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.session: AsyncSession = None
+
+    async def __aenter__(self):
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type:
+            await self.rollback()
+        else:
+            await self.commit()
+        await self.session.close()
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
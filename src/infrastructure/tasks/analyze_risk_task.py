@@ -1,24 +1,47 @@
 
 import logging
-import threading
-from sqlalchemy.orm import Session
 from src.infrastructure.persistence.database import SessionLocal
+from src.application.teacher.ports.background_task_queue import BackgroundTask
 from src.application.teacher.queries.get_student_activity_details import GetStudentActivityDetails
 from src.infrastructure.persistence.repositories.submission_read_repository_impl import SqlAlchemySubmissionReadRepository
-from src.infrastructure.ai.llm.risk_analyzer import RiskAnalyzer
-from src.infrastructure.persistence.models.grading_models import RiskAnalysisModel, SubmissionModel
+from src.infrastructure.ai.llm.risk_analyzer import risk_analyzer
+from src.infrastructure.ai.llm.ollama_client import ollama_client
+from src.infrastructure.persistence.models.grading_models import RiskAnalysisModel
+from src.infrastructure.tasks.task_queue import task_queue
 
 logger = logging.getLogger(__name__)
 
+RISK_ANALYSIS_TASK = "risk_analysis"
+
+def risk_analysis_dedup_key(submission_id: str) -> str:
+    return f"{RISK_ANALYSIS_TASK}:{submission_id}"
+
 def enqueue_risk_analysis(submission_id: str, student_id: str, activity_id: str):
     """
-    Enqueues risk analysis task in a background thread.
+    Enqueues the risk analysis of a final submission in the background task queue.
+    A submission already queued or being analyzed is not queued twice.
     """
-    thread = threading.Thread(target=_execute_risk_analysis, args=(submission_id, student_id, activity_id))
-    thread.daemon = True # Daemonize to not block shutdown
-    thread.start()
+    return task_queue.enqueue(
+        RISK_ANALYSIS_TASK,
+        {"submission_id": submission_id, "student_id": student_id, "activity_id": activity_id},
+        dedup_key=risk_analysis_dedup_key(submission_id)
+    )
+
+def ollama_endpoint_key(task: BackgroundTask) -> str:
+    base_url = risk_analyzer.base_url or ollama_client.resolve_base_url_sync()
+    return f"{base_url}#{risk_analyzer.model}"
 
-def _execute_risk_analysis(submission_id: str, student_id: str, activity_id: str):
+def _run_risk_analysis_task(task: BackgroundTask):
+    payload = task.payload
+    _execute_risk_analysis(
+        payload["submission_id"],
+        payload["student_id"],
+        payload["activity_id"],
+        # Let the queue retry LLM failures; store the fallback diagnosis only on the last attempt
+        raise_errors=not task.is_last_attempt
+    )
+
+def _execute_risk_analysis(submission_id: str, student_id: str, activity_id: str, raise_errors: bool = False):
     logger.info(f"Starting async risk analysis for submission {submission_id}")
     db = SessionLocal()
     try:
@@ -26,7 +49,7 @@ def _execute_risk_analysis(submission_id: str, student_id: str, activity_id: str
         repo = SqlAlchemySubmissionReadRepository(db)
         query = GetStudentActivityDetails(repo)
         details = query.execute(activity_id, student_id)
-        
+
         if not details:
             logger.error(f"Could not find details for analysis: {activity_id}, {student_id}")
             return
@@ -39,15 +62,15 @@ def _execute_risk_analysis(submission_id: str, student_id: str, activity_id: str
             logger.warning("Chat history is EMPTY for this analysis!")
 
         # 2. Analyze
-        analyzer = RiskAnalyzer()
-        result = analyzer.analyze_student_risk(
+        result = risk_analyzer.analyze_student_risk(
             student_name=student_id,
             activity_title=details.activity_title,
             chat_history=details.chat_history,
             code_submission=details.code_submitted,
-            grade=details.final_grade
+            grade=details.final_grade,
+            raise_errors=raise_errors
         )
-        
+
         # 3. Save Result
         # No serialization needed for JSON columns
 
@@ -60,12 +83,13 @@ def _execute_risk_analysis(submission_id: str, student_id: str, activity_id: str
             teacher_advice=result.get('teacher_advice', ''),
             positive_aspects=result.get('positive_aspects', [])
         )
-        
+
         # Upsert or Insert
         existing = db.query(RiskAnalysisModel).filter_by(submission_id=submission_id).first()
         if existing:
             db.delete(existing)
-            
+            db.flush()
+
         db.add(risk_model)
         db.commit()
         logger.info(f"Risk analysis completed and saved for submission {submission_id}")
@@ -73,5 +97,9 @@ def _execute_risk_analysis(submission_id: str, student_id: str, activity_id: str
     except Exception as e:
         logger.error(f"Risk analysis failed for submission {submission_id}: {e}")
         db.rollback()
+        # The task queue records the error and schedules the retry
+        raise
     finally:
         db.close()
+
+task_queue.register(RISK_ANALYSIS_TASK, _run_risk_analysis_task, concurrency_key=ollama_endpoint_key)
@@ -0,0 +1,102 @@
+import logging
+from src.infrastructure.config.settings import settings
+from src.infrastructure.persistence.database import SessionLocal
+from src.application.teacher.ports.background_task_queue import BackgroundTask
+from src.infrastructure.persistence.repositories.submission_read_repository_impl import SqlAlchemySubmissionReadRepository
+from src.infrastructure.ai.llm.risk_analyzer import risk_analyzer
+from src.infrastructure.persistence.models.grading_models import RiskAnalysisModel, SubmissionModel
+from src.domain.grading.value_objects.submission_status import SubmissionStatus
+from src.infrastructure.tasks.task_queue import task_queue
+from src.infrastructure.tasks.analyze_risk_task import ollama_endpoint_key
+
+logger = logging.getLogger(__name__)
+
+COHORT_RISK_ANALYSIS_TASK = "cohort_risk_analysis"
+
+def cohort_risk_analysis_dedup_key(activity_id: str) -> str:
+    return f"{COHORT_RISK_ANALYSIS_TASK}:{activity_id}"
+
+def enqueue_cohort_risk_analysis(activity_id: str):
+    """
+    Enqueues the risk analysis of every submitted student of an activity as one task.
+    """
+    return task_queue.enqueue(
+        COHORT_RISK_ANALYSIS_TASK,
+        {"activity_id": activity_id},
+        dedup_key=cohort_risk_analysis_dedup_key(activity_id)
+    )
+
+def _run_cohort_risk_analysis_task(task: BackgroundTask):
+    activity_id = task.payload["activity_id"]
+    logger.info(f"Starting cohort risk analysis for activity {activity_id}")
+    db = SessionLocal()
+    try:
+        # 1. Every submitted student of the activity
+        submissions = (
+            db.query(SubmissionModel.id, SubmissionModel.student_id)
+            .filter(
+                SubmissionModel.activity_id == activity_id,
+                SubmissionModel.status.in_([SubmissionStatus.SUBMITTED.value, SubmissionStatus.GRADED.value])
+            )
+            .order_by(SubmissionModel.created_at)
+            .all()
+        )
+        if not submissions:
+            logger.info(f"No submissions to analyze for activity {activity_id}")
+            return
+
+        # Latest submission per student, like the read model
+        submission_by_student = {student_id: submission_id for submission_id, student_id in submissions}
+        all_details = SqlAlchemySubmissionReadRepository(db).get_activity_details_for_students(
+            activity_id, list(submission_by_student)
+        )
+        analyzed_ids, students = [], []
+        for details in all_details:
+            submission_id = submission_by_student[details.student_id]
+            analyzed_ids.append(submission_id)
+            students.append({
+                "student_name": details.student_id,
+                "activity_title": details.activity_title,
+                "chat_history": details.chat_history,
+                "code_submission": details.code_submitted,
+                "grade": details.final_grade,
+            })
+        # Don't hold a connection while the LLM works
+        db.rollback()
+
+        # 2. Analyze, sharing the instruction prompt between students. Every LLM call takes
+        # an endpoint slot, so the cohort's parallel calls count against the endpoint limit
+        slot = task_queue.limiter.semaphore(ollama_endpoint_key(task))
+        results = risk_analyzer.analyze_cohort(students, max_concurrency=settings.RISK_COHORT_CONCURRENCY, llm_slot=slot)
+        failed = sum(1 for result in results if result.get("failed"))
+        if failed == len(results) and not task.is_last_attempt:
+            raise RuntimeError(f"Risk analysis failed for all {failed} students")
+
+        # 3. Save every result in one transaction
+        db.query(RiskAnalysisModel).filter(
+            RiskAnalysisModel.submission_id.in_(analyzed_ids)
+        ).delete(synchronize_session=False)
+        db.add_all([
+            RiskAnalysisModel(
+                submission_id=submission_id,
+                risk_score=result.get('risk_score', 0),
+                risk_level=result.get('risk_level', 'LOW'),
+                diagnosis=result.get('diagnosis', ''),
+                evidence=result.get('evidence', []),
+                teacher_advice=result.get('teacher_advice', ''),
+                positive_aspects=result.get('positive_aspects', [])
+            )
+            for submission_id, result in zip(analyzed_ids, results)
+        ])
+        db.commit()
+        logger.info(f"Cohort risk analysis saved for activity {activity_id}: {len(results)} students, {failed} failed")
+
+    except Exception as e:
+        logger.error(f"Cohort risk analysis failed for activity {activity_id}: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+# No task-level concurrency_key: the handler takes an endpoint slot per LLM call instead
+task_queue.register(COHORT_RISK_ANALYSIS_TASK, _run_cohort_risk_analysis_task)
@@ -0,0 +1,443 @@
+import os
+import random
+import socket
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from src.infrastructure.config.settings import settings
+from src.application.teacher.ports.background_task_queue import IBackgroundTaskQueue, BackgroundTask
+from src.infrastructure.persistence.database import SessionLocal
+from src.infrastructure.persistence.models.task_models import BackgroundTaskModel
+
+TaskHandler = Callable[[BackgroundTask], None]
+# Returns the (endpoint, model) a task will call, so tasks hitting the same LLM share a limit
+ConcurrencyKey = Callable[[BackgroundTask], str]
+
+@dataclass
+class _Registration:
+    handler: TaskHandler
+    concurrency_key: Optional[ConcurrencyKey]
+    max_attempts: int
+
+class EndpointLimiter:
+    """
+    One semaphore per endpoint/model key. `overrides` maps a key, an endpoint URL or
+    a model name to its own limit: "http://gpu-box:11434=8,llama3:70b=1".
+    """
+    def __init__(self, default_limit: int = 2, overrides: str = ""):
+        self.default_limit = max(1, default_limit)
+        self.overrides: Dict[str, int] = {}
+        for entry in (overrides or "").split(","):
+            name, _, limit = entry.strip().rpartition("=")
+            if name and limit.isdigit():
+                self.overrides[name.rstrip("/")] = max(1, int(limit))
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._limits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, key: str) -> int:
+        if key in self.overrides:
+            return self.overrides[key]
+        parts = [part for part in key.split("#") if part]
+        matching = [self.overrides[part.rstrip("/")] for part in parts if part.rstrip("/") in self.overrides]
+        return min(matching) if matching else self.default_limit
+
+    def semaphore(self, key: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._semaphores:
+                self._limits[key] = self.limit_for(key)
+                self._semaphores[key] = threading.BoundedSemaphore(self._limits[key])
+            return self._semaphores[key]
+
+    def set_limit(self, key: str, limit: int) -> None:
+        """Fixed limit for a key that isn't an endpoint (e.g. a CPU-bound task kind)."""
+        self.overrides[key] = max(1, limit)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._limits)
+
+class PostgresTaskQueue(IBackgroundTaskQueue):
+    """
+    Durable background task queue stored in the `background_tasks` table.
+
+    `num_workers` threads claim due tasks with SELECT ... FOR UPDATE SKIP LOCKED, so
+    several API processes can share the table without double-processing. A task
+    whose handler raises is retried with exponential backoff until `max_attempts`;
+    a task left `running` by a dead process is picked up again once its lease
+    (`lease_seconds`, renewed while the handler runs) expires. Tasks calling the
+    same LLM endpoint/model also share an EndpointLimiter slot, so a burst of
+    submissions queues up instead of hitting Ollama all at once.
+    """
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        num_workers: int = 4,
+        poll_interval_seconds: float = 2.0,
+        lease_seconds: float = 600.0,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 10.0,
+        retry_max_backoff_seconds: float = 600.0,
+        limiter: Optional[EndpointLimiter] = None
+    ):
+        self.session_factory = session_factory
+        self.num_workers = max(1, num_workers)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.retry_max_backoff_seconds = retry_max_backoff_seconds
+        self.limiter = limiter or EndpointLimiter()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._handlers: Dict[str, _Registration] = {}
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._in_flight: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+        self._completed = 0
+        self._retried = 0
+        self._failed = 0
+
+    def register(
+        self,
+        kind: str,
+        handler: TaskHandler,
+        concurrency_key: Optional[ConcurrencyKey] = None,
+        max_attempts: Optional[int] = None
+    ) -> None:
+        self._handlers[kind] = _Registration(handler, concurrency_key, max_attempts or self.max_attempts)
+
+    # ------------------------------------------------------------------
+    # IBackgroundTaskQueue
+    # ------------------------------------------------------------------
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedup_key: Optional[str] = None) -> BackgroundTask:
+        """
+        Inserts a pending task. With a `dedup_key`, a task that is still pending or
+        running is returned as-is; a finished one is reset and queued again.
+        """
+        registration = self._handlers.get(kind)
+        max_attempts = registration.max_attempts if registration else self.max_attempts
+        now = datetime.utcnow()
+
+        session = self.session_factory()
+        try:
+            stmt = pg_insert(BackgroundTaskModel).values(
+                id=str(uuid.uuid4()),
+                kind=kind,
+                dedup_key=dedup_key,
+                payload=payload,
+                status="pending",
+                attempts=0,
+                max_attempts=max_attempts,
+                run_after=now,
+                created_at=now,
+                updated_at=now
+            )
+            if dedup_key:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[BackgroundTaskModel.dedup_key],
+                    set_={
+                        "payload": stmt.excluded.payload,
+                        "status": "pending",
+                        "attempts": 0,
+                        "max_attempts": max_attempts,
+                        "run_after": now,
+                        "locked_at": None,
+                        "locked_by": None,
+                        "last_error": None,
+                        "progress": None,
+                        "started_at": None,
+                        "finished_at": None,
+                        "updated_at": now,
+                    },
+                    where=BackgroundTaskModel.status.in_(("completed", "failed"))
+                )
+            stmt = stmt.returning(BackgroundTaskModel.id)
+            task_id = session.execute(stmt).scalar_one_or_none()
+            session.commit()
+
+            if task_id is None:
+                # Deduplicated: the same work is already queued or running
+                model = session.execute(
+                    select(BackgroundTaskModel).where(BackgroundTaskModel.dedup_key == dedup_key)
+                ).scalar_one()
+                print(f"--- [PostgresTaskQueue] {kind} task for {dedup_key} already {model.status} ---")
+            else:
+                model = session.get(BackgroundTaskModel, task_id)
+                print(f"--- [PostgresTaskQueue] Queued {kind} task {task_id} ---")
+            task = self._to_task(model)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        self.start()
+        self._wakeup.set()
+        return task
+
+    def get_task(self, task_id: str) -> Optional[BackgroundTask]:
+        with self.session_factory() as session:
+            model = session.get(BackgroundTaskModel, task_id)
+            return self._to_task(model) if model else None
+
+    def report_progress(self, task_id: str, progress: Dict[str, Any]) -> None:
+        """Stores what a running handler has done so far, readable from any process."""
+        try:
+            with self.session_factory() as session:
+                session.execute(
+                    update(BackgroundTaskModel)
+                    .where(BackgroundTaskModel.id == task_id, BackgroundTaskModel.locked_by == self.worker_id)
+                    .values(progress=progress, updated_at=datetime.utcnow())
+                )
+                session.commit()
+        except Exception as e:
+            print(f"--- [PostgresTaskQueue] Could not record progress of task {task_id}: {e} ---")
+
+    def find_by_dedup_key(self, dedup_key: str) -> Optional[BackgroundTask]:
+        with self.session_factory() as session:
+            model = session.execute(
+                select(BackgroundTaskModel).where(BackgroundTaskModel.dedup_key == dedup_key)
+            ).scalar_one_or_none()
+            return self._to_task(model) if model else None
+
+    # ------------------------------------------------------------------
+    # Worker lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.num_workers):
+                thread = threading.Thread(target=self._run, name=f"task-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            print(f"--- [PostgresTaskQueue] Started {self.num_workers} worker(s) as {self.worker_id} ---")
+
+    def shutdown(self) -> None:
+        """
+        Stops claiming new tasks. Tasks still running in this process are handed
+        back to the queue so another process (or the next start) runs them now
+        instead of waiting for the lease to expire.
+        """
+        with self._start_lock:
+            if not self._threads:
+                return
+            self._stopping.set()
+            self._wakeup.set()
+            self._threads = []
+
+        with self._in_flight_lock:
+            in_flight = list(self._in_flight)
+        if not in_flight:
+            return
+        try:
+            with self.session_factory() as session:
+                session.execute(
+                    update(BackgroundTaskModel)
+                    .where(BackgroundTaskModel.id.in_(in_flight), BackgroundTaskModel.status == "running")
+                    .values(
+                        status="pending",
+                        attempts=BackgroundTaskModel.attempts - 1,
+                        run_after=datetime.utcnow(),
+                        locked_at=None,
+                        locked_by=None
+                    )
+                )
+                session.commit()
+            print(f"--- [PostgresTaskQueue] Released {len(in_flight)} running task(s) ---")
+        except Exception as e:
+            print(f"--- [PostgresTaskQueue] Could not release running tasks: {e} ---")
+
+    def metrics(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        try:
+            with self.session_factory() as session:
+                rows = session.execute(
+                    select(BackgroundTaskModel.status, func.count()).group_by(BackgroundTaskModel.status)
+                ).all()
+                counts = {status: count for status, count in rows}
+        except Exception as e:
+            counts = {"error": str(e)}
+        with self._in_flight_lock:
+            in_flight = len(self._in_flight)
+        return {
+            "worker_id": self.worker_id,
+            "workers": len(self._threads),
+            "in_flight": in_flight,
+            "completed": self._completed,
+            "retried": self._retried,
+            "failed": self._failed,
+            "endpoint_limits": self.limiter.snapshot(),
+            "tasks": counts,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                task = self._claim()
+            except Exception as e:
+                # DB unavailable: back off and keep the worker alive
+                print(f"--- [PostgresTaskQueue] Could not claim a task: {e} ---")
+                task = None
+            if task is None:
+                self._wakeup.wait(self.poll_interval_seconds)
+                self._wakeup.clear()
+                continue
+            self._execute(task)
+
+    def _claim(self) -> Optional[BackgroundTask]:
+        if not self._handlers:
+            return None
+        now = datetime.utcnow()
+        lease_expired = now - timedelta(seconds=self.lease_seconds)
+
+        with self.session_factory() as session:
+            while True:
+                model = session.execute(
+                    select(BackgroundTaskModel)
+                    .where(
+                        BackgroundTaskModel.kind.in_(list(self._handlers)),
+                        or_(
+                            and_(BackgroundTaskModel.status == "pending", BackgroundTaskModel.run_after <= now),
+                            and_(BackgroundTaskModel.status == "running", BackgroundTaskModel.locked_at < lease_expired)
+                        )
+                    )
+                    .order_by(BackgroundTaskModel.run_after)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                ).scalar_one_or_none()
+                if model is None:
+                    return None
+
+                if model.status == "running" and model.attempts >= model.max_attempts:
+                    # Its worker died on the last attempt; don't let it crash-loop
+                    model.status = "failed"
+                    model.last_error = f"Worker {model.locked_by} stopped while running the last attempt"
+                    model.finished_at = now
+                    model.locked_at = None
+                    session.commit()
+                    continue
+
+                model.status = "running"
+                model.attempts += 1
+                model.locked_at = now
+                model.locked_by = self.worker_id
+                model.started_at = model.started_at or now
+                session.commit()
+                task = self._to_task(model)
+                with self._in_flight_lock:
+                    self._in_flight.add(task.id)
+                return task
+
+    def _execute(self, task: BackgroundTask) -> None:
+        registration = self._handlers[task.kind]
+        done = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(task.id, done), name=f"task-heartbeat-{task.id[:8]}", daemon=True).start()
+        try:
+            if registration.concurrency_key:
+                with self.limiter.semaphore(registration.concurrency_key(task)):
+                    registration.handler(task)
+            else:
+                registration.handler(task)
+        except Exception as e:
+            self._finish(task, error=e)
+        else:
+            self._finish(task)
+        finally:
+            done.set()
+            with self._in_flight_lock:
+                self._in_flight.discard(task.id)
+
+    def _heartbeat(self, task_id: str, done: threading.Event) -> None:
+        # Long tasks (a whole cohort) keep their lease so no other worker re-runs them
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                with self.session_factory() as session:
+                    session.execute(
+                        update(BackgroundTaskModel)
+                        .where(BackgroundTaskModel.id == task_id, BackgroundTaskModel.locked_by == self.worker_id)
+                        .values(locked_at=datetime.utcnow())
+                    )
+                    session.commit()
+            except Exception as e:
+                print(f"--- [PostgresTaskQueue] Could not renew lease of task {task_id}: {e} ---")
+
+    def _finish(self, task: BackgroundTask, error: Optional[Exception] = None) -> None:
+        now = datetime.utcnow()
+        values: Dict[str, Any] = {"locked_at": None, "locked_by": None, "updated_at": now}
+
+        if error is None:
+            values.update(status="completed", last_error=None, finished_at=now)
+            self._completed += 1
+            print(f"--- [PostgresTaskQueue] {task.kind} task {task.id} completed ---")
+        elif task.is_last_attempt:
+            values.update(status="failed", last_error=str(error), finished_at=now)
+            self._failed += 1
+            print(f"--- [PostgresTaskQueue] {task.kind} task {task.id} failed after {task.attempts} attempt(s): {error} ---")
+        else:
+            delay = self._backoff(task.attempts)
+            values.update(status="pending", last_error=str(error), run_after=now + timedelta(seconds=delay))
+            self._retried += 1
+            print(f"--- [PostgresTaskQueue] {task.kind} task {task.id} attempt {task.attempts} failed ({error}), retrying in {delay:.0f}s ---")
+
+        try:
+            with self.session_factory() as session:
+                # Only if we still own it: after a lease expiry another worker may have taken over
+                session.execute(
+                    update(BackgroundTaskModel)
+                    .where(BackgroundTaskModel.id == task.id, BackgroundTaskModel.locked_by == self.worker_id)
+                    .values(**values)
+                )
+                session.commit()
+        except Exception as e:
+            print(f"--- [PostgresTaskQueue] Could not update task {task.id}: {e} ---")
+
+    def _backoff(self, attempt: int) -> float:
+        delay = self.retry_backoff_seconds * (2 ** max(attempt - 1, 0))
+        # Jitter so tasks that failed together (e.g. Ollama restart) don't retry together
+        return min(delay, self.retry_max_backoff_seconds) * random.uniform(0.8, 1.2)
+
+    def _to_task(self, model: BackgroundTaskModel) -> BackgroundTask:
+        return BackgroundTask(
+            id=model.id,
+            kind=model.kind,
+            payload=dict(model.payload or {}),
+            dedup_key=model.dedup_key,
+            status=model.status,
+            attempts=model.attempts or 0,
+            max_attempts=model.max_attempts or self.max_attempts,
+            last_error=model.last_error,
+            progress=dict(model.progress or {}),
+            run_after=model.run_after,
+            created_at=model.created_at,
+            started_at=model.started_at,
+            finished_at=model.finished_at
+        )
+
+task_queue = PostgresTaskQueue(
+    num_workers=settings.TASK_WORKERS,
+    poll_interval_seconds=settings.TASK_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.TASK_LEASE_SECONDS,
+    max_attempts=settings.TASK_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.TASK_RETRY_BACKOFF_SECONDS,
+    retry_max_backoff_seconds=settings.TASK_RETRY_MAX_BACKOFF_SECONDS,
+    limiter=EndpointLimiter(
+        default_limit=settings.TASK_ENDPOINT_CONCURRENCY,
+        overrides=settings.TASK_ENDPOINT_CONCURRENCY_OVERRIDES
+    )
+)
@@ -11,6 +11,47 @@ from src.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
 from src.infrastructure.grading.local_code_executor import LocalCodeExecutor
 from src.infrastructure.ai.llm.ollama_auditor import OllamaAuditor
 from src.application.student.commands.submit_solution import SubmitSolution, SubmitSolutionRequest
+from src.application.grading.dtos.submit_exercise_dto import test_results_to_dicts
+from src.domain.grading.value_objects.execution_result import ExecutionResult
+from src.domain.learning.entities.test_case import TestCase as ExerciseTestCase
+from src.infrastructure.grading.test_runner import TestCaseRunner, output_matches
+
+class FakeSandbox:
+    """Answers every run with a fixed stdout, so no worker process is needed."""
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def run(self, code, stdin="", timeout=None):
+        return ExecutionResult(exit_code=0, stdout=self.stdout, stderr="")
+
+def check(name, condition):
+    print(f"{'OK  ' if condition else 'FAIL'} {name}")
+    return condition
+
+def test_output_matching():
+    print("--- Testing Output Matching ---")
+    ok = True
+    ok &= check("prompt-prefixed answer matches", output_matches("Ingrese un número: 5\n", "5"))
+    ok &= check("trailing whitespace is ignored", output_matches("3   \r\n\n", "3"))
+    ok &= check("different answer does not match", not output_matches("15\n", "5"))
+    ok &= check("prefix without a prompt does not match", not output_matches("-5\n", "5"))
+
+    runner = TestCaseRunner(FakeSandbox("Ingrese un número: 5\n"), max_parallel=2)
+    visible = ExerciseTestCase(input_data="5", expected_output="5")
+    hidden = ExerciseTestCase(input_data="7", expected_output="7", is_hidden=True)
+    result = runner.execute("print(input('Ingrese un número: '))", "python", [visible, hidden])
+    runner.shutdown()
+    ok &= check("runner passes the visible case", result.test_results[0].passed)
+    ok &= check("runner fails the hidden case", not result.test_results[1].passed)
+    ok &= check("score is weighted by passed cases", result.score == 50.0)
+
+    visible_dict, hidden_dict = test_results_to_dicts(result.test_results)
+    ok &= check("visible case exposes its output", visible_dict.get("actual_output") == "Ingrese un número: 5\n")
+    ok &= check(
+        "hidden case only reveals whether it passed",
+        not any(key in hidden_dict for key in ("input_data", "expected_output", "actual_output", "error"))
+    )
+    print("SUCCESS: Output matching checks passed." if ok else "ERROR: Output matching checks failed.")
 
 def test_grading():
     print("--- Testing Grading Logic ---")
@@ -112,4 +153,5 @@ def test_grading():
         print(f"ERROR: {e}")
 
 if __name__ == "__main__":
+    test_output_matching()
     test_grading()
@@ -1,5 +1,89 @@
-from src.infrastructure.persistence.database import engine
+from src.infrastructure.persistence.database import migration_engine as engine
 from sqlalchemy import text
+from src.infrastructure.persistence.models.task_models import BackgroundTaskModel
+from src.infrastructure.persistence.models.grading_models import ActivityProgressModel
+
+# One progress row per (activity, student) from the existing submissions and attempts
+BACKFILL_ACTIVITY_PROGRESS = """
+WITH latest AS (
+    SELECT DISTINCT ON (activity_id, student_id) id, activity_id, student_id, status, final_score, updated_at
+    FROM submissions
+    ORDER BY activity_id, student_id, created_at DESC
+),
+per_exercise AS (
+    SELECT a.submission_id, a.exercise_id,
+           bool_or(a.is_passing) AS passed,
+           max(COALESCE(a.grade, CASE WHEN a.is_passing THEN 100 ELSE 0 END)) AS best_grade,
+           count(*) AS attempts,
+           max(a.created_at) AS last_at
+    FROM exercise_attempts a
+    JOIN latest l ON l.id = a.submission_id
+    GROUP BY a.submission_id, a.exercise_id
+)
+INSERT INTO activity_progress (
+    activity_id, student_id, submission_id, status, exercises_attempted, exercises_passed,
+    attempts_count, best_grade, final_score, exercise_state, last_activity_at, updated_at
+)
+SELECT l.activity_id, l.student_id, l.id, l.status,
+       count(e.exercise_id),
+       count(e.exercise_id) FILTER (WHERE e.passed),
+       COALESCE(sum(e.attempts), 0),
+       max(e.best_grade),
+       l.final_score,
+       COALESCE(
+           json_object_agg(e.exercise_id, json_build_object('passed', e.passed, 'best_grade', e.best_grade, 'attempts', e.attempts))
+               FILTER (WHERE e.exercise_id IS NOT NULL),
+           '{}'::json
+       ),
+       GREATEST(l.updated_at, max(e.last_at)),
+       now()
+FROM latest l
+LEFT JOIN per_exercise e ON e.submission_id = l.id
+GROUP BY l.id, l.activity_id, l.student_id, l.status, l.final_score, l.updated_at
+ON CONFLICT (activity_id, student_id) DO NOTHING
+"""
+
+# An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index that IF NOT EXISTS would keep
+IS_INVALID_INDEX = """
+SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name
+"""
+
+# Built CONCURRENTLY so live tables keep taking writes (each statement must run outside a transaction)
+HOT_PATH_INDEXES = [
+    # Windowed chat history: last N messages of a session
+    ("ix_tutor_messages_session_created",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tutor_messages_session_created ON tutor_messages (session_id, created_at)"),
+    ("ix_sessions_activity_student_updated",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessions_activity_student_updated ON sessions (activity_id, student_id, updated_at)"),
+    ("ix_exercise_attempts_submission_created",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exercise_attempts_submission_created ON exercise_attempts (submission_id, created_at)"),
+    ("ix_exercises_activity_id",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exercises_activity_id ON exercises (activity_id)"),
+    ("ix_enrollments_module_student",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollments_module_student ON enrollments (module_id, student_id)"),
+    ("ix_enrollments_student_status",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollments_student_status ON enrollments (student_id, status)"),
+    # Keyset pagination of the list endpoints: (filter, sort key..., id)
+    ("ix_activities_teacher_created",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_teacher_created ON activities (teacher_id, created_at, id)"),
+    ("ix_activities_status_created",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_status_created ON activities (status, created_at, id)"),
+    ("ix_submissions_student_created",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submissions_student_created ON submissions (student_id, created_at, id)"),
+    ("ix_incidents_created",
+     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidents_created ON incidents (created_at, id)"),
+]
+
+COUNT_DUPLICATE_SUBMISSIONS = """
+SELECT count(*) FROM (
+    SELECT 1 FROM submissions GROUP BY activity_id, student_id HAVING count(*) > 1
+) duplicates
+"""
+
+def create_index_concurrently(connection, name, ddl):
+    if connection.execute(text(IS_INVALID_INDEX), {"name": name}).scalar():
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    connection.execute(text(ddl))
 
 def update_schema():
     with engine.connect() as connection:
@@ -12,5 +96,61 @@ def update_schema():
         except Exception as e:
             print(f"Error updating schema: {e}")
 
+        # Content hash + chunk ids for incremental document re-indexing
+        try:
+            connection.execute(text("ALTER TABLE activity_documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR"))
+            connection.execute(text("ALTER TABLE activity_documents ADD COLUMN IF NOT EXISTS chunk_ids JSON"))
+            connection.commit()
+            print("Successfully added content_hash and chunk_ids columns to activity_documents table.")
+        except Exception as e:
+            print(f"Error updating schema: {e}")
+
+    # CONCURRENTLY can't run inside a transaction: autocommit, and no timeout on the long builds
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("SET statement_timeout = 0"))
+
+        # Indexes of the hot lookup paths (checked by scripts/verify_query_plans.py)
+        for name, ddl in HOT_PATH_INDEXES:
+            try:
+                create_index_concurrently(connection, name, ddl)
+                print(f"Successfully added {name} index.")
+            except Exception as e:
+                print(f"Error updating schema: {e}")
+
+        # One submission per (activity, student); existing duplicates must be merged by hand first
+        try:
+            duplicates = connection.execute(text(COUNT_DUPLICATE_SUBMISSIONS)).scalar()
+            if duplicates:
+                print(f"Skipping uq_submissions_activity_student: {duplicates} (activity, student) pairs have several submissions.")
+            else:
+                create_index_concurrently(
+                    connection,
+                    "uq_submissions_activity_student",
+                    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_submissions_activity_student ON submissions (activity_id, student_id)"
+                )
+                print("Successfully added uq_submissions_activity_student index.")
+        except Exception as e:
+            print(f"Error updating schema: {e}")
+
+    # Persistent queue for background work (risk analysis, document ingestion)
+    try:
+        BackgroundTaskModel.__table__.create(bind=engine, checkfirst=True)
+        with engine.connect() as connection:
+            connection.execute(text("ALTER TABLE background_tasks ADD COLUMN IF NOT EXISTS progress JSON"))
+            connection.commit()
+        print("Successfully created background_tasks table.")
+    except Exception as e:
+        print(f"Error updating schema: {e}")
+
+    # Teacher dashboard progress projection, backfilled once from existing submissions
+    try:
+        ActivityProgressModel.__table__.create(bind=engine, checkfirst=True)
+        with engine.connect() as connection:
+            connection.execute(text(BACKFILL_ACTIVITY_PROGRESS))
+            connection.commit()
+        print("Successfully created and backfilled activity_progress table.")
+    except Exception as e:
+        print(f"Error updating schema: {e}")
+
 if __name__ == "__main__":
     update_schema()